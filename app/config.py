@@ -8,12 +8,91 @@ class Settings(BaseSettings):
     APP_NAME: str = "Real Estate AI Assistant"
     DATABASE_URL: str
 
+    # Connection pool, and SQLite tuning (WAL is always on for file databases)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+
     # OLLAMA model instead of OpenAI
     OLLAMA_MODEL: str = "qwen2.5:1.5b"
+    OLLAMA_URL: str = "http://localhost:11434"
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_READ_TIMEOUT: float = 60.0
+    OLLAMA_MAX_CONNECTIONS: int = 8
+
+    # LLM admission: concurrent generations, queued callers, seconds
+    LLM_MAX_CONCURRENCY: int = 2
+    LLM_MAX_WAITING: int = 16
+    LLM_QUEUE_TIMEOUT: float = 15.0
+    LLM_DEADLINE: float = 45.0
+
+    # Chat turn execution: "thread" (bounded pool) or "inline" (event loop)
+    TURN_EXECUTOR: str = "thread"
+    TURN_WORKERS: int = 4
+    TURN_MAX_PENDING: int = 32
+    TURN_SUBMIT_TIMEOUT: float = 10.0
+
+    # Load RAG / catalogues in background threads at startup (else on first use)
+    WARMUP_ON_STARTUP: bool = True
+
+    # Rental catalogue: "memory" (properties.json) or "db" (property table)
+    RENTAL_BACKEND: str = "memory"
+
+    # service_providers.json is re-read when it changes (0 = never)
+    PROVIDERS_RELOAD_INTERVAL: float = 10.0
+
+    # Conversation state: idle sessions expire, least recently used evicted.
+    # "memory" (one process), "sqlite" (workers on one host) or "redis" (shared)
+    SESSION_STORE: str = "memory"
+    SESSION_STORE_PATH: str = "app/data/sessions.db"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_MAX: int = 10000
+    SESSION_IDLE_TTL: float = 1800.0
+
+    # LLM prompt history: recent turns verbatim, older ones summarized
+    LLM_HISTORY_TOKENS: int = 600
+    LLM_HISTORY_TURNS: int = 8
+    LLM_SUMMARY_TOKENS: int = 150
+
+    # Semantic answer cache for general questions (needs the RAG model)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.92
+    ANSWER_CACHE_SIZE: int = 1024
+    ANSWER_CACHE_TTL: float = 3600.0
+
+    # Chat records: "sync" (commit in the turn) or "write_behind" (batched,
+    # background thread; records are lost if the process dies before a flush)
+    DB_WRITE_MODE: str = "sync"
+    WRITE_BEHIND_QUEUE_SIZE: int = 1000
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.2
+
+    # Dashboard counters are rolled up into the dailycounter table this often
+    STATS_FLUSH_INTERVAL: float = 5.0
+
+    # Sampling profiler (off until started from /api/profiler/start)
+    PROFILE_DIR: str = "app/data/profiles"
+    PROFILE_SAMPLE_RATE: float = 0.1
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_SECONDS: float = 300.0
 
     # RAG paths
     RAG_DOCS_PATH: str = "app/data/rag_docs"
     VECTOR_STORE_PATH: str = "app/data/vectorstore"
+    RAG_CHUNK_SIZE: int = 500
+    RAG_CHUNK_OVERLAP: int = 80
+    RAG_TOP_K: int = 3
+    RAG_ANN_MIN_ROWS: int = 20000
+    RAG_ANN_NPROBE: int = 16
+    RAG_CACHE_SIZE: int = 2048
+    RAG_CACHE_TTL: float = 3600.0
+    RAG_ENCODE_BATCH: int = 256
+    # False when the index is built offline (python -m app.services.rag_engine):
+    # workers then only load it, and pick up new builds every RAG_RELOAD_INTERVAL s
+    RAG_SYNC_ON_START: bool = True
+    RAG_RELOAD_INTERVAL: float = 5.0
 
     class Config:
         env_file = ".env"
@@ -1,19 +1,86 @@
 # app/database.py
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel, create_engine, Session
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True
-)
 
+def make_engine(url: str, tuned: bool = True) -> Engine:
+    """
+    Engine for `url`. With `tuned`, SQLite runs in WAL mode (readers don't
+    block the writer), waits on locks instead of failing, and fsyncs once
+    per checkpoint rather than once per commit.
+    """
+    kwargs = {"echo": False, "pool_pre_ping": True}
+    is_sqlite = url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in url or url.rstrip("/") == "sqlite:")
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    if is_sqlite:
+        # sessions are used from turn / writer threads
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if tuned and not in_memory:
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    db_engine = create_engine(url, **kwargs)
+
+    if is_sqlite and tuned:
+        @event.listens_for(db_engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            if not in_memory:
+                cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cur.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cur.close()
+
+    return db_engine
+
+
+engine = make_engine(settings.DATABASE_URL)
+
+
+def _register_models():
+    # Register every table (and its foreign-key targets) before create_all
+    from app.models import (  # noqa: F401
+        user_models, rental_models, repair_models, provider_models, property_models, stats_models
+    )
+
+
+def migrate(db_engine: Engine | None = None) -> list:
+    """
+    Brings an existing database up to the models: create_all only creates
+    missing tables, so indexes added to existing tables are created here.
+    Returns the names of the indexes it created.
+    """
+    db_engine = db_engine or engine
+    _register_models()
+
+    created = []
+    with db_engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {ix["name"] for ix in db_engine.dialect.get_indexes(conn, table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=conn)
+                    created.append(index.name)
+
+    for name in created:
+        print(f"🛠 Created index {name}")
+    return created
+
+
+def create_db_and_tables(db_engine: Engine | None = None):
+    db_engine = db_engine or engine
+    _register_models()
+    SQLModel.metadata.create_all(db_engine)
+    migrate(db_engine)
 
 
 def get_session():
@@ -1,16 +1,23 @@
 # app/main.py
 
-import json
+import asyncio
 import uuid
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.database import create_db_and_tables, get_session
+from app.config import get_settings
 from app.services.conversation_engine import ConversationEngine
-from app.models.chat_models import ChatClientMessage
+from app.services.turn_executor import TurnExecutor, ExecutorBusy
+from app.services.session_store import SessionConflict
+from app.services.stats import counters as stats_counters
+from app.models.chat_models import ChatBotResponse, ChatClientMessage
+from app.utils.metrics import CONTENT_TYPE, SESSIONS, SESSIONS_ACTIVE, registry
+from app.utils.profiler import ProfilerMiddleware, profiler
+from app.utils.wire import decode_message, delta_frame, encode_response, freeze, session_frame
 
 # ✅ ADD THIS IMPORT:
 from app.router import router   # <-- Here
@@ -23,11 +30,17 @@ app = FastAPI(title="Real Estate AI Assistant")
 # ✅ REGISTER THE ROUTER IMMEDIATELY AFTER APP CREATION:
 app.include_router(router)      # <-- Here
 
+# Samples HTTP requests while the profiler is on (/api/profiler/start)
+app.add_middleware(ProfilerMiddleware)
+
 # Static & Templates
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
+settings = get_settings()
+
 conversation_engine = ConversationEngine()
+turn_executor = TurnExecutor()
 
 # -------------------------------------------------------------
 # STARTUP EVENT → INIT DB
@@ -35,6 +48,22 @@ conversation_engine = ConversationEngine()
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    stats_counters.start()
+
+    if settings.WARMUP_ON_STARTUP:
+        conversation_engine.warm_up()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    turn_executor.shutdown()
+    if conversation_engine.writer:
+        conversation_engine.writer.close()
+    conversation_engine.close_components()
+    stats_counters.close()
+    profiler.stop()
+    await conversation_engine.ollama.aclose()
+    conversation_engine.ollama.close()
 
 
 # -------------------------------------------------------------
@@ -61,32 +90,216 @@ def health():
     return {"status": "ok"}
 
 
+# -------------------------------------------------------------
+# READINESS: per-component load state. Chat flows that don't need
+# RAG (onboarding, rentals, repairs) work before RAG is ready.
+# -------------------------------------------------------------
+@app.get("/ready")
+def ready():
+    components = conversation_engine.readiness()
+    core_ready = all(
+        c["state"] == "ready" for name, c in components.items() if name != "rag"
+    )
+    return JSONResponse(
+        status_code=200 if core_ready else 503,
+        content={
+            "ready": core_ready,
+            "rag_ready": components["rag"]["state"] == "ready",
+            "components": components,
+        },
+    )
+
+
+# -------------------------------------------------------------
+# PROMETHEUS: instrumented latencies + service state read at scrape
+# -------------------------------------------------------------
+@registry.collector
+def _service_metrics():
+    gate = conversation_engine.llm_gate
+    yield "llm_in_flight", "gauge", "LLM generations running", [({}, gate.running)]
+    yield "llm_waiting", "gauge", "Callers queued for an LLM slot", [({}, gate.waiting)]
+    yield "llm_gate_total", "counter", "LLM gate admissions by outcome", [
+        ({"result": "coalesced"}, gate.coalesced),
+        ({"result": "rejected"}, gate.rejected),
+        ({"result": "queue_timeout"}, gate.queue_timeouts),
+    ]
+
+    ex = turn_executor.metrics()
+    yield "turn_executor_tasks", "gauge", "Chat turns in the executor by state", [
+        ({"state": state}, ex[state]) for state in ("waiting", "queued", "running", "in_loop")
+    ]
+    yield "turn_executor_rejected_total", "counter", "Turns refused (executor busy)", [({}, ex["rejected"])]
+
+    caches = []
+    rag = conversation_engine.components["rag"].peek()
+    if rag:
+        caches += [("rag_embeddings", rag.embedding_cache), ("rag_retrieval", rag.hit_cache)]
+    if conversation_engine.answer_cache:
+        caches.append(("answers", conversation_engine.answer_cache))
+    yield "cache_requests_total", "counter", "Cache lookups by cache and result", [
+        ({"cache": name, "result": result}, count)
+        for name, cache in caches
+        for result, count in (("hit", cache.hits), ("miss", cache.misses))
+    ]
+
+    writer = conversation_engine.writer
+    if writer:
+        yield "write_behind_pending", "gauge", "Records queued for the writer", [({}, writer.queue.qsize())]
+        yield "write_behind_written_total", "counter", "Records written by the writer", [({}, writer.written)]
+        yield "write_behind_failed_total", "counter", "Records the writer failed to write", [({}, writer.failed)]
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/metrics/executor")
+def executor_metrics():
+    return turn_executor.metrics()
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    rag = conversation_engine.components["rag"].peek()
+    cache = conversation_engine.answer_cache
+    return {
+        "rag": rag.cache_stats() if rag else None,
+        "answers": cache.stats() if cache else None,
+    }
+
+
+@app.get("/metrics/writer")
+def writer_metrics():
+    writer = conversation_engine.writer
+    return writer.metrics() if writer else {"mode": "sync"}
+
+
+@app.get("/metrics/llm")
+def llm_metrics():
+    return conversation_engine.llm_gate.metrics()
+
+
+@app.get("/metrics/sessions")
+def session_metrics():
+    return conversation_engine.sessions.stats()
+
+
+@app.get("/metrics/prompts")
+def prompt_metrics():
+    return conversation_engine.prompt_stats.stats()
+
+
+# -------------------------------------------------------------
+# ONE CHAT TURN (runs in a turn_executor thread)
+# -------------------------------------------------------------
+def run_turn(session_id: str, msg: ChatClientMessage, on_token=None, st=None):
+    with next(get_session()) as db:
+        return conversation_engine.handle(
+            session_id=session_id,
+            message=msg,
+            db=db,
+            on_token=on_token,
+            st=st,
+        )
+
+
+async def pooled_turn(session_id: str, msg: ChatClientMessage, send_delta, push_delta):
+    """
+    TURN_EXECUTOR=thread. Menu / form turns run in the pool. LLM turns are
+    generated on the event loop, as in inline mode, so a slow answer never
+    holds a pool thread other chats are waiting for; they still take a turn
+    slot, so both kinds share the executor's admission limit (TURN_BUSY).
+    """
+    async with turn_executor.ordered(session_id):
+        st = await asyncio.to_thread(conversation_engine.sessions.get, session_id)
+        if not conversation_engine.is_llm_turn(st, msg.text.strip()):
+            return await turn_executor.run(run_turn, session_id, msg, push_delta, st)
+
+        async with turn_executor.on_loop():
+            bot_response = await conversation_engine.aanswer(st, msg.text.strip(), on_token=send_delta)
+            await asyncio.to_thread(conversation_engine.sessions.put, session_id, st)
+        return bot_response
+
+
 # -------------------------------------------------------------
 # WEBSOCKET CHAT
 # -------------------------------------------------------------
+TURN_BUSY = freeze(ChatBotResponse(
+    text="⏳ I'm helping a lot of people right now. Please try again in a moment."
+))
+SESSION_CONFLICT = freeze(ChatBotResponse(
+    text="This conversation was updated from another window. Please send that again."
+))
+
+
+def resumable(session_id: str | None) -> bool:
+    """Only ids this server issued (UUIDs) that are still in the session store."""
+    if not session_id:
+        return False
+    try:
+        if str(uuid.UUID(session_id)) != session_id:
+            return False
+    except ValueError:
+        return False
+    return conversation_engine.sessions.exists(session_id)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     await ws.accept()
-    session_id = str(uuid.uuid4())
 
+    # ?session=<id> resumes a conversation after a dropped connection (also
+    # on another worker with a shared store). The id is sent in the first frame.
+    requested = ws.query_params.get("session")
+    resumed = await asyncio.to_thread(resumable, requested)
+    session_id = requested if resumed else str(uuid.uuid4())
+    await ws.send_text(session_frame(session_id, resumed))
+
+    loop = asyncio.get_running_loop()
+    SESSIONS.inc(resumed="true" if resumed else "false")
+    SESSIONS_ACTIVE.inc()
+
+    # Push partial LLM replies as they arrive
+    async def send_delta(chunk: str):
+        await ws.send_text(delta_frame(chunk))
+
+    # Same, called from a worker thread (waits so deltas stay ordered)
+    def push_delta(chunk: str):
+        asyncio.run_coroutine_threadsafe(send_delta(chunk), loop).result()
+
+    left = False
     try:
         while True:
-            raw = await ws.receive_text()
+            msg = decode_message(await ws.receive_text())
+
             try:
-                data = json.loads(raw)
-                msg = ChatClientMessage(**data)
-            except:
-                msg = ChatClientMessage(text=raw)
-
-            # Use thread-safe DB session
-            with next(get_session()) as db:
-                bot_response = conversation_engine.handle(
-                    session_id=session_id,
-                    message=msg,
-                    db=db
-                )
-
-            await ws.send_text(bot_response.model_dump_json())
-
-    except WebSocketDisconnect:
-        print(f"Client disconnected → session {session_id} closed.")
+                if settings.TURN_EXECUTOR == "inline":
+                    # Use thread-safe DB session
+                    with next(get_session()) as db:
+                        bot_response = await conversation_engine.ahandle(
+                            session_id=session_id,
+                            message=msg,
+                            db=db,
+                            on_token=send_delta
+                        )
+                else:
+                    bot_response = await pooled_turn(session_id, msg, send_delta, push_delta)
+            except ExecutorBusy:
+                bot_response = TURN_BUSY
+            except SessionConflict:
+                bot_response = SESSION_CONFLICT
+
+            await ws.send_text(encode_response(bot_response))
+
+    except WebSocketDisconnect as e:
+        # closed on purpose (page left) → drop the state; dropped connections
+        # keep it, for a resume, until SESSION_IDLE_TTL
+        left = e.code in (1000, 1001)
+        print(f"Client disconnected → session {session_id} {'closed' if left else 'kept for resume'}.")
+
+    finally:
+        SESSIONS_ACTIVE.dec()
+        turn_executor.forget(session_id)
+        if left:
+            conversation_engine.end_session(session_id)
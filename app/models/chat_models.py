@@ -31,3 +31,14 @@ class ChatBotResponse(BaseModel):
     options: List[ChatOption] = []
     properties: List[ChatPropertyCard] = []
     show_input: bool = True
+
+
+class ChatStreamDelta(BaseModel):
+    # Partial LLM output pushed before the final ChatBotResponse
+    delta: str
+
+
+class ChatSession(BaseModel):
+    # First frame on every connection: the id to resume with (/ws?session=<id>)
+    session: str
+    resumed: bool
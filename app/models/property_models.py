@@ -0,0 +1,31 @@
+# app/models/property_models.py
+
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class Property(SQLModel, table=True):
+    # Listing id from properties.json
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Catalogue order, used to break score ties like the in-memory engine
+    position: int
+
+    title: str
+    location: str
+    property_type: str
+    # Range prefilters for selective searches (SQLRentalEngine)
+    bedrooms: int = Field(index=True)
+    price_per_month: int = Field(index=True)
+    furnished: bool
+    has_garden: Optional[bool] = None
+    parking: Optional[bool] = None
+    url: str
+
+    # Lowercased copies for the substring matches in the scoring query
+    # (LIKE '%x%': no index helps, so none is kept)
+    location_lc: str
+    property_type_lc: str
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
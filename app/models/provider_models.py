@@ -1,7 +1,7 @@
 # app/models/provider_models.py
 
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import NamedTuple, Optional
 from datetime import datetime
 
 
@@ -15,3 +15,12 @@ class ServiceProvider(SQLModel, table=True):
     rating: float = 4.5
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ProviderMatch(NamedTuple):
+    # Immutable, allocation-free result of ProviderEngine.find_matching
+    category: str
+    name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    rating: float = 4.5
@@ -8,7 +8,7 @@ from datetime import datetime
 class RentalSearch(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
 
     location: Optional[str] = None
     bedrooms: Optional[int] = None
@@ -27,7 +27,7 @@ class RentalSearch(SQLModel, table=True):
 class RentalMatch(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
-    search_id: int = Field(foreign_key="rentalsearch.id")
+    search_id: int = Field(foreign_key="rentalsearch.id", index=True)
 
     property_id: int
     title: str
@@ -8,7 +8,7 @@ from datetime import datetime
 class RepairRequest(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
 
     category: str
     address: str
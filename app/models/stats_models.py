@@ -0,0 +1,13 @@
+# app/models/stats_models.py
+
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+
+class DailyCounter(SQLModel, table=True):
+    # One row per (day, metric, key), e.g. (2025-01-31, "searches_by_location", "london")
+    day: date = Field(primary_key=True)
+    metric: str = Field(primary_key=True)
+    key: str = Field(default="", primary_key=True)
+
+    count: int = 0
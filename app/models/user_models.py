@@ -9,7 +9,7 @@ class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
     name: str
-    phone: Optional[str] = None
+    phone: Optional[str] = Field(default=None, index=True)
     email: Optional[str] = None
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,32 +1,295 @@
 # app/router.py
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, List, Literal, Optional
 
-from app.database import get_session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, SQLModel, select
+
+from app.database import engine, get_session
 from app.models.user_models import User
 from app.models.rental_models import RentalSearch, RentalMatch
 from app.models.repair_models import RepairRequest
+from app.services.stats import counters
+from app.utils.profiler import profiler
 
 
 router = APIRouter(prefix="/api")
 
+PAGE_MAX = 1000
+EXPORT_BATCH = 1000
+
+
+# -------------------------------------------------------------
+# SHARED QUERY PARAMETERS
+# -------------------------------------------------------------
+class Page:
+    """
+    Keyset pagination on the primary key. Ids are assigned at insert time,
+    so id order is creation order; pass the previous page's `next_after`
+    as `after` to continue. Each page is an index range scan, however deep.
+    """
+
+    def __init__(
+        self,
+        after: Optional[int] = Query(None, description="Continue after this id (from next_after)"),
+        limit: int = Query(100, ge=1, le=PAGE_MAX),
+        order: Literal["asc", "desc"] = "asc",
+    ):
+        self.after = after
+        self.limit = limit
+        self.order = order
+
+
+class OffsetPage:
+    """
+    The original list parameters: a bare array, every row unless `limit`
+    is given. Kept so existing clients keep working; deep offsets scan
+    every skipped row, so new clients use the /api/v2 pages.
+    """
+
+    def __init__(
+        self,
+        offset: int = Query(0, ge=0),
+        limit: Optional[int] = Query(None, ge=1),
+    ):
+        self.offset = offset
+        self.limit = limit
+
+
+class CreatedRange:
+    def __init__(self, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def conditions(self, model) -> list:
+        out = []
+        if self.created_from is not None:
+            out.append(model.created_at >= self.created_from)
+        if self.created_to is not None:
+            out.append(model.created_at < self.created_to)
+        return out
+
+
+def _keyset(model, conditions: list, after: Optional[int], order: str, limit: int):
+    stmt = select(model).where(*conditions)
+    if after is not None:
+        stmt = stmt.where(model.id > after if order == "asc" else model.id < after)
+    return stmt.order_by(model.id.asc() if order == "asc" else model.id.desc()).limit(limit)
+
+
+def _rows(db: Session, model, conditions: list, page: OffsetPage) -> list:
+    stmt = select(model).where(*conditions).order_by(model.id.asc()).offset(page.offset)
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit)
+    return db.exec(stmt).all()
+
+
+def _page(db: Session, model, conditions: list, page: Page) -> dict:
+    rows = db.exec(_keyset(model, conditions, page.after, page.order, page.limit + 1)).all()
+    more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    return {"items": rows, "next_after": rows[-1].id if more else None}
+
+
+# -------------------------------------------------------------
+# STREAMING EXPORT (constant memory: one batch in flight at a time)
+# -------------------------------------------------------------
+def _batches(model, conditions: list, order: str) -> Iterator[List[SQLModel]]:
+    after = None
+    while True:
+        # short session per batch: no connection held while the client reads
+        with Session(engine) as db:
+            batch = db.exec(_keyset(model, conditions, after, order, EXPORT_BATCH)).all()
+        if not batch:
+            return
+        yield batch
+        after = batch[-1].id
+
+
+def _ndjson(model, conditions: list, order: str) -> Iterator[str]:
+    for batch in _batches(model, conditions, order):
+        yield "".join(row.model_dump_json() + "\n" for row in batch)
+
+
+def _csv(model, conditions: list, order: str) -> Iterator[str]:
+    columns = list(model.model_fields)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(columns)
+    for batch in _batches(model, conditions, order):
+        for row in batch:
+            data = row.model_dump(mode="json")
+            writer.writerow(["" if data[c] is None else data[c] for c in columns])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def _export(model, name: str, conditions: list, fmt: str, order: str) -> StreamingResponse:
+    if fmt == "csv":
+        body, media_type = _csv(model, conditions, order), "text/csv"
+    else:
+        body, media_type = _ndjson(model, conditions, order), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+# -------------------------------------------------------------
+# USERS
+# -------------------------------------------------------------
+def user_filters(phone: Optional[str] = None, created: CreatedRange = Depends()) -> list:
+    out = created.conditions(User)
+    if phone:
+        out.append(User.phone == phone)
+    return out
+
+
+@router.get("/users", deprecated=True)
+def list_users(page: OffsetPage = Depends(), filters: list = Depends(user_filters),
+               db: Session = Depends(get_session)):
+    return _rows(db, User, filters, page)
+
+
+@router.get("/v2/users")
+def page_users(page: Page = Depends(), filters: list = Depends(user_filters),
+               db: Session = Depends(get_session)):
+    return _page(db, User, filters, page)
+
+
+@router.get("/users/export")
+def export_users(format: ExportFormat = "ndjson", order: Literal["asc", "desc"] = "asc",
+                 filters: list = Depends(user_filters)):
+    return _export(User, "users", filters, format, order)
+
+
+# -------------------------------------------------------------
+# RENTAL SEARCHES
+# -------------------------------------------------------------
+def search_filters(user_id: Optional[int] = None, status: Optional[str] = None,
+                   location: Optional[str] = None, created: CreatedRange = Depends()) -> list:
+    out = created.conditions(RentalSearch)
+    if user_id is not None:
+        out.append(RentalSearch.user_id == user_id)
+    if status:
+        out.append(RentalSearch.status == status)
+    if location:
+        out.append(RentalSearch.location == location)
+    return out
+
+
+@router.get("/rental-searches", deprecated=True)
+def list_rental_searches(page: OffsetPage = Depends(), filters: list = Depends(search_filters),
+                         db: Session = Depends(get_session)):
+    return _rows(db, RentalSearch, filters, page)
+
+
+@router.get("/v2/rental-searches")
+def page_rental_searches(page: Page = Depends(), filters: list = Depends(search_filters),
+                         db: Session = Depends(get_session)):
+    return _page(db, RentalSearch, filters, page)
+
+
+@router.get("/rental-searches/export")
+def export_rental_searches(format: ExportFormat = "ndjson", order: Literal["asc", "desc"] = "asc",
+                           filters: list = Depends(search_filters)):
+    return _export(RentalSearch, "rental-searches", filters, format, order)
+
+
+# -------------------------------------------------------------
+# RENTAL MATCHES
+# -------------------------------------------------------------
+def match_filters(search_id: Optional[int] = None, created: CreatedRange = Depends()) -> list:
+    out = created.conditions(RentalMatch)
+    if search_id is not None:
+        out.append(RentalMatch.search_id == search_id)
+    return out
+
+
+@router.get("/rental-matches", deprecated=True)
+def list_rental_matches(page: OffsetPage = Depends(), filters: list = Depends(match_filters),
+                        db: Session = Depends(get_session)):
+    return _rows(db, RentalMatch, filters, page)
+
+
+@router.get("/v2/rental-matches")
+def page_rental_matches(page: Page = Depends(), filters: list = Depends(match_filters),
+                        db: Session = Depends(get_session)):
+    return _page(db, RentalMatch, filters, page)
+
+
+@router.get("/rental-matches/export")
+def export_rental_matches(format: ExportFormat = "ndjson", order: Literal["asc", "desc"] = "asc",
+                          filters: list = Depends(match_filters)):
+    return _export(RentalMatch, "rental-matches", filters, format, order)
+
+
+# -------------------------------------------------------------
+# REPAIRS
+# -------------------------------------------------------------
+def repair_filters(user_id: Optional[int] = None, status: Optional[str] = None,
+                   category: Optional[str] = None, created: CreatedRange = Depends()) -> list:
+    out = created.conditions(RepairRequest)
+    if user_id is not None:
+        out.append(RepairRequest.user_id == user_id)
+    if status:
+        out.append(RepairRequest.status == status)
+    if category:
+        out.append(RepairRequest.category == category)
+    return out
+
+
+@router.get("/repairs", deprecated=True)
+def list_repairs(page: OffsetPage = Depends(), filters: list = Depends(repair_filters),
+                 db: Session = Depends(get_session)):
+    return _rows(db, RepairRequest, filters, page)
+
+
+@router.get("/v2/repairs")
+def page_repairs(page: Page = Depends(), filters: list = Depends(repair_filters),
+                 db: Session = Depends(get_session)):
+    return _page(db, RepairRequest, filters, page)
+
+
+@router.get("/repairs/export")
+def export_repairs(format: ExportFormat = "ndjson", order: Literal["asc", "desc"] = "asc",
+                   filters: list = Depends(repair_filters)):
+    return _export(RepairRequest, "repairs", filters, format, order)
+
 
-@router.get("/users")
-def list_users(db: Session = Depends(get_session)):
-    return db.exec(select(User)).all()
+# -------------------------------------------------------------
+# DASHBOARD STATS (counter table only, no scans of the big tables)
+# -------------------------------------------------------------
+@router.get("/stats")
+def stats(days: int = Query(30, ge=1, le=366)):
+    return counters.summary(days)
 
 
-@router.get("/rental-searches")
-def list_rental_searches(db: Session = Depends(get_session)):
-    return db.exec(select(RentalSearch)).all()
+# -------------------------------------------------------------
+# PROFILER (this worker only; writes folded stacks for flame graphs)
+# -------------------------------------------------------------
+@router.get("/profiler")
+def profiler_status():
+    return profiler.status()
 
 
-@router.get("/rental-matches")
-def list_rental_matches(db: Session = Depends(get_session)):
-    return db.exec(select(RentalMatch)).all()
+@router.post("/profiler/start")
+def profiler_start(rate: Optional[float] = Query(None, gt=0, le=1, description="Fraction of turns / requests"),
+                   interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+                   duration: Optional[float] = Query(None, gt=0, description="Seconds, then stop and write")):
+    return profiler.start(rate, interval_ms, duration)
 
 
-@router.get("/repairs")
-def list_repairs(db: Session = Depends(get_session)):
-    return db.exec(select(RepairRequest)).all()
+@router.post("/profiler/stop")
+def profiler_stop():
+    return {"stopped": profiler.stop(), **profiler.status()}
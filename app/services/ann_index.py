@@ -0,0 +1,98 @@
+# app/services/ann_index.py
+
+import numpy as np
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index over L2-normalized vectors
+    (inverted file: k-means coarse quantizer, NumPy only).
+
+    Rows are bucketed by their nearest centroid. A query scores the
+    centroids, then only the rows of the `nprobe` best buckets, so search
+    cost is ~ n_lists + nprobe * N / n_lists dot products instead of N.
+    """
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids      # (n_lists, dim)
+        self.order = order              # row ids grouped by list
+        self.offsets = offsets          # list l → order[offsets[l]:offsets[l + 1]]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    # -------------------------------------------------------------
+    # BUILD
+    # -------------------------------------------------------------
+    @classmethod
+    def build(cls, matrix: np.ndarray, n_lists: int | None = None, iters: int = 8,
+              sample: int = 50_000, seed: int = 0) -> "IVFIndex":
+        n = len(matrix)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+
+        train = matrix[rng.choice(n, size=min(n, sample), replace=False)]
+        centroids = np.array(train[rng.choice(len(train), size=n_lists, replace=False)], dtype=np.float32)
+
+        # spherical k-means on the sample
+        for _ in range(iters):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = train[assign == c]
+                if len(members):
+                    v = members.sum(axis=0)
+                    centroids[c] = v / (np.linalg.norm(v) or 1.0)
+
+        # assign every row, in blocks to bound memory
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 65_536):
+            block = np.asarray(matrix[start:start + 65_536], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1)).astype(np.int64)
+        return cls(centroids, order, offsets)
+
+    # -------------------------------------------------------------
+    # SEARCH
+    # -------------------------------------------------------------
+    def search(self, matrix: np.ndarray, q: np.ndarray, k: int, nprobe: int = 16):
+        """
+        Returns (row ids, scores) of the approximate top-k rows, best first.
+        """
+        nprobe = min(nprobe, self.n_lists)
+        cent_scores = self.centroids @ q
+        lists = np.argpartition(-cent_scores, nprobe - 1)[:nprobe]
+
+        cand = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+        if len(cand) == 0:
+            return cand, np.zeros(0, dtype=np.float32)
+
+        cand.sort()  # sequential reads from the mmap'd matrix
+        scores = matrix[cand] @ q
+        top = top_k(scores, k)
+        return cand[top], scores[top]
+
+    # -------------------------------------------------------------
+    # PERSISTENCE
+    # -------------------------------------------------------------
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        data = np.load(path)
+        return cls(data["centroids"], data["order"], data["offsets"])
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first (argpartition + small sort).
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
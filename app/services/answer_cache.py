@@ -0,0 +1,156 @@
+# app/services/answer_cache.py
+
+import threading
+import time
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class SemanticAnswerCache:
+    """
+    LLM answers keyed by question embedding + the documents retrieved for it.
+
+    A lookup hits when a cached question has cosine similarity >= `threshold`
+    with the new one AND the same retrieved documents (so an answer is never
+    reused across different grounding). Entries expire after `ttl` seconds,
+    the least recently used is evicted beyond `max_size`, and everything is
+    dropped when the RAG index version changes.
+
+    Embeddings live in one preallocated matrix: a lookup is a single
+    matrix-vector product over at most `max_size` rows.
+    """
+
+    def __init__(self, threshold: float | None = None, max_size: int | None = None, ttl: float | None = None):
+        self.threshold = settings.ANSWER_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_size = max_size or settings.ANSWER_CACHE_SIZE
+        self.ttl = settings.ANSWER_CACHE_TTL if ttl is None else ttl
+
+        self._emb: Optional[np.ndarray] = None        # (max_size, dim), allocated on first put
+        self._valid = np.zeros(self.max_size, dtype=bool)
+        self._expires = np.zeros(self.max_size, dtype=np.float64)
+        self._used = np.zeros(self.max_size, dtype=np.int64)
+        self._docs: List[Hashable] = [None] * self.max_size
+        self._answers: List[Optional[str]] = [None] * self.max_size
+        self._tick = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._hit_similarity = 0.0
+
+    # -------------------------------------------------------------
+    # INVALIDATION
+    # -------------------------------------------------------------
+    def sync_version(self, version):
+        """Clears the cache when the RAG corpus (index version) changed."""
+        if version == self._version:
+            return
+        with self._lock:
+            if self._version is not None and self._valid.any():
+                self._clear()
+                self.invalidations += 1
+            self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._valid[:] = False
+        self._docs = [None] * self.max_size
+        self._answers = [None] * self.max_size
+
+    def _expire(self, now: float):
+        if not self.ttl:
+            return
+        expired = self._valid & (self._expires < now)
+        if expired.any():
+            self._valid[expired] = False
+            self.expirations += int(expired.sum())
+
+    def _similar(self, q: np.ndarray, docs: Hashable) -> tuple[int, float]:
+        """(slot, similarity) of the closest live entry with the same docs, or (-1, 0)."""
+        if self._emb is None or not self._valid.any():
+            return -1, 0.0
+
+        sims = self._emb @ q
+        sims[~self._valid] = -np.inf
+        close = np.flatnonzero(sims >= self.threshold)
+        for slot in close[np.argsort(-sims[close])]:
+            if self._docs[slot] == docs:
+                return int(slot), float(sims[slot])
+        return -1, 0.0
+
+    # -------------------------------------------------------------
+    # LOOKUP / STORE
+    # -------------------------------------------------------------
+    def get(self, q: np.ndarray, docs: Hashable) -> Optional[str]:
+        with self._lock:
+            self._expire(time.monotonic())
+            slot, similarity = self._similar(q, docs)
+            if slot < 0:
+                self.misses += 1
+                return None
+
+            self._tick += 1
+            self._used[slot] = self._tick
+            self.hits += 1
+            self._hit_similarity += similarity
+            return self._answers[slot]
+
+    def put(self, q: np.ndarray, docs: Hashable, answer: str):
+        with self._lock:
+            if self._emb is None:
+                self._emb = np.zeros((self.max_size, len(q)), dtype=np.float32)
+
+            now = time.monotonic()
+            self._expire(now)
+
+            # replace a near-duplicate, else take a free slot, else the LRU one
+            slot, _ = self._similar(q, docs)
+            if slot < 0:
+                free = np.flatnonzero(~self._valid)
+                if len(free):
+                    slot = int(free[0])
+                else:
+                    slot = int(np.argmin(self._used))
+                    self.evictions += 1
+
+            self._tick += 1
+            self._emb[slot] = q
+            self._docs[slot] = docs
+            self._answers[slot] = answer
+            self._expires[slot] = now + self.ttl if self.ttl else 0.0
+            self._used[slot] = self._tick
+            self._valid[slot] = True
+            self.stores += 1
+
+    # -------------------------------------------------------------
+    # METRICS
+    # -------------------------------------------------------------
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": int(self._valid.sum()),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "avg_hit_similarity": round(self._hit_similarity / self.hits, 4) if self.hits else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
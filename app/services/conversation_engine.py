@@ -1,5 +1,9 @@
 # app/services/conversation_engine.py
 
+import asyncio
+import time
+from contextlib import contextmanager
+
 from app.models.chat_models import (
     ChatBotResponse,
     ChatClientMessage,
@@ -8,49 +12,166 @@ from app.models.chat_models import (
 )
 
 from app.models.user_models import User
-from app.services.rental_engine import RentalEngine
+from app.services.rental_engine import RentalEngine, make_rental_engine
 from app.services.repair_engine import RepairEngine
 from app.services.provider_engine import ProviderEngine
 from app.services.rag_engine import RAGEngine
-from app.services.ollama_client import OllamaClient
+from app.services.ollama_client import ERROR_REPLY, TIMEOUT_REPLY, OllamaClient
+from app.services.llm_gate import BUSY_REPLY, LLMBusy, LLMGate
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.conversation_memory import PromptStats
+from app.services.session_store import SessionState, make_session_store
+from app.services.write_behind import WriteBehindWriter, WriteJob
+from app.config import get_settings
+
+from app.utils.helpers import Lazy
+from app.utils.profiler import profiler
+from app.utils.metrics import (
+    DB_SAVE_SECONDS, LLM_CALLS, LLM_GENERATE_SECONDS, RENTAL_MATCH_SECONDS, TURN_SECONDS, TURNS_IN_FLIGHT,
+    stage as metrics_stage,
+)
+from app.utils.text_cleaner import estimate_tokens
+from app.utils.wire import freeze
 
 from sqlmodel import select
 from app.database import Session
 
+settings = get_settings()
+
+
+# -------------------------------------------------------------
+# STATIC REPLIES (built and serialized once, shared by every session)
+# -------------------------------------------------------------
+def _static(text: str, options=()) -> ChatBotResponse:
+    return freeze(ChatBotResponse(text=text, options=[ChatOption(label=l, value=v) for l, v in options]))
+
+
+INTENT_OPTIONS = [
+    ("🏠 Rent a Property", "rent"),
+    ("🛠 Request a Repair / Service", "repair"),
+    ("💬 General Questions", "general"),
+]
+AGAIN_OPTIONS = [
+    ("🏠 Rent a Property", "rent"),
+    ("🛠 Request Another Repair", "repair"),
+    ("🏠 Main Menu", "menu"),
+]
+
+MAIN_MENU = _static("What would you like help with today?", INTENT_OPTIONS)
+WELCOME = _static("👋 Hi! I’m your Property Assistant.\nWhat’s your *name*?")
+ASK_EMAIL = _static("Great! What’s your *email address*?")
+ONBOARDED = _static("Thanks! What would you like help with today?", INTENT_OPTIONS)
+ASK_AREA = _static("Great! Which *area or postcode* are you interested in?")
+ASK_AREA_AGAIN = _static("Sure! Which *area or postcode* are you interested in?")
+ASK_REPAIR_CATEGORY = _static(
+    "What type of issue are you having?",
+    [(f"🔧 {c}", c) for c in RepairEngine.REPAIR_CATEGORIES],
+)
+CHOOSE_OPTION = _static("Please choose an option.")
+NOT_UNDERSTOOD = _static("I didn't understand that.")
+
+ASK_PROPERTY_TYPE = _static("What type of property?", [
+    ("🏡 House", "house"),
+    ("🏢 Flat", "flat"),
+    ("🏙 Apartment", "apartment"),
+    ("🏬 Studio", "studio"),
+])
+ASK_BEDROOMS = _static("How many bedrooms?", [(str(i), str(i)) for i in [1, 2, 3, 4]])
+ASK_BUDGET = _static("Your *maximum monthly budget*?")
+ASK_FURNISHED = _static("Do you prefer furnished?", [
+    ("✅ Furnished", "furnished"),
+    ("❌ Unfurnished", "unfurnished"),
+    ("🤷 Doesn't matter", "none"),
+])
+ASK_GARDEN = _static("Garden needed?", [("🌿 Yes", "yes"), ("❌ No", "no")])
+ASK_PARKING = _static("Parking needed?", [("🚗 Yes", "yes"), ("❌ No", "no")])
+RESULT_OPTIONS = [
+    ChatOption(label="🔎 New Search", value="new search"),
+    ChatOption(label="🏠 Main Menu", value="menu"),
+]
+
+ASK_ADDRESS = _static("What is the *address* of the property?")
+ASK_DESCRIPTION = _static("Please describe the issue in detail.")
+REPAIR_LOGGED = _static("Your repair request is logged. Anything else?", AGAIN_OPTIONS)
+REPAIR_AGAIN_OPTIONS = REPAIR_LOGGED.options
+
 
 class ConversationEngine:
 
     def __init__(self):
-        self.state = {}
-        self.rag = RAGEngine()
-        self.rental = RentalEngine()
+        self.sessions = make_session_store()
+        self.prompt_stats = PromptStats()
+        self.answer_cache = SemanticAnswerCache() if settings.ANSWER_CACHE_ENABLED else None
         self.repair = RepairEngine()
-        self.providers = ProviderEngine()
         self.ollama = OllamaClient()
+        self.llm_gate = LLMGate()
+
+        # Background batched writes (None → commit inside the turn)
+        self.writer = WriteBehindWriter() if settings.DB_WRITE_MODE == "write_behind" else None
+
+        # Heavy components: built on first use or by warm_up()
+        self.components = {
+            "rag": Lazy("rag", RAGEngine),
+            "rental": Lazy("rental", make_rental_engine),
+            "providers": Lazy("providers", ProviderEngine),
+        }
+
+    @property
+    def rag(self) -> RAGEngine:
+        return self.components["rag"].get()
+
+    @property
+    def rental(self) -> RentalEngine:
+        return self.components["rental"].get()
+
+    @property
+    def providers(self) -> ProviderEngine:
+        return self.components["providers"].get()
+
+    def warm_up(self):
+        """Starts loading every component in the background."""
+        for component in self.components.values():
+            if component.state == "pending":
+                component.start()
+
+    def close_components(self):
+        """Stops the background threads of the components loaded so far."""
+        for component in self.components.values():
+            close = getattr(component.peek(), "close", None)
+            if close:
+                close()
+
+    def readiness(self) -> dict:
+        return {name: c.status() for name, c in self.components.items()}
 
     # -------------------------------------------------------------
     # INTERNAL HELPERS
     # -------------------------------------------------------------
-    def _get_state(self, session_id: str):
-        if session_id not in self.state:
-            self.state[session_id] = {
-                "stage": "start",
-                "user_id": None,
-                "history": "",
-                "rental": {},
-                "repair": {},
-            }
-        return self.state[session_id]
+    def _get_state(self, session_id: str) -> SessionState:
+        return self.sessions.get(session_id)
+
+    def end_session(self, session_id: str):
+        self.sessions.discard(session_id)
 
     def _set_stage(self, st, stage: str):
-        st["stage"] = stage
+        st.stage = stage
 
     # -------------------------------------------------------------
     # LLM + RAG
     # -------------------------------------------------------------
-    def ask_llm(self, user_message: str, st) -> str:
+    def _build_prompt(self, user_message: str, st) -> tuple[str, int]:
+
+        # Don't hold the reply hostage to a RAG index that is still warming,
+        # but start loading it (no warm-up) so later questions get it
+        rag = self.components["rag"]
+        if rag.state == "pending":
+            rag.start()
+        if rag.ready:
+            rag_context = self.rag.answer(user_message)
+        else:
+            rag_context = "(documentation is still loading – answer from general knowledge)"
 
-        rag_context = self.rag.answer(user_message)
+        history, history_tokens = st.memory.render()
 
         prompt = f"""
 You are a professional Real Estate & Property Services Assistant.
@@ -65,91 +186,213 @@ RAG context:
 {rag_context}
 
 Conversation history:
-{st.get("history", "")}
+{history}
 
 User message:
 {user_message}
 
 Your response:
 """
+        return prompt, history_tokens
+
+    def _cache_key(self, user_message: str, st):
+        """
+        (question embedding, retrieved chunk hashes) for the answer cache,
+        or None while there is no cache or no embedding model yet.
+
+        Only for a session's first LLM question: later prompts include the
+        conversation history, so their answers (e.g. "how much would that
+        cost?") may depend on it and must not be served to anyone else.
+        """
+        if self.answer_cache is None or len(st.memory) or not self.components["rag"].ready:
+            return None
+
+        rag = self.rag
+        self.answer_cache.sync_version(rag.store.version)
+        docs = tuple(h["hash"] for h in rag.retrieve(user_message))
+        return rag.embed_query(user_message), docs
+
+    def _cache_answer(self, key, reply: str):
+        if key is not None and reply and reply not in (ERROR_REPLY, TIMEOUT_REPLY):
+            self.answer_cache.put(*key, reply)
+
+    def _timed(self, prompt: str, history_tokens: int, started: float, reply: str):
+        elapsed = time.perf_counter() - started
+        self.prompt_stats.record(estimate_tokens(prompt), history_tokens, elapsed)
+        LLM_GENERATE_SECONDS.observe(elapsed)
+        LLM_CALLS.inc(result="error" if reply == ERROR_REPLY else "timeout" if reply == TIMEOUT_REPLY else "ok")
+
+    def ask_llm(self, user_message: str, st, on_token=None) -> str:
+        key = self._cache_key(user_message, st)
+        cached = self.answer_cache.get(*key) if key else None
+        if cached is not None:
+            st.memory.add(user_message, cached)
+            return cached
+
+        prompt, history_tokens = self._build_prompt(user_message, st)
+
+        def generate(deadline: float) -> str:
+            started = time.perf_counter()
+            reply = self.ollama.generate(prompt, on_token=on_token, deadline=deadline)
+            self._timed(prompt, history_tokens, started, reply)
+            return reply
+
+        # identical prompts in flight share one generation
+        try:
+            reply = self.llm_gate.run(prompt, generate)
+        except LLMBusy:
+            LLM_CALLS.inc(result="busy")
+            return BUSY_REPLY
+
+        st.memory.add(user_message, reply)
+        self._cache_answer(key, reply)
+        return reply
 
-        reply = self.ollama.generate(prompt)
-        st["history"] += f"User: {user_message}\nAssistant: {reply}\n"
+    async def ask_llm_async(self, user_message: str, st, on_token=None) -> str:
+        # retrieval + embedding are CPU work: keep them off the event loop
+        key = await asyncio.to_thread(self._cache_key, user_message, st)
+        cached = self.answer_cache.get(*key) if key else None
+        if cached is not None:
+            st.memory.add(user_message, cached)
+            return cached
+
+        prompt, history_tokens = await asyncio.to_thread(self._build_prompt, user_message, st)
+
+        async def generate(deadline: float) -> str:
+            started = time.perf_counter()
+            reply = await self.ollama.agenerate(prompt, on_token=on_token, deadline=deadline)
+            self._timed(prompt, history_tokens, started, reply)
+            return reply
+
+        try:
+            reply = await self.llm_gate.arun(prompt, generate)
+        except LLMBusy:
+            LLM_CALLS.inc(result="busy")
+            return BUSY_REPLY
+
+        st.memory.add(user_message, reply)
+        self._cache_answer(key, reply)
         return reply
 
+    def is_llm_turn(self, st, text: str) -> bool:
+        """
+        True when handle() would answer this message with the LLM.
+        """
+        low = text.lower()
+        stage = st.stage.lower()
+
+        if low in ["menu", "main menu", "restart", "home"]:
+            return False
+
+        if stage == "choose_intent":
+            if low in ["new search", "rent again"] or "rent" in low:
+                return False
+            if "repair" in low or "service" in low:
+                return False
+            return "general" in low
+
+        return stage not in ["start", "ask_name", "ask_phone", "ask_email"] \
+            and not stage.startswith("rental") \
+            and not stage.startswith("repair")
+
     # -------------------------------------------------------------
     # USER CREATION
     # -------------------------------------------------------------
     def _ensure_user(self, db: Session, st, name, phone=None, email=None):
-        if st.get("user_id"):
-            return st["user_id"]
+        if st.user_id:
+            return st.user_id
 
         q = select(User).where(User.phone == phone)
         user = db.exec(q).first()
 
+        # new user: the writer inserts it, later jobs find it by phone
+        if not user and self.writer:
+            self.writer.submit_user(name, phone, email)
+            return None
+
         if not user:
             user = User(name=name, phone=phone, email=email)
             db.add(user)
             db.commit()
             db.refresh(user)
 
-        st["user_id"] = user.id
+        st.user_id = user.id
         return user.id
 
     # -------------------------------------------------------------
-    # MAIN ENTRY POINT
+    # PERSISTENCE
     # -------------------------------------------------------------
-    def handle(self, session_id: str, message: ChatClientMessage, db: Session):
+    def _save(self, db: Session, st, kind: str, build):
+        """Writes build(user_id) now, or hands it to the write-behind queue."""
+        if self.writer:
+            # the user was queued at onboarding: take its id once written
+            if st.user_id is None:
+                st.user_id = self.writer.user_id(st.user_phone)
+            with DB_SAVE_SECONDS.time(kind=kind, mode="write_behind"):
+                self.writer.submit(WriteJob(kind, build, st.user_id, st.user_phone))
+            return
+
+        with DB_SAVE_SECONDS.time(kind=kind, mode="sync"):
+            row = build(st.user_id)
+            db.add(row)
+            db.commit()
 
-        st = self._get_state(session_id)
+    # -------------------------------------------------------------
+    # MAIN ENTRY POINT
+    # -------------------------------------------------------------
+    @contextmanager
+    def _instrumented(self, st):
+        """Turn metrics (by the stage the turn starts in), and profiling if sampled."""
+        token = metrics_stage.set(st.stage)
+        try:
+            with TURNS_IN_FLIGHT.track(), TURN_SECONDS.time(), profiler.unit("turn", st.stage):
+                yield
+        finally:
+            metrics_stage.reset(token)
+
+    def handle(self, session_id: str, message: ChatClientMessage, db: Session, on_token=None, st=None):
+        """One turn; `st` when the caller already loaded the session."""
+        st = st or self._get_state(session_id)
+        with self._instrumented(st):
+            response = self._handle(st, message, db, on_token)
+        self.sessions.put(session_id, st)
+        return response
+
+    def _handle(self, st: SessionState, message: ChatClientMessage, db: Session, on_token=None):
         text = message.text.strip()
-        stage = st["stage"].lower()
+        stage = st.stage.lower()
 
         # ---------------------------------------------------------
         # UNIVERSAL MAIN MENU RESET
         # ---------------------------------------------------------
         if text.lower() in ["menu", "main menu", "restart", "home"]:
             self._set_stage(st, "choose_intent")
-            return ChatBotResponse(
-                text="What would you like help with today?",
-                options=[
-                    ChatOption(label="🏠 Rent a Property", value="rent"),
-                    ChatOption(label="🛠 Request a Repair / Service", value="repair"),
-                    ChatOption(label="💬 General Questions", value="general"),
-                ]
-            )
+            return MAIN_MENU
 
         # ---------------------------------------------------------
         # ONBOARDING FLOW
         # ---------------------------------------------------------
         if stage == "start":
             self._set_stage(st, "ask_name")
-            return ChatBotResponse(text="👋 Hi! I’m your Property Assistant.\nWhat’s your *name*?")
+            return WELCOME
 
         if stage == "ask_name":
-            st["user_name"] = text
+            st.user_name = text
             self._set_stage(st, "ask_phone")
             return ChatBotResponse(text=f"Nice to meet you, {text}! 📱\nYour *phone number*?")
 
         if stage == "ask_phone":
-            st["user_phone"] = text
+            st.user_phone = text
             self._set_stage(st, "ask_email")
-            return ChatBotResponse(text="Great! What’s your *email address*?")
+            return ASK_EMAIL
 
         if stage == "ask_email":
-            st["user_email"] = text
+            st.user_email = text
 
-            self._ensure_user(db, st, st["user_name"], st["user_phone"], st["user_email"])
+            self._ensure_user(db, st, st.user_name, st.user_phone, st.user_email)
 
             self._set_stage(st, "choose_intent")
-            return ChatBotResponse(
-                text="Thanks! What would you like help with today?",
-                options=[
-                    ChatOption(label="🏠 Rent a Property", value="rent"),
-                    ChatOption(label="🛠 Request a Repair / Service", value="repair"),
-                    ChatOption(label="💬 General Questions", value="general"),
-                ]
-            )
+            return ONBOARDED
 
         # ---------------------------------------------------------
         # INTENT SELECTION
@@ -160,30 +403,27 @@ Your response:
 
             # NEW SEARCH
             if low in ["new search", "rent again"]:
-                st["rental"] = {}
+                st.rental = {}
                 self._set_stage(st, "rental_location")
-                return ChatBotResponse(text="Sure! Which *area or postcode* are you interested in?")
+                return ASK_AREA_AGAIN
 
             # RENT
             if "rent" in low:
-                st["rental"] = {}
+                st.rental = {}
                 self._set_stage(st, "rental_location")
-                return ChatBotResponse(text="Great! Which *area or postcode* are you interested in?")
+                return ASK_AREA
 
             # REPAIR
             if "repair" in low or "service" in low:
-                st["repair"] = {}
+                st.repair = {}
                 self._set_stage(st, "repair_category")
-                return ChatBotResponse(
-                    text="What type of issue are you having?",
-                    options=[ChatOption(label=f"🔧 {c}", value=c) for c in self.repair.REPAIR_CATEGORIES]
-                )
+                return ASK_REPAIR_CATEGORY
 
             # GENERAL QUESTIONS → LLM
             if "general" in low:
-                return ChatBotResponse(text=self.ask_llm(text, st))
+                return ChatBotResponse(text=self.ask_llm(text, st, on_token=on_token))
 
-            return ChatBotResponse(text="Please choose an option.")
+            return CHOOSE_OPTION
 
         # -------------------- RENTAL LOGIC ------------------------
         if stage.startswith("rental"):
@@ -194,7 +434,30 @@ Your response:
             return self._handle_repair(st, message, db)
 
         # FALLBACK → LLM
-        return ChatBotResponse(text=self.ask_llm(text, st))
+        return ChatBotResponse(text=self.ask_llm(text, st, on_token=on_token))
+
+    # -------------------------------------------------------------
+    # ASYNC ENTRY POINT (streams LLM tokens, never waits on Ollama
+    # synchronously inside the event loop)
+    # -------------------------------------------------------------
+    async def ahandle(self, session_id: str, message: ChatClientMessage, db: Session, on_token=None):
+
+        st = self._get_state(session_id)
+        text = message.text.strip()
+
+        if self.is_llm_turn(st, text):
+            response = await self.aanswer(st, text, on_token=on_token)
+        else:
+            with self._instrumented(st):
+                response = self._handle(st, message, db)
+
+        self.sessions.put(session_id, st)
+        return response
+
+    async def aanswer(self, st: SessionState, text: str, on_token=None) -> ChatBotResponse:
+        """An LLM turn (see is_llm_turn); the caller loads and stores `st`."""
+        with self._instrumented(st):
+            return ChatBotResponse(text=await self.ask_llm_async(text, st, on_token=on_token))
 
     # -------------------------------------------------------------
     # RENTAL FLOW HANDLER
@@ -203,87 +466,59 @@ Your response:
         text = message.text.strip()
 
         # LOCATION
-        if st["stage"] == "rental_location":
-            st["rental"]["location"] = text
+        if st.stage == "rental_location":
+            st.rental["location"] = text
             self._set_stage(st, "rental_property_type")
-            return ChatBotResponse(
-                text="What type of property?",
-                options=[
-                    ChatOption(label="🏡 House", value="house"),
-                    ChatOption(label="🏢 Flat", value="flat"),
-                    ChatOption(label="🏙 Apartment", value="apartment"),
-                    ChatOption(label="🏬 Studio", value="studio"),
-                ]
-            )
+            return ASK_PROPERTY_TYPE
 
         # PROPERTY TYPE
-        if st["stage"] == "rental_property_type":
-            st["rental"]["property_type"] = text.lower()
+        if st.stage == "rental_property_type":
+            st.rental["property_type"] = text.lower()
             self._set_stage(st, "rental_bedrooms")
-            return ChatBotResponse(
-                text="How many bedrooms?",
-                options=[ChatOption(label=str(i), value=str(i)) for i in [1, 2, 3, 4]]
-            )
+            return ASK_BEDROOMS
 
         # BEDROOM COUNT
-        if st["stage"] == "rental_bedrooms":
+        if st.stage == "rental_bedrooms":
             try:
-                st["rental"]["bedrooms"] = int(text.replace("+", ""))
+                st.rental["bedrooms"] = int(text.replace("+", ""))
             except:
-                st["rental"]["bedrooms"] = 1
+                st.rental["bedrooms"] = 1
             self._set_stage(st, "rental_budget")
-            return ChatBotResponse(text="Your *maximum monthly budget*?")
+            return ASK_BUDGET
 
         # BUDGET
-        if st["stage"] == "rental_budget":
+        if st.stage == "rental_budget":
             digits = ''.join([d for d in text if d.isdigit()])
-            st["rental"]["budget"] = int(digits) if digits else None
+            st.rental["budget"] = int(digits) if digits else None
             self._set_stage(st, "rental_furnished")
-            return ChatBotResponse(
-                text="Do you prefer furnished?",
-                options=[
-                    ChatOption(label="✅ Furnished", value="furnished"),
-                    ChatOption(label="❌ Unfurnished", value="unfurnished"),
-                    ChatOption(label="🤷 Doesn't matter", value="none"),
-                ]
-            )
+            return ASK_FURNISHED
 
         # FURNISHED
-        if st["stage"] == "rental_furnished":
+        if st.stage == "rental_furnished":
             if "furnished" in text.lower():
-                st["rental"]["furnished"] = True
+                st.rental["furnished"] = True
             elif "unfurnished" in text.lower():
-                st["rental"]["furnished"] = False
+                st.rental["furnished"] = False
             else:
-                st["rental"]["furnished"] = None
+                st.rental["furnished"] = None
 
             self._set_stage(st, "rental_garden")
-            return ChatBotResponse(
-                text="Garden needed?",
-                options=[
-                    ChatOption(label="🌿 Yes", value="yes"),
-                    ChatOption(label="❌ No", value="no"),
-                ]
-            )
+            return ASK_GARDEN
 
         # GARDEN
-        if st["stage"] == "rental_garden":
-            st["rental"]["garden"] = ("yes" in text.lower())
+        if st.stage == "rental_garden":
+            st.rental["garden"] = ("yes" in text.lower())
             self._set_stage(st, "rental_parking")
-            return ChatBotResponse(
-                text="Parking needed?",
-                options=[
-                    ChatOption(label="🚗 Yes", value="yes"),
-                    ChatOption(label="❌ No", value="no"),
-                ]
-            )
+            return ASK_PARKING
 
         # FINAL STEP → MATCH
-        if st["stage"] == "rental_parking":
-            st["rental"]["parking"] = ("yes" in text.lower())
+        if st.stage == "rental_parking":
+            st.rental["parking"] = ("yes" in text.lower())
 
-            results = self.rental.find_matches(st["rental"])
-            self.rental.save_search(db, st["user_id"], st["rental"], results)
+            with RENTAL_MATCH_SECONDS.time():
+                results = self.rental.find_matches(st.rental, db)
+            req = dict(st.rental)
+            self._save(db, st, "search", lambda user_id: self.rental.build_search(user_id, req, results))
 
             cards = [
                 ChatPropertyCard(
@@ -305,13 +540,10 @@ Your response:
             return ChatBotResponse(
                 text="Here are your matched properties:",
                 properties=cards,
-                options=[
-                    ChatOption(label="🔎 New Search", value="new search"),
-                    ChatOption(label="🏠 Main Menu", value="menu"),
-                ]
+                options=RESULT_OPTIONS,
             )
 
-        return ChatBotResponse(text="I didn't understand that.")
+        return NOT_UNDERSTOOD
 
     # -------------------------------------------------------------
     # REPAIR FLOW HANDLER
@@ -321,23 +553,23 @@ Your response:
         text = message.text.strip().lower()
 
         # CATEGORY
-        if st["stage"] == "repair_category":
-            st["repair"]["category"] = message.text
+        if st.stage == "repair_category":
+            st.repair["category"] = message.text
             self._set_stage(st, "repair_address")
-            return ChatBotResponse(text="What is the *address* of the property?")
+            return ASK_ADDRESS
 
         # ADDRESS
-        if st["stage"] == "repair_address":
-            st["repair"]["address"] = message.text
+        if st.stage == "repair_address":
+            st.repair["address"] = message.text
             self._set_stage(st, "repair_description")
-            return ChatBotResponse(text="Please describe the issue in detail.")
+            return ASK_DESCRIPTION
 
         # DESCRIPTION
-        if st["stage"] == "repair_description":
+        if st.stage == "repair_description":
 
-            st["repair"]["description"] = message.text
+            st.repair["description"] = message.text
 
-            providers = self.providers.find_matching(st["repair"]["category"])
+            providers = self.providers.find_matching(st.repair["category"])
 
             options = [
                 ChatOption(
@@ -347,7 +579,8 @@ Your response:
                 for p in providers
             ]
 
-            self.repair.save_request(db, st["user_id"], st["repair"])
+            data = dict(st.repair)
+            self._save(db, st, "repair", lambda user_id: self.repair.build_request(user_id, data))
             self._set_stage(st, "repair_provider_confirm")
 
             return ChatBotResponse(
@@ -356,29 +589,18 @@ Your response:
             )
 
         # PROVIDER CONFIRMATION
-        if st["stage"] == "repair_provider_confirm":
+        if st.stage == "repair_provider_confirm":
 
             endings = ["done", "thanks", "thank you", "ok", "okay", "fine", "no", "no thanks"]
 
             if text in endings:
                 self._set_stage(st, "choose_intent")
-                return ChatBotResponse(
-                    text="Your repair request is logged. Anything else?",
-                    options=[
-                        ChatOption(label="🏠 Rent a Property", value="rent"),
-                        ChatOption(label="🛠 Request Another Repair", value="repair"),
-                        ChatOption(label="🏠 Main Menu", value="menu"),
-                    ]
-                )
+                return REPAIR_LOGGED
 
             self._set_stage(st, "choose_intent")
             return ChatBotResponse(
                 text=f"{message.text} has been noted! They may contact you soon.\nNeed anything else?",
-                options=[
-                    ChatOption(label="🏠 Rent a Property", value="rent"),
-                    ChatOption(label="🛠 Request Another Repair", value="repair"),
-                    ChatOption(label="🏠 Main Menu", value="menu"),
-                ]
+                options=REPAIR_AGAIN_OPTIONS,
             )
 
-        return ChatBotResponse(text="I didn't understand that.")
+        return NOT_UNDERSTOOD
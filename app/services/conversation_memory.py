@@ -0,0 +1,151 @@
+# app/services/conversation_memory.py
+
+import sys
+from collections import deque
+from typing import NamedTuple, Tuple
+
+from app.config import get_settings
+from app.utils.text_cleaner import estimate_tokens, first_sentence
+
+settings = get_settings()
+
+SUMMARY_HEADER = "Earlier in this conversation:\n"
+SUMMARY_HEADER_TOKENS = estimate_tokens(SUMMARY_HEADER)
+
+
+class Turn(NamedTuple):
+    text: str       # "User: …\nAssistant: …\n" as it goes into the prompt
+    tokens: int
+    gist: str       # one-line summary used once the full turn no longer fits
+
+
+def _gist(user_message: str, reply: str) -> str:
+    return f"- User: {first_sentence(user_message, 80)} → {first_sentence(reply, 80)}"
+
+
+class ConversationMemory:
+    """
+    Recent LLM exchanges of one session, for the prompt.
+
+    The last `max_turns` turns are kept verbatim in a ring buffer. Turns
+    that fall out of it are folded into a short extractive summary (first
+    sentence of question and answer), itself capped at `summary_tokens`.
+    render() fills a token budget newest-first: whole turns while they
+    fit, then summary lines for everything older.
+    """
+
+    __slots__ = ("turns", "summary", "summary_tokens")
+
+    def __init__(self, max_turns: int | None = None, summary_tokens: int | None = None):
+        self.turns: deque = deque(maxlen=max_turns or settings.LLM_HISTORY_TURNS)
+        self.summary: deque = deque()
+        self.summary_tokens = settings.LLM_SUMMARY_TOKENS if summary_tokens is None else summary_tokens
+
+    def add(self, user_message: str, reply: str):
+        if len(self.turns) == self.turns.maxlen:
+            self._fold(self.turns[0].gist)
+
+        text = f"User: {user_message}\nAssistant: {reply}\n"
+        self.turns.append(Turn(text, estimate_tokens(text), _gist(user_message, reply)))
+
+    def _fold(self, gist: str):
+        self.summary.append((gist, estimate_tokens(gist)))
+        while sum(t for _, t in self.summary) > self.summary_tokens:
+            self.summary.popleft()
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def render(self, budget: int | None = None) -> Tuple[str, int]:
+        """(history text, estimated tokens) within `budget` tokens."""
+        budget = settings.LLM_HISTORY_TOKENS if budget is None else budget
+        used = 0
+
+        recent = []
+        turns = list(self.turns)
+        while turns and used + turns[-1].tokens <= budget:
+            turn = turns.pop()
+            recent.append(turn.text)
+            used += turn.tokens
+
+        # turns that did not fit verbatim, newest first, then the summary
+        older = []
+        gists = [(t.gist, estimate_tokens(t.gist)) for t in reversed(turns)] + list(reversed(self.summary))
+        for gist, tokens in gists:
+            if not older:
+                tokens += SUMMARY_HEADER_TOKENS
+            if used + tokens > budget:
+                break
+            older.append(gist)
+            used += tokens
+
+        parts = []
+        if older:
+            parts.append(SUMMARY_HEADER + "\n".join(reversed(older)) + "\n")
+        parts.extend(reversed(recent))
+        return "".join(parts), used
+
+    # -------------------------------------------------------------
+    # SERIALIZATION (plain tuples, see SessionState.dumps)
+    # -------------------------------------------------------------
+    def dump(self) -> tuple:
+        return self.turns.maxlen, self.summary_tokens, [tuple(t) for t in self.turns], list(self.summary)
+
+    @classmethod
+    def load(cls, data: tuple) -> "ConversationMemory":
+        max_turns, summary_tokens, turns, summary = data
+        memory = cls(max_turns=max_turns, summary_tokens=summary_tokens)
+        memory.turns.extend(Turn(*t) for t in turns)
+        memory.summary.extend(tuple(g) for g in summary)
+        return memory
+
+    def sizeof(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.turns) + sys.getsizeof(self.summary)
+        size += sum(sys.getsizeof(t.text) + sys.getsizeof(t.gist) for t in self.turns)
+        size += sum(sys.getsizeof(g) for g, _ in self.summary)
+        return size
+
+
+class PromptStats:
+    """
+    Per-request prompt size and LLM time for the last `window` requests,
+    bucketed by prompt tokens to show how prompt length drives latency.
+    """
+
+    def __init__(self, window: int = 1000, bucket_tokens: int = 256):
+        self.samples: deque = deque(maxlen=window)
+        self.bucket_tokens = bucket_tokens
+        self.requests = 0
+
+    def record(self, prompt_tokens: int, history_tokens: int, seconds: float):
+        self.samples.append((prompt_tokens, history_tokens, seconds))
+        self.requests += 1
+
+    def stats(self) -> dict:
+        samples = list(self.samples)
+        if not samples:
+            return {"requests": self.requests, "window": 0}
+
+        prompt = sorted(s[0] for s in samples)
+        buckets = {}
+        for tokens, _, seconds in samples:
+            low = tokens // self.bucket_tokens * self.bucket_tokens
+            buckets.setdefault(low, []).append(seconds)
+
+        return {
+            "requests": self.requests,
+            "window": len(samples),
+            "prompt_tokens_avg": round(sum(prompt) / len(prompt), 1),
+            "prompt_tokens_p50": prompt[len(prompt) // 2],
+            "prompt_tokens_p95": prompt[min(len(prompt) - 1, int(len(prompt) * 0.95))],
+            "prompt_tokens_max": prompt[-1],
+            "history_tokens_avg": round(sum(s[1] for s in samples) / len(samples), 1),
+            "llm_ms_avg": round(sum(s[2] for s in samples) / len(samples) * 1000, 1),
+            "llm_ms_by_prompt_tokens": {
+                f"{low}-{low + self.bucket_tokens - 1}": {
+                    "requests": len(times),
+                    "llm_ms_avg": round(sum(times) / len(times) * 1000, 1),
+                }
+                for low, times in sorted(buckets.items())
+            },
+        }
@@ -0,0 +1,320 @@
+# app/services/llm_gate.py
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, TypeVar
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+BUSY_REPLY = "⏳ I'm answering a lot of questions right now. Please ask again in a moment."
+
+
+class LLMBusy(Exception):
+    """The LLM wait queue is full, or no slot freed up in time."""
+
+
+class _Flight:
+    """One in-flight generation that identical requests can wait on."""
+
+    __slots__ = ("done", "result", "error", "followers", "callbacks")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.followers = 0
+        self.callbacks: List[Callable[[], None]] = []     # async followers
+
+
+def _wake(loop: asyncio.AbstractEventLoop, fut: asyncio.Future, value=None) -> bool:
+    """Resolves fut from any thread; False if its loop is gone."""
+    def resolve():
+        if not fut.done():
+            fut.set_result(value)
+    try:
+        loop.call_soon_threadsafe(resolve)
+        return True
+    except RuntimeError:
+        return False
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class LLMGate:
+    """
+    Admission control in front of the (single, local) Ollama server.
+
+    - at most `max_concurrency` generations run at once
+    - at most `max_waiting` callers queue for a slot; beyond that, or after
+      waiting `queue_timeout` seconds, LLMBusy is raised at once so the
+      caller can answer "busy" instead of piling up
+    - every generation gets a deadline `deadline` seconds after it starts
+    - identical keys (prompts) already in flight are coalesced: followers
+      wait for the leader's result instead of generating it again
+
+    Works from worker threads (run) and from the event loop (arun); both
+    share the same slots, queue and statistics. Async callers wait on a
+    future, so a queued or coalesced request holds no thread. run() blocks
+    its thread while queued: the chat server only uses arun(), run() is for
+    scripts and benchmarks calling ConversationEngine.handle().
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_waiting: int | None = None,
+        queue_timeout: float | None = None,
+        deadline: float | None = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_waiting = settings.LLM_MAX_WAITING if max_waiting is None else max_waiting
+        self.queue_timeout = settings.LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.deadline = deadline or settings.LLM_DEADLINE
+
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        # FIFO of waiters; grant() hands a freed slot over, False if the waiter is gone
+        self._queue: Deque[Callable[[], bool]] = deque()
+        self.running = 0
+
+        self.calls = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0          # queue full
+        self.queue_timeouts = 0
+        self.deadline_exceeded = 0
+        self.errors = 0
+        self.max_waiting_seen = 0
+        self.queue_wait = deque(maxlen=1000)
+        self.generation = deque(maxlen=1000)
+
+    # -------------------------------------------------------------
+    # SLOTS
+    # -------------------------------------------------------------
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def _try_acquire(self) -> bool:
+        """Takes a free slot without waiting; raises LLMBusy if the queue is full."""
+        with self._lock:
+            if self.running < self.max_concurrency and not self._queue:
+                self.running += 1
+                return True
+            if len(self._queue) >= self.max_waiting:
+                self.rejected += 1
+                raise LLMBusy("LLM queue full")
+            return False
+
+    def _enqueue(self, grant: Callable[[], bool]):
+        with self._lock:
+            if self.running < self.max_concurrency and not self._queue:
+                self.running += 1
+                grant()
+                return
+            if len(self._queue) >= self.max_waiting:
+                self.rejected += 1
+                raise LLMBusy("LLM queue full")
+            self._queue.append(grant)
+            self.max_waiting_seen = max(self.max_waiting_seen, len(self._queue))
+
+    def _dequeue(self, grant: Callable[[], bool]) -> bool:
+        """Leaves the queue; False if a slot was already handed over."""
+        with self._lock:
+            try:
+                self._queue.remove(grant)
+            except ValueError:
+                return False
+            return True
+
+    def _acquire(self) -> float:
+        """Waits for a slot (blocking this thread); returns the seconds spent queued."""
+        started = time.perf_counter()
+        granted = threading.Event()
+
+        def grant() -> bool:
+            granted.set()
+            return True
+
+        self._enqueue(grant)
+        if not granted.wait(self.queue_timeout) and self._dequeue(grant):
+            with self._lock:
+                self.queue_timeouts += 1
+            raise LLMBusy("no LLM slot within the queue timeout")
+        return time.perf_counter() - started
+
+    async def _aacquire(self) -> float:
+        """Waits for a slot on the event loop; returns the seconds spent queued."""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant() -> bool:
+            return _wake(loop, granted)
+
+        self._enqueue(grant)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._dequeue(grant):
+                with self._lock:
+                    self.queue_timeouts += 1
+                raise LLMBusy("no LLM slot within the queue timeout")
+            await granted             # handed over just as we gave up
+        except asyncio.CancelledError:
+            if not self._dequeue(grant):
+                # the slot is already ours: hand it on once it arrives
+                granted.add_done_callback(lambda _: self._release())
+            raise
+        return time.perf_counter() - started
+
+    def _release(self):
+        with self._lock:
+            while self._queue:
+                if self._queue.popleft()():
+                    return            # slot handed over, `running` unchanged
+            self.running -= 1
+
+    # -------------------------------------------------------------
+    # SINGLE-FLIGHT
+    # -------------------------------------------------------------
+    def _join(self, key: Hashable) -> tuple[_Flight, bool]:
+        """(flight, is_leader) for key."""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    async def _await_flight(self, flight: _Flight, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        with self._lock:
+            if flight.done.is_set():
+                return True
+            flight.callbacks.append(lambda: _wake(loop, done))
+        try:
+            await asyncio.wait_for(done, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _follow(self, flight: _Flight, waited: bool):
+        if not waited:
+            raise LLMBusy("coalesced LLM call did not finish in time")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _finish(self, key: Hashable, flight: _Flight, wait: float | None, started: float | None, result=None,
+                error: BaseException | None = None):
+        generation = time.perf_counter() - started if started is not None else None
+        flight.result, flight.error = result, error
+        with self._lock:
+            self._flights.pop(key, None)
+            if wait is not None:
+                self.queue_wait.append(wait)
+            if generation is not None:
+                self.generation.append(generation)
+                if error is None:
+                    self.completed += 1
+                    if generation > self.deadline:
+                        self.deadline_exceeded += 1
+            if error is not None and not isinstance(error, LLMBusy):
+                self.errors += 1
+            flight.done.set()
+            callbacks, flight.callbacks = flight.callbacks, []
+        for wake in callbacks:
+            wake()
+
+    # -------------------------------------------------------------
+    # RUN
+    # -------------------------------------------------------------
+    def run(self, key: Hashable, fn: Callable[[float], T]) -> T:
+        """
+        fn(deadline) under the gate, from a worker thread. `deadline` is a
+        time.monotonic() value fn must respect.
+        """
+        flight, leader = self._join(key)
+        if not leader:
+            return self._follow(flight, flight.done.wait(self.queue_timeout + self.deadline))
+
+        wait = started = None
+        try:
+            wait = 0.0 if self._try_acquire() else self._acquire()
+            try:
+                started = time.perf_counter()
+                result = fn(time.monotonic() + self.deadline)
+            finally:
+                self._release()
+        except BaseException as e:
+            self._finish(key, flight, wait, started, error=e)
+            raise
+        self._finish(key, flight, wait, started, result=result)
+        return result
+
+    async def arun(self, key: Hashable, fn: Callable[[float], Awaitable[T]]) -> T:
+        """Async variant of run(): never blocks the loop or holds a thread while queued."""
+        flight, leader = self._join(key)
+        if not leader:
+            waited = await self._await_flight(flight, self.queue_timeout + self.deadline)
+            return self._follow(flight, waited)
+
+        wait = started = None
+        try:
+            wait = 0.0 if self._try_acquire() else await self._aacquire()
+            try:
+                started = time.perf_counter()
+                result = await fn(time.monotonic() + self.deadline)
+            finally:
+                self._release()
+        except BaseException as e:
+            self._finish(key, flight, wait, started, error=e)
+            raise
+        self._finish(key, flight, wait, started, result=result)
+        return result
+
+    # -------------------------------------------------------------
+    # METRICS
+    # -------------------------------------------------------------
+    def metrics(self) -> dict:
+        with self._lock:
+            waits, gens = list(self.queue_wait), list(self.generation)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_waiting": self.max_waiting,
+                "running": self.running,
+                "waiting": self.waiting,
+                "in_flight_keys": len(self._flights),
+                "calls": self.calls,
+                "completed": self.completed,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "queue_timeouts": self.queue_timeouts,
+                "deadline_exceeded": self.deadline_exceeded,
+                "errors": self.errors,
+                "max_waiting_seen": self.max_waiting_seen,
+                "queue_wait_ms": {
+                    "avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                    "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                },
+                "generation_ms": {
+                    "avg": round(sum(gens) / len(gens) * 1000, 2) if gens else 0.0,
+                    "p95": round(_percentile(gens, 0.95) * 1000, 2),
+                },
+            }
@@ -1,32 +1,253 @@
 # app/services/ollama_client.py
 
-import requests
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+import httpx
+
 from app.config import get_settings
 
 settings = get_settings()
 
+ERROR_REPLY = "There was an issue communicating with the local AI engine."
+TIMEOUT_REPLY = "Sorry, that took too long to answer. Please try again."
+
+
 class OllamaClient:
 
-    def __init__(self, model_name: str | None = None):
+    def __init__(self, model_name: str | None = None, base_url: str | None = None):
         self.model = model_name or settings.OLLAMA_MODEL
-        self.url = "http://localhost:11434/api/generate"
+        self.url = (base_url or settings.OLLAMA_URL).rstrip("/") + "/api/generate"
 
-    def generate(self, prompt: str, max_tokens: int = 512) -> str:
-        """
-        Sends prompt to Ollama server and returns AI response.
-        """
-        payload = {
+        self.timeout = httpx.Timeout(
+            settings.OLLAMA_READ_TIMEOUT,
+            connect=settings.OLLAMA_CONNECT_TIMEOUT,
+        )
+        self.limits = httpx.Limits(
+            max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OLLAMA_MAX_CONNECTIONS,
+        )
+
+        # Pooled keep-alive clients, created on first use
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+
+    # -------------------------------------------------------------
+    # CONNECTION POOLS
+    # -------------------------------------------------------------
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._aclient
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def _payload(self, prompt: str, max_tokens: int) -> dict:
+        return {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
+            "options": {"num_predict": max_tokens},
         }
 
+    def _request_timeout(self, deadline: float | None) -> httpx.Timeout:
+        """Connect / response-headers timeout: none may outlive the deadline."""
+        if deadline is None:
+            return self.timeout
+        remaining = max(0.001, deadline - time.monotonic())
+        return httpx.Timeout(
+            min(settings.OLLAMA_READ_TIMEOUT, remaining),
+            connect=min(settings.OLLAMA_CONNECT_TIMEOUT, remaining),
+        )
+
+    @staticmethod
+    def _cut_at(response: httpx.Response, deadline: float) -> threading.Timer:
+        """
+        Shuts the connection down when the deadline passes, so a read that is
+        blocked waiting for the next token returns at once (closing the
+        response from another thread would not wake it).
+        """
+        stream = response.extensions.get("network_stream")
+        sock = stream.get_extra_info("socket") if stream is not None else None
+
+        def cut():
+            try:
+                if sock is not None:
+                    sock.shutdown(socket.SHUT_RDWR)
+                else:
+                    response.close()
+            except OSError:
+                pass
+
+        timer = threading.Timer(max(0.0, deadline - time.monotonic()), cut)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    @staticmethod
+    def _past_deadline(yielded: bool):
+        """End of stream at the deadline: partial reply, or a timeout if there is none."""
+        if not yielded:
+            raise httpx.ReadTimeout("LLM deadline exceeded")
+        print("⚠️ Ollama deadline exceeded, returning partial reply")
+
+    @staticmethod
+    def _parse_line(line: str) -> tuple[str, bool]:
+        """
+        Parses one NDJSON line of an Ollama stream → (token text, done).
+        """
+        if not line:
+            return "", False
+        data = json.loads(line)
+        if data.get("error"):
+            raise RuntimeError(data["error"])
+        return data.get("response", ""), bool(data.get("done"))
+
+    # -------------------------------------------------------------
+    # SYNC API
+    # -------------------------------------------------------------
+    def stream(self, prompt: str, max_tokens: int = 512, deadline: float | None = None) -> Iterator[str]:
+        """
+        Yields response tokens as Ollama produces them, until done or until
+        `deadline` (time.monotonic() value) passes, even mid-read.
+        """
+        yielded = False
+        with self.client.stream("POST", self.url, json=self._payload(prompt, max_tokens),
+                                timeout=self._request_timeout(deadline)) as response:
+            response.raise_for_status()
+            cutter = self._cut_at(response, deadline) if deadline is not None else None
+            try:
+                lines = response.iter_lines()
+                for line in lines:
+                    chunk, done = self._parse_line(line)
+                    if chunk:
+                        yielded = True
+                        yield chunk
+                    if done:
+                        for _ in lines:     # read the end of the body: the connection goes back to the pool
+                            pass
+                        break
+                    if deadline is not None and time.monotonic() > deadline:
+                        self._past_deadline(yielded)
+                        break
+            except httpx.TransportError:
+                if deadline is None or time.monotonic() < deadline:
+                    raise
+                self._past_deadline(yielded)        # connection cut by _cut_at
+            finally:
+                if cutter:
+                    cutter.cancel()
+
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        on_token: Callable[[str], None] | None = None,
+        deadline: float | None = None,
+    ) -> str:
+        """
+        Sends prompt to Ollama server and returns AI response.
+        If on_token is given it is called with every partial chunk.
+        """
+        parts = []
+
         try:
-            response = requests.post(self.url, json=payload)
+            for chunk in self.stream(prompt, max_tokens, deadline):
+                parts.append(chunk)
+                if on_token:
+                    on_token(chunk)
+
+        except httpx.TimeoutException as e:
+            print("❌ Ollama timeout:", e)
+            if not parts:
+                return TIMEOUT_REPLY
+
+        except Exception as e:
+            print("❌ Ollama error:", e)
+            if not parts:
+                return ERROR_REPLY
+
+        return "".join(parts).strip()
+
+    # -------------------------------------------------------------
+    # ASYNC API (never blocks the event loop)
+    # -------------------------------------------------------------
+    async def astream(self, prompt: str, max_tokens: int = 512, deadline: float | None = None) -> AsyncIterator[str]:
+        """
+        Async variant of stream() using the pooled AsyncClient. Every read
+        waits only for what is left of the deadline.
+        """
+        yielded = False
+        async with self.aclient.stream("POST", self.url, json=self._payload(prompt, max_tokens),
+                                       timeout=self._request_timeout(deadline)) as response:
             response.raise_for_status()
-            data = response.json()
-            return data.get("response", "").strip()
+            lines = response.aiter_lines()
+            while True:
+                try:
+                    if deadline is None:
+                        line = await lines.__anext__()
+                    else:
+                        line = await asyncio.wait_for(lines.__anext__(), max(0.0, deadline - time.monotonic()))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    self._past_deadline(yielded)
+                    break
+
+                chunk, done = self._parse_line(line)
+                if chunk:
+                    yielded = True
+                    yield chunk
+                if done:
+                    async for _ in lines:   # read the end of the body: the connection goes back to the pool
+                        pass
+                    break
+
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        on_token: Callable[[str], Awaitable[None]] | None = None,
+        deadline: float | None = None,
+    ) -> str:
+        """
+        Async variant of generate(). on_token must be a coroutine function.
+        """
+        parts = []
+
+        try:
+            async for chunk in self.astream(prompt, max_tokens, deadline):
+                parts.append(chunk)
+                if on_token:
+                    await on_token(chunk)
+
+        except httpx.TimeoutException as e:
+            print("❌ Ollama timeout:", e)
+            if not parts:
+                return TIMEOUT_REPLY
 
         except Exception as e:
             print("❌ Ollama error:", e)
-            return "There was an issue communicating with the local AI engine."
+            if not parts:
+                return ERROR_REPLY
+
+        return "".join(parts).strip()
@@ -0,0 +1,76 @@
+# app/services/property_import.py
+#
+# Loads properties.json into the `property` table (RENTAL_BACKEND=db).
+#
+#   python -m app.services.property_import [path/to/properties.json]
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session
+
+from app.database import create_db_and_tables, engine
+from app.models.property_models import Property
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "properties.json")
+
+
+def _row(p: dict, position: int, now: datetime) -> dict:
+    return {
+        "id": p["id"],
+        "position": position,
+        "title": p["title"],
+        "location": p["location"],
+        "property_type": p["property_type"],
+        "bedrooms": p["bedrooms"],
+        "price_per_month": p["price_per_month"],
+        "furnished": p["furnished"],
+        "has_garden": p.get("has_garden"),
+        "parking": p.get("parking"),
+        "url": p["url"],
+        "location_lc": p["location"].lower(),
+        "property_type_lc": p["property_type"].lower(),
+        "updated_at": now,
+    }
+
+
+def import_properties(properties: List[dict], db_engine=None, batch_size: int = 5000) -> int:
+    """
+    Replaces the whole catalogue in one transaction, with multi-row inserts.
+    Readers see either the old or the new catalogue, never a mix.
+    """
+    db_engine = db_engine or engine
+    now = datetime.utcnow()
+
+    with Session(db_engine) as db:
+        db.exec(delete(Property))
+        for start in range(0, len(properties), batch_size):
+            batch = properties[start:start + batch_size]
+            db.exec(insert(Property), params=[_row(p, start + i, now) for i, p in enumerate(batch)])
+        db.commit()
+
+    return len(properties)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import rental listings into the database")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        properties = json.load(f)
+
+    create_db_and_tables()
+
+    started = time.perf_counter()
+    count = import_properties(properties)
+    print(f"✅ Imported {count} properties in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,105 @@
 # app/services/provider_engine.py
 
 import json
-from typing import List
-from app.models.provider_models import ServiceProvider
-from sqlmodel import Session, select
+import os
+import threading
+from typing import Dict, Tuple
+
+from app.config import get_settings
+from app.models.provider_models import ProviderMatch
+
+settings = get_settings()
+
+DEFAULT_PATH = "app/data/service_providers.json"
+
+
+class ProviderIndex:
+    """
+    Immutable snapshot of service_providers.json: category → providers
+    (best rated first) plus the precomputed "no match" fallback.
+    """
+
+    def __init__(self, providers_data: list):
+        by_category: Dict[str, list] = {}
+        matches = []
+
+        for p in providers_data:
+            match = ProviderMatch(
+                category=p["category"],
+                name=p["name"],
+                phone=p.get("phone"),
+                email=p.get("email"),
+                rating=p.get("rating", 4.5),
+            )
+            matches.append(match)
+            by_category.setdefault(match.category.lower(), []).append(match)
+
+        self.by_category: Dict[str, Tuple[ProviderMatch, ...]] = {
+            key: tuple(sorted(group, key=lambda m: -m.rating))
+            for key, group in by_category.items()
+        }
+        # exact-case keys too, so the usual lookup needs no .lower()
+        for group in list(self.by_category.values()):
+            self.by_category.setdefault(group[0].category, group)
+
+        # fallback: show the first providers if none match
+        self.fallback: Tuple[ProviderMatch, ...] = tuple(matches[:5])
 
 
 class ProviderEngine:
 
-    def __init__(self):
+    def __init__(self, path: str = DEFAULT_PATH, reload_interval: float | None = None):
+        self.path = path
+        self._mtime = None
+        self.index = ProviderIndex([])
+        self.reload()
+
+        self._stop = threading.Event()
+        self._thread = None
+        interval = settings.PROVIDERS_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        if interval > 0:
+            self._thread = threading.Thread(target=self._watch, args=(interval,), name="providers-reload", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stops the reload watcher."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    # -------------------------------------------------------------
+    # (RE)LOAD → build a new index, then swap it in one assignment
+    # -------------------------------------------------------------
+    def reload(self) -> bool:
         try:
-            with open("app/data/service_providers.json", "r") as f:
-                self.providers_data = json.load(f)
-        except:
-            self.providers_data = []
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r") as f:
+                providers_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            # keep serving the last good index
+            if self._mtime is not None:
+                print("⚠️ Could not reload service providers:", e)
+            return False
+
+        self.index = ProviderIndex(providers_data)
+        self._mtime = mtime
+        return True
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    if self.reload():
+                        print("🔄 Service providers reloaded")
+            except OSError:
+                pass
 
     # MATCH PROVIDERS BY CATEGORY
-    def find_matching(self, category: str) -> List[ServiceProvider]:
-
-        results = []
-
-        for p in self.providers_data:
-            if p["category"].lower() == category.lower():
-                provider = ServiceProvider(
-                    category=p["category"],
-                    name=p["name"],
-                    phone=p.get("phone"),
-                    email=p.get("email"),
-                    rating=p.get("rating", 4.5)
-                )
-                results.append(provider)
-
-        # fallback: show all providers if none match
-        if not results:
-            for p in self.providers_data[:5]:
-                provider = ServiceProvider(
-                    category=p["category"],
-                    name=p["name"],
-                    phone=p.get("phone"),
-                    email=p.get("email"),
-                    rating=p.get("rating", 4.5)
-                )
-                results.append(provider)
-
-        return results
+    def find_matching(self, category: str) -> Tuple[ProviderMatch, ...]:
+        index = self.index
+        found = index.by_category.get(category)
+        if found is None:
+            found = index.by_category.get(category.lower(), index.fallback)
+        return found
@@ -1,45 +1,207 @@
 # app/services/rag_engine.py
+#
+# Build / update the RAG index offline (running workers pick it up):
+#
+#   python -m app.services.rag_engine [--full] [--batch-size 256]
 
-import os
-import glob
-
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import argparse
+import threading
+import time
+from typing import List
 
 import numpy as np
 
+from app.config import get_settings
+from app.services.vector_store import VectorStore
+from app.utils.helpers import TTLCache
+from app.utils.metrics import RAG_RETRIEVE_SECONDS
+from app.utils.text_cleaner import normalize_query
+
+settings = get_settings()
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def load_model():
+    # Imported here: pulling in torch takes seconds and is only needed once RAG loads
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(MODEL_NAME)
+
+
+def make_store(dim: int, store_path: str | None = None, model_name: str = MODEL_NAME) -> VectorStore:
+    # Persisted, mmap'd chunk index → only new/changed chunks get encoded
+    return VectorStore(
+        store_path or settings.VECTOR_STORE_PATH,
+        model_name=model_name,
+        dim=dim,
+        chunk_size=settings.RAG_CHUNK_SIZE,
+        chunk_overlap=settings.RAG_CHUNK_OVERLAP,
+        ann_min_rows=settings.RAG_ANN_MIN_ROWS,
+    )
+
 
 class RAGEngine:
 
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, docs_path: str | None = None, store_path: str | None = None,
+                 reload_interval: float | None = None, model=None, model_name: str = MODEL_NAME):
+        # `model`: anything with SentenceTransformer's encode() (benchmarks pass a light one)
+        self.model = model or load_model()
+        self.docs_path = docs_path or settings.RAG_DOCS_PATH
+        self.store = make_store(self.model.get_sentence_embedding_dimension(), store_path, model_name)
+
+        if settings.RAG_SYNC_ON_START:
+            stats = self.store.sync(self.docs_path, self.encode, batch_size=settings.RAG_ENCODE_BATCH)
+            if stats["encoded"] or stats["removed"]:
+                print(f"📚 RAG index updated: {stats}")
+        elif not self.store.load():
+            print("⚠️ No published RAG index yet (python -m app.services.rag_engine); waiting for one")
+
+        # Repeated questions skip the encoder / the search
+        self.embedding_cache = TTLCache(settings.RAG_CACHE_SIZE, settings.RAG_CACHE_TTL)
+        self.hit_cache = TTLCache(settings.RAG_CACHE_SIZE, settings.RAG_CACHE_TTL)
+        self._cache_version = self.store.version
+
+        # Indexes published by the offline build (or another worker) are swapped in
+        self._stop = threading.Event()
+        self._thread = None
+        interval = settings.RAG_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        if interval > 0:
+            self._thread = threading.Thread(target=self._watch, args=(interval,), name="rag-reload", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stops the index reload watcher."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                if self.store.reload_if_changed():
+                    print(f"🔄 RAG index reloaded: {self.store.version} ({len(self.store.entries)} chunks)")
+            except Exception as e:
+                print("⚠️ Could not reload RAG index:", e)
+
+    # -------------------------------------------------------------
+    # EMBEDDINGS (L2-normalized → dot product == cosine)
+    # -------------------------------------------------------------
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=64,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
 
-        self.docs = []
-        self.embeddings = []
+    def embed_query(self, query: str) -> np.ndarray:
+        # the normalized text is both the key and what gets encoded, so every
+        # spelling that shares a key gets the same vector
+        key = normalize_query(query)
+        q_emb = self.embedding_cache.get(key)
+        if q_emb is None:
+            q_emb = self.model.encode(key, normalize_embeddings=True)
+            q_emb.setflags(write=False)
+            self.embedding_cache.set(key, q_emb)
+        return q_emb
 
-        for path in glob.glob("app/data/rag_docs/*.txt"):
-            text = open(path, "r", encoding="utf-8").read()
-            self.docs.append(text)
-            self.embeddings.append(self.model.encode(text))
+    # -------------------------------------------------------------
+    # CACHES
+    # -------------------------------------------------------------
+    def invalidate_cache(self):
+        """Drops cached retrieval results (embeddings stay valid)."""
+        self.hit_cache.clear()
+        self._cache_version = self.store.version
 
-        self.embeddings = np.vstack(self.embeddings) if self.embeddings else np.zeros((1, 384))
+    def cache_stats(self) -> dict:
+        return {
+            "index_version": self.store.version,
+            "embeddings": self.embedding_cache.stats(),
+            "retrieval": self.hit_cache.stats(),
+        }
 
-    # FIND MOST RELEVANT DOCUMENT
-    def retrieve(self, query: str):
-        q_emb = self.model.encode(query).reshape(1, -1)
-        sims = cosine_similarity(q_emb, self.embeddings)[0]
-        idx = int(np.argmax(sims))
-        return self.docs[idx]
+    # FIND MOST RELEVANT CHUNKS
+    def retrieve(self, query: str, k: int | None = None) -> List[dict]:
+        with RAG_RETRIEVE_SECONDS.time():
+            return self._retrieve(query, k or settings.RAG_TOP_K)
+
+    def _retrieve(self, query: str, k: int) -> List[dict]:
+
+        if self._cache_version != self.store.version:
+            self.invalidate_cache()
+
+        key = (normalize_query(query), k)
+        cached = self.hit_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        q_emb = self.embed_query(query)
+        snap = self.store.snapshot
+        hits = self.store.search(q_emb, k, nprobe=settings.RAG_ANN_NPROBE, snapshot=snap)
+
+        results = [
+            {**snap.entries[row], "score": score}
+            for row, score in hits
+        ]
+        self.hit_cache.set(key, tuple(results))
+        return results
 
     # ANSWER QUERY USING SIMPLE GROUNDING
     def answer(self, query: str) -> str:
-        if not self.docs:
+        if not self.store.entries:
             return "I don’t have enough information about that yet."
 
-        doc = self.retrieve(query)
+        hits = self.retrieve(query)
 
         return (
             "📘 *Based on verified property documentation:*\n\n"
-            + doc[:700]
+            + "\n\n".join(h["text"] for h in hits)
             + "\n\n(Answer grounded using RAG)"
         )
+
+
+# -------------------------------------------------------------
+# OFFLINE INGESTION
+# -------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build / update the RAG index")
+    parser.add_argument("--docs", default=settings.RAG_DOCS_PATH, help="directory of .txt documents")
+    parser.add_argument("--store", default=settings.VECTOR_STORE_PATH, help="vector store directory")
+    parser.add_argument("--batch-size", type=int, default=settings.RAG_ENCODE_BATCH,
+                        help="chunks per encoder call")
+    parser.add_argument("--full", action="store_true", help="re-encode every chunk")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model = load_model()
+    print(f"📚 Model {MODEL_NAME} loaded in {time.perf_counter() - started:.1f}s")
+
+    store = make_store(model.get_sentence_embedding_dimension(), args.store)
+    encoding = {"seconds": 0.0}
+
+    def encode(texts: List[str]) -> np.ndarray:
+        t0 = time.perf_counter()
+        vectors = model.encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+        encoding["seconds"] += time.perf_counter() - t0
+        return vectors
+
+    def progress(done: int, total: int):
+        rate = done / encoding["seconds"] if encoding["seconds"] else 0.0
+        print(f"   {done}/{total} chunks encoded ({rate:.1f} chunks/s)")
+
+    started = time.perf_counter()
+    stats = store.sync(args.docs, encode, batch_size=args.batch_size, full=args.full, on_batch=progress)
+    elapsed = time.perf_counter() - started
+
+    rate = stats["encoded"] / encoding["seconds"] if encoding["seconds"] else 0.0
+    print(f"✅ RAG index {store.version}: {stats}")
+    print(f"   {stats['encoded']} chunks encoded in {encoding['seconds']:.2f}s ({rate:.1f} chunks/s), "
+          f"{stats['chunks']} chunks total, {elapsed:.2f}s overall "
+          f"({stats['chunks'] / elapsed if elapsed else 0.0:.1f} chunks/s)")
+
+
+if __name__ == "__main__":
+    main()
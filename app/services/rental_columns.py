@@ -0,0 +1,190 @@
+# app/services/rental_columns.py
+
+import re
+from typing import List
+
+import numpy as np
+
+
+# Same weights as RentalEngine._score
+WEIGHTS = {
+    "location": 30,
+    "property_type": 20,
+    "bedrooms": 20,
+    "budget": 25,
+    "furnished": 10,
+    "garden": 10,
+    "parking": 10,
+}
+
+_SEP = "\x00"
+
+
+class SubstringTable:
+    """
+    A list of strings packed into one blob, so `needle in s` for every s
+    is a single C-level regex scan instead of a Python loop.
+    """
+
+    def __init__(self, strings):
+        self.strings = strings
+        self._blob = _SEP.join(strings) + _SEP
+        lengths = np.fromiter((len(c) + 1 for c in strings), dtype=np.int64, count=len(strings))
+        self._starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else np.zeros(0, np.int64)
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Boolean mask over strings: `needle in s`."""
+        hit = np.zeros(len(self.strings), dtype=bool)
+        if _SEP in needle:
+            return hit
+        if not needle:
+            hit[:] = True
+            return hit
+
+        offsets = [m.start() for m in re.finditer(re.escape(needle), self._blob)]
+        if offsets:
+            hit[np.searchsorted(self._starts, offsets, side="right") - 1] = True
+        return hit
+
+
+class CategoricalColumn:
+    """
+    Lowercased string column stored as codes into a table of unique values.
+    Substring tests run once per unique value, not once per listing.
+    """
+
+    def __init__(self, values: List[str]):
+        self.categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        self.codes = codes.astype(np.int32)
+        self.table = SubstringTable(self.categories)
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Boolean mask over categories: `needle in category`."""
+        return self.table.contains(needle)
+
+    def row_contains(self, needle: str, rows: np.ndarray | None = None,
+                     cats: np.ndarray | None = None) -> np.ndarray:
+        """
+        Boolean mask over rows (all, or only `rows`): `needle in value`.
+        `cats` may carry the already known matching category ids.
+        """
+        if rows is None:
+            return self.contains(needle)[self.codes]
+        if cats is None:
+            cats = np.flatnonzero(self.contains(needle))
+        return np.isin(self.codes[rows], cats)
+
+
+class ListingColumns:
+    """
+    Column-oriented copy of the rental listings for vectorized scoring.
+    Scores are identical to RentalEngine._score, including tie order.
+    """
+
+    def __init__(self, properties: List[dict]):
+        self.size = len(properties)
+
+        self.location = CategoricalColumn([str(p.get("location") or "").lower() for p in properties])
+        self.property_type = CategoricalColumn([str(p.get("property_type") or "").lower() for p in properties])
+
+        self.bedrooms = np.array(
+            [p["bedrooms"] if p.get("bedrooms") is not None else np.nan for p in properties], dtype=np.float64
+        )
+        self.price = np.array(
+            [p["price_per_month"] if p.get("price_per_month") is not None else np.nan for p in properties],
+            dtype=np.float64,
+        )
+
+        # furnished compared with ==, so keep the raw values for odd requirements
+        self.furnished_raw = np.array([p.get("furnished") for p in properties], dtype=object)
+        self.furnished_true = np.array([v is not None and v == True for v in self.furnished_raw], dtype=bool)  # noqa: E712
+        self.furnished_false = np.array([v is not None and v == False for v in self.furnished_raw], dtype=bool)  # noqa: E712
+
+        self.has_garden = np.array([bool(p.get("has_garden")) for p in properties], dtype=bool)
+        self.parking = np.array([bool(p.get("parking")) for p in properties], dtype=bool)
+
+    # -------------------------------------------------------------
+    # SCORING
+    # -------------------------------------------------------------
+    @staticmethod
+    def score_weights(req: dict) -> dict:
+        """Criteria that contribute to the score for this request → weight."""
+        active = {}
+        for name in ("location", "property_type", "bedrooms", "budget", "garden", "parking"):
+            if req.get(name):
+                active[name] = WEIGHTS[name]
+        if req.get("furnished") is not None:
+            active["furnished"] = WEIGHTS["furnished"]
+        return active
+
+    def score(self, req: dict, rows: np.ndarray | None = None, cats: dict | None = None) -> np.ndarray:
+        """
+        Scores every listing (or only `rows`) as a sum of boolean masks.
+        `cats` optionally maps "location" / "property_type" to the matching
+        category ids, when a ListingIndex already resolved them.
+        """
+        def col(a):
+            return a if rows is None else a[rows]
+
+        cats = cats or {}
+        n = self.size if rows is None else len(rows)
+        score = np.zeros(n, dtype=np.int32)
+
+        if req.get("location"):
+            score += WEIGHTS["location"] * self.location.row_contains(
+                req["location"].lower(), rows, cats.get("location")
+            )
+
+        if req.get("property_type"):
+            score += WEIGHTS["property_type"] * self.property_type.row_contains(
+                req["property_type"], rows, cats.get("property_type")
+            )
+
+        if req.get("bedrooms"):
+            score += WEIGHTS["bedrooms"] * (col(self.bedrooms) >= req["bedrooms"])
+
+        if req.get("budget"):
+            score += WEIGHTS["budget"] * (col(self.price) <= req["budget"])
+
+        if req.get("furnished") is not None:
+            wanted = req["furnished"]
+            if wanted is True:
+                mask = col(self.furnished_true)
+            elif wanted is False:
+                mask = col(self.furnished_false)
+            else:
+                mask = (col(self.furnished_raw) == wanted).astype(bool)
+            score += WEIGHTS["furnished"] * mask
+
+        if req.get("garden"):
+            score += WEIGHTS["garden"] * col(self.has_garden)
+
+        if req.get("parking"):
+            score += WEIGHTS["parking"] * col(self.parking)
+
+        return score
+
+    def top_k(self, req: dict, k: int = 6, rows: np.ndarray | None = None,
+              cats: dict | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (row ids, scores) of the k best listings (among `rows`, if given)
+        with score > 0, best first. Ties keep catalogue order, exactly like
+        a stable sort would.
+        """
+        score = self.score(req, rows, cats)
+        ids = np.arange(self.size) if rows is None else np.asarray(rows)
+
+        positive = np.flatnonzero(score > 0)
+        if len(positive) == 0:
+            return positive, score[positive]
+
+        # unique key: higher score first, then lower row id first
+        key = score[positive].astype(np.int64) * (self.size + 1) + (self.size - ids[positive])
+
+        if len(positive) > k:
+            part = np.argpartition(-key, k - 1)[:k]
+            positive, key = positive[part], key[part]
+
+        order = np.argsort(-key)
+        best = positive[order]
+        return ids[best], score[best]
@@ -2,34 +2,63 @@
 
 import json
 import os
-from sqlmodel import Session
+import time
+from bisect import bisect_left, bisect_right
+from functools import reduce
+from itertools import accumulate
+from operator import add
+
+from sqlalchemy import case, func, literal, or_
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.database import engine
+from app.models.property_models import Property
 from app.models.rental_models import RentalSearch, RentalMatch
+from app.services.rental_columns import WEIGHTS, ListingColumns
+from app.services.rental_index import ListingIndex
 from typing import List, Dict
 
+settings = get_settings()
+
 
 class RentalEngine:
 
-    def __init__(self):
+    def __init__(self, properties: List[Dict] | None = None):
+        if properties is None:
+            properties = self._read_properties_json()
+
+        self.load_properties(properties)
+
+    @staticmethod
+    def _read_properties_json() -> List[Dict]:
         # Build a robust path to properties.json
         base_dir = os.path.dirname(os.path.dirname(__file__))  # .../real_estate_ai/app
         data_path = os.path.join(base_dir, "data", "properties.json")
 
-        self.properties = []
-
         if os.path.exists(data_path):
             try:
                 with open(data_path, "r", encoding="utf-8") as f:
                     content = f.read().strip()
                     if content:
-                        self.properties = json.loads(content)
+                        return json.loads(content)
                     else:
                         print("⚠️ properties.json is empty. No rental properties loaded.")
             except json.JSONDecodeError as e:
                 print("❌ JSON error in properties.json:", e)
-                self.properties = []
         else:
             print("⚠️ properties.json not found at:", data_path)
 
+        return []
+
+    def load_properties(self, properties: List[Dict]):
+        """
+        Replaces the catalogue and rebuilds the columnar copy and its index.
+        """
+        self.properties = properties
+        self.columns = ListingColumns(properties)
+        self.index = ListingIndex(self.columns)
+
     # -------------------------------------------------------------
     # SCORE PROPERTY AGAINST REQUIREMENTS
     # -------------------------------------------------------------
@@ -74,29 +103,28 @@ class RentalEngine:
         return score
 
     # -------------------------------------------------------------
-    # FIND MATCHES
+    # FIND MATCHES (vectorized _score over index candidates,
+    # full columnar scan when the index can't prove the top-k)
     # -------------------------------------------------------------
-    def find_matches(self, requirements: dict) -> List[Dict]:
+    def find_matches(self, requirements: dict, db: Session | None = None, limit: int = 6) -> List[Dict]:
         if not self.properties:
             # No properties loaded
             return []
 
-        results = []
+        found = self.index.top_k(requirements, k=limit)
+        if found is None:
+            found = self.columns.top_k(requirements, k=limit)
+        rows, scores = found
 
-        for p in self.properties:
-            score = self._score(requirements, p)
-            if score > 0:
-                prop = p.copy()
-                prop["score"] = score
-                results.append(prop)
-
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:6]
+        return [
+            {**self.properties[row], "score": int(score)}
+            for row, score in zip(rows, scores)
+        ]
 
     # -------------------------------------------------------------
     # SAVE RENTAL SEARCH REQUEST + MATCHES TO DB
     # -------------------------------------------------------------
-    def save_search(self, db: Session, user_id: int, req: dict, results: list) -> RentalSearch:
+    def build_search(self, user_id: int, req: dict, results: list) -> RentalSearch:
         search = RentalSearch(
             user_id=user_id,
             location=req.get("location"),
@@ -107,13 +135,10 @@ class RentalEngine:
             garden=req.get("garden"),
             parking=req.get("parking"),
         )
-        db.add(search)
-        db.commit()
-        db.refresh(search)
 
-        for r in results:
-            match = RentalMatch(
-                search_id=search.id,
+        # inserted with the search, in one batch, once its id is known
+        search.matches = [
+            RentalMatch(
                 property_id=r["id"],
                 title=r["title"],
                 location=r["location"],
@@ -125,7 +150,168 @@ class RentalEngine:
                 url=r["url"],
                 score=r.get("score"),
             )
-            db.add(match)
+            for r in results
+        ]
+        return search
 
+    def save_search(self, db: Session, user_id: int, req: dict, results: list) -> RentalSearch:
+        search = self.build_search(user_id, req, results)
+        db.add(search)
         db.commit()
         return search
+
+
+class SQLRentalEngine(RentalEngine):
+    """
+    Rental search against the `property` table instead of properties.json.
+
+    The _score weighting runs inside SQL (CASE sums + ORDER BY + LIMIT), so
+    workers hold no catalogue in memory and catalogue updates (see
+    app/services/property_import.py) apply without a restart.
+
+    Neither the score nor the substring tests (LIKE '%x%') can use an
+    index, so by default a search scores every row. The bedrooms and
+    budget criteria are range predicates that can: when one of them (or
+    either) selects at most `max_candidate_share` of the catalogue, only
+    those rows are scored first, and, as in ListingIndex, that tier is
+    accepted when its k-th score beats the best score any row outside it
+    could reach. Otherwise the whole table is scored. Results are always
+    identical to the full query.
+    """
+
+    max_candidate_share = 0.25
+    counts_ttl = 60.0           # seconds between refreshes of the value counts
+
+    def __init__(self, db_engine=None):
+        self.db_engine = db_engine or engine
+        self.properties = []
+        self.stats = {"single": 0, "union": 0, "fallback": 0}
+        self._counts = None
+        self._counts_at = 0.0
+
+    # -------------------------------------------------------------
+    # RANGE SELECTIVITY (rows per bedrooms / price value)
+    # -------------------------------------------------------------
+    def _value_counts(self, db: Session) -> dict:
+        if self._counts is None or time.monotonic() - self._counts_at > self.counts_ttl:
+            counts = {}
+            for name, column in (("bedrooms", Property.bedrooms), ("budget", Property.price_per_month)):
+                rows = db.exec(select(column, func.count()).group_by(column).order_by(column)).all()
+                values = [v for v, _ in rows]
+                cumulative = list(accumulate(n for _, n in rows))
+                counts[name] = (values, cumulative)
+            self._counts, self._counts_at = counts, time.monotonic()
+        return self._counts
+
+    def _range_size(self, name: str, value, counts: dict) -> int:
+        values, cumulative = counts[name]
+        if not values:
+            return 0
+        if name == "bedrooms":      # bedrooms >= value
+            i = bisect_left(values, value)
+            return cumulative[-1] - (cumulative[i - 1] if i else 0)
+        i = bisect_right(values, value)     # price_per_month <= value
+        return cumulative[i - 1] if i else 0
+
+    @staticmethod
+    def _criteria(req: dict) -> Dict[str, object]:
+        """Scored criterion → SQL condition (weights from WEIGHTS)."""
+        criteria = {}
+
+        if req.get("location"):
+            criteria["location"] = Property.location_lc.contains(req["location"].lower(), autoescape=True)
+
+        # case-sensitive like _score: an upper-case needle never matches
+        if req.get("property_type") and req["property_type"] == req["property_type"].lower():
+            criteria["property_type"] = Property.property_type_lc.contains(req["property_type"], autoescape=True)
+
+        if req.get("budget"):
+            criteria["budget"] = Property.price_per_month <= req["budget"]
+
+        if req.get("bedrooms"):
+            criteria["bedrooms"] = Property.bedrooms >= req["bedrooms"]
+
+        if req.get("furnished") is not None:
+            criteria["furnished"] = Property.furnished == bool(req["furnished"])
+
+        if req.get("garden"):
+            criteria["garden"] = Property.has_garden == True  # noqa: E712
+
+        if req.get("parking"):
+            criteria["parking"] = Property.parking == True  # noqa: E712
+
+        return criteria
+
+    @classmethod
+    def _score_expr(cls, req: dict):
+        terms = [case((hit, WEIGHTS[name]), else_=0) for name, hit in cls._criteria(req).items()]
+        return reduce(add, terms) if terms else literal(0)
+
+    def _prefilters(self, req: dict, criteria: dict, db: Session) -> List[tuple]:
+        """(tier, WHERE clause, best score of a row outside it), narrowest first."""
+        ranges = {"budget": req.get("budget"), "bedrooms": req.get("bedrooms")}
+        ranges = {name: value for name, value in ranges.items() if name in criteria}
+        if not ranges:
+            return []
+
+        counts = self._value_counts(db)
+        budget_rows = (counts["bedrooms"][1] or [0])[-1] * self.max_candidate_share
+        sizes = {name: self._range_size(name, value, counts) for name, value in ranges.items()}
+        total = sum(WEIGHTS[name] for name in criteria)
+
+        tiers = [
+            ("single", criteria[name], total - WEIGHTS[name])
+            for name in sorted(ranges, key=sizes.get) if sizes[name] <= budget_rows
+        ]
+        if len(ranges) == 2 and sum(sizes.values()) <= budget_rows:
+            tiers.append(("union", or_(*(criteria[n] for n in ranges)),
+                          total - sum(WEIGHTS[n] for n in ranges)))
+        return tiers
+
+    def find_matches(self, requirements: dict, db: Session | None = None, limit: int = 6) -> List[Dict]:
+        if db is None:
+            with Session(self.db_engine) as session:
+                return self.find_matches(requirements, session, limit)
+
+        criteria = self._criteria(requirements)
+        score = self._score_expr(requirements).label("score")
+        q = (
+            select(Property, score)
+            .where(score > 0)
+            .order_by(score.desc(), Property.position)
+            .limit(limit)
+        )
+
+        for tier, where, outside_best in self._prefilters(requirements, criteria, db):
+            found = db.exec(q.where(where)).all()
+            # rows outside score <= outside_best: they can't reach (or tie) the k-th
+            if outside_best <= 0 or (len(found) == limit and found[-1][1] > outside_best):
+                self.stats[tier] += 1
+                break
+        else:
+            self.stats["fallback"] += 1
+            found = db.exec(q).all()
+
+        return [
+            {
+                "id": p.id,
+                "title": p.title,
+                "location": p.location,
+                "property_type": p.property_type,
+                "bedrooms": p.bedrooms,
+                "price_per_month": p.price_per_month,
+                "furnished": p.furnished,
+                "has_garden": p.has_garden,
+                "parking": p.parking,
+                "url": p.url,
+                "score": int(s),
+            }
+            for p, s in found
+        ]
+
+
+def make_rental_engine() -> RentalEngine:
+    """RENTAL_BACKEND: "memory" (properties.json) or "db" (property table)."""
+    if settings.RENTAL_BACKEND == "db":
+        return SQLRentalEngine()
+    return RentalEngine()
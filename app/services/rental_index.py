@@ -0,0 +1,213 @@
+# app/services/rental_index.py
+
+import re
+
+import numpy as np
+
+from app.services.rental_columns import CategoricalColumn, ListingColumns, SubstringTable
+
+_DELIMS = re.compile(r"[\W_]+")
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def gather_ranges(values: np.ndarray, offsets: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    values[offsets[g]:offsets[g + 1]] for every g in groups, concatenated,
+    without a Python-level loop over the groups.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    starts = offsets[groups]
+    lengths = offsets[groups + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return values[:0]
+    shift = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return values[np.arange(total) + shift]
+
+
+class TokenPostings:
+    """
+    Inverted index over a CategoricalColumn: alphanumeric token → category
+    ids, plus category → rows.
+
+    A delimiter-free needle can only occur inside a single token, so the
+    categories containing it are exactly the postings of the vocabulary
+    tokens containing it. That one scan over the (small) vocabulary also
+    covers postcode prefixes: "sw1" hits the tokens "sw1", "sw19", …
+    """
+
+    def __init__(self, column: CategoricalColumn):
+        self.column = column
+
+        postings = {}
+        for cat_id, value in enumerate(column.categories):
+            for token in set(_TOKEN.findall(value)):
+                postings.setdefault(token, []).append(cat_id)
+
+        vocab = sorted(postings)
+        self.vocab = SubstringTable(vocab)
+        lengths = [len(postings[t]) for t in vocab]
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.cat_ids = np.array([c for t in vocab for c in postings[t]], dtype=np.int32)
+
+        # rows grouped by category
+        self.row_order = np.argsort(column.codes, kind="stable").astype(np.int64)
+        self.row_offsets = np.searchsorted(
+            column.codes[self.row_order], np.arange(len(column.categories) + 1)
+        ).astype(np.int64)
+
+    def _piece_categories(self, piece: str) -> np.ndarray:
+        tokens = np.flatnonzero(self.vocab.contains(piece))
+        return np.unique(gather_ranges(self.cat_ids, self.offsets, tokens))
+
+    def categories(self, needle: str) -> np.ndarray | None:
+        """
+        Exact ids of categories with `needle in category`, or None if the
+        needle has no alphanumeric part to look up.
+        """
+        pieces = [p for p in _DELIMS.split(needle) if p]
+        if not pieces:
+            return None
+
+        cats = min((self._piece_categories(p) for p in pieces), key=len)
+
+        # needle spans delimiters → its pieces only give a superset
+        if len(pieces) > 1 or pieces[0] != needle:
+            values = self.column.categories
+            cats = np.array([c for c in cats if needle in values[c]], dtype=np.int32)
+        return cats
+
+    def rows(self, cats: np.ndarray) -> np.ndarray:
+        return gather_ranges(self.row_order, self.row_offsets, cats)
+
+    def count(self, cats: np.ndarray) -> int:
+        cats = np.asarray(cats, dtype=np.int64)
+        return int((self.row_offsets[cats + 1] - self.row_offsets[cats]).sum())
+
+
+class ListingIndex:
+    """
+    Candidate pruning for RentalEngine.find_matches.
+
+    Indexed criteria: location (token postings), property type (token
+    postings), bedrooms (sorted array, >= lookup) and budget (price-sorted
+    array, <= lookup). A search scores only
+
+      1. listings matching every indexed criterion, or failing that
+      2. listings matching one heavily weighted criterion, or
+      3. listings matching at least one of them,
+
+    and accepts a tier only when its k-th score beats the best score any
+    listing outside it could reach. Otherwise top_k() returns None and the
+    caller falls back to a full scan, so results are always identical.
+    Tiers 2-3 are skipped when their candidates exceed `max_candidate_share`
+    of the catalogue, where the vectorized full scan is cheaper anyway.
+    """
+
+    min_rows = 5_000
+    max_candidate_share = 0.25
+
+    def __init__(self, columns: ListingColumns):
+        self.columns = columns
+        self.location = TokenPostings(columns.location)
+        self.property_type = TokenPostings(columns.property_type)
+
+        # NaN sorts last and never satisfies a comparison
+        self.bed_order = np.argsort(columns.bedrooms, kind="stable")
+        self.bed_sorted = columns.bedrooms[self.bed_order]
+        self.bed_valid = int(np.count_nonzero(~np.isnan(columns.bedrooms)))
+
+        self.price_order = np.argsort(columns.price, kind="stable")
+        self.price_sorted = columns.price[self.price_order]
+
+        self.stats = {"intersection": 0, "single": 0, "union": 0, "fallback": 0}
+
+    # -------------------------------------------------------------
+    # POSTINGS PER CRITERION
+    # -------------------------------------------------------------
+    def _candidate_sets(self, req: dict) -> tuple[dict, dict] | None:
+        sets, cats = {}, {}
+
+        if req.get("location"):
+            found = self.location.categories(req["location"].lower())
+            if found is None:
+                return None
+            cats["location"] = found
+            sets["location"] = lambda: self.location.rows(found)
+
+        if req.get("property_type"):
+            found_pt = self.property_type.categories(req["property_type"])
+            if found_pt is None:
+                return None
+            cats["property_type"] = found_pt
+            sets["property_type"] = lambda: self.property_type.rows(found_pt)
+
+        if req.get("bedrooms"):
+            lo = np.searchsorted(self.bed_sorted[:self.bed_valid], req["bedrooms"], side="left")
+            sets["bedrooms"] = lambda: self.bed_order[lo:self.bed_valid]
+
+        if req.get("budget"):
+            hi = np.searchsorted(self.price_sorted, req["budget"], side="right")
+            sets["budget"] = lambda: self.price_order[:hi]
+
+        return sets, cats
+
+    def _set_size(self, name: str, req: dict, cats: dict) -> int:
+        """Size of a posting set without materializing it."""
+        if name in ("location", "property_type"):
+            return getattr(self, name).count(cats[name])
+        if name == "bedrooms":
+            return self.bed_valid - int(np.searchsorted(self.bed_sorted[:self.bed_valid], req["bedrooms"], side="left"))
+        return int(np.searchsorted(self.price_sorted, req["budget"], side="right"))
+
+    # -------------------------------------------------------------
+    # SEARCH
+    # -------------------------------------------------------------
+    def top_k(self, req: dict, k: int = 6) -> tuple[np.ndarray, np.ndarray] | None:
+        if self.columns.size < self.min_rows:
+            return None
+
+        found = self._candidate_sets(req)
+        if not found or not found[0]:
+            self.stats["fallback"] += 1
+            return None
+        sets, cats = found
+
+        active = self.columns.score_weights(req)
+        total = sum(active.values())
+        indexed = {name: active[name] for name in sets}
+        sizes = {name: self._set_size(name, req, cats) for name in sets}
+        budget_rows = self.columns.size * self.max_candidate_share
+
+        # 1. rows matching all indexed criteria: filter the smallest posting
+        smallest = min(sets, key=sizes.get)
+        base = sets[smallest]()
+        partial = self.columns.score({n: req[n] for n in indexed}, rows=base, cats=cats)
+        inter = base[partial == sum(indexed.values())]
+
+        rows, scores = self.columns.top_k(req, k, rows=inter, cats=cats)
+        if len(rows) == k and scores[-1] > total - min(indexed.values()):
+            self.stats["intersection"] += 1
+            return rows, scores
+
+        # 2. rows matching one heavy criterion (outside rows all miss it)
+        for name in sorted(sets, key=lambda n: -indexed[n]):
+            if sizes[name] > budget_rows:
+                continue
+            rows, scores = self.columns.top_k(req, k, rows=sets[name](), cats=cats)
+            if len(rows) == k and scores[-1] > total - indexed[name]:
+                self.stats["single"] += 1
+                return rows, scores
+
+        # 3. rows matching any indexed criterion
+        outside_best = total - sum(indexed.values())
+        if sum(sizes.values()) <= budget_rows:
+            union = np.unique(np.concatenate([make() for make in sets.values()]))
+            rows, scores = self.columns.top_k(req, k, rows=union, cats=cats)
+            if outside_best == 0 or (len(rows) == k and scores[-1] > outside_best):
+                self.stats["union"] += 1
+                return rows, scores
+
+        # candidates would cost more than a vectorized full scan
+        self.stats["fallback"] += 1
+        return None
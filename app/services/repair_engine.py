@@ -39,14 +39,17 @@ class RepairEngine:
         "Other"
     ]
 
-    # SAVE REPAIR REQUEST TO DB
-    def save_request(self, db: Session, user_id: int, data: dict) -> RepairRequest:
-        req = RepairRequest(
+    def build_request(self, user_id: int, data: dict) -> RepairRequest:
+        return RepairRequest(
             user_id=user_id,
             category=data["category"],
             address=data["address"],
             description=data["description"],
         )
+
+    # SAVE REPAIR REQUEST TO DB
+    def save_request(self, db: Session, user_id: int, data: dict) -> RepairRequest:
+        req = self.build_request(user_id, data)
         db.add(req)
         db.commit()
         db.refresh(req)
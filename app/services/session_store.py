@@ -0,0 +1,438 @@
+# app/services/session_store.py
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import get_settings
+from app.services.conversation_memory import ConversationMemory
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output
+    orjson = None
+
+settings = get_settings()
+
+# Bump when the serialized layout of SessionState changes
+FORMAT = 2
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class SessionConflict(Exception):
+    """Another worker saved this session since it was loaded."""
+
+
+class SessionState:
+    """
+    Per-conversation state. __slots__ keeps each instance to a fixed,
+    small footprint (no per-instance __dict__).
+    """
+
+    __slots__ = (
+        "stage", "user_id", "user_name", "user_phone", "user_email",
+        "memory", "rental", "repair", "last_seen", "version",
+    )
+
+    def __init__(self):
+        self.stage: str = "start"
+        self.user_id: Optional[int] = None
+        self.user_name: Optional[str] = None
+        self.user_phone: Optional[str] = None
+        self.user_email: Optional[str] = None
+        self.memory = ConversationMemory()
+        self.rental: dict = {}      # search criteria, passed as-is to RentalEngine
+        self.repair: dict = {}
+        self.last_seen: float = time.monotonic()
+        self.version: int = 0       # store revision this state was loaded at
+
+    def sizeof(self) -> int:
+        """Approximate bytes held by this state (object + contents)."""
+        size = sys.getsizeof(self)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, ConversationMemory):
+                size += value.sizeof()
+                continue
+            size += sys.getsizeof(value)
+            if isinstance(value, dict):
+                size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+        return size
+
+    # -------------------------------------------------------------
+    # SERIALIZATION → compact JSON array (same bytes on every Python
+    # version, so hosts on different interpreters can share a store)
+    # -------------------------------------------------------------
+    def dumps(self) -> bytes:
+        return _dumps((
+            FORMAT, self.stage, self.user_id, self.user_name, self.user_phone,
+            self.user_email, self.memory.dump(), self.rental, self.repair,
+        ))
+
+    @classmethod
+    def loads(cls, data: bytes, version: int = 0) -> "SessionState":
+        fields = _loads(data)
+        if not isinstance(fields, list) or fields[0] != FORMAT:
+            raise ValueError("unsupported session format")
+
+        st = cls()
+        (_, st.stage, st.user_id, st.user_name, st.user_phone,
+         st.user_email, memory, st.rental, st.repair) = fields
+        st.memory = ConversationMemory.load(memory)
+        st.version = version
+        return st
+
+
+class SessionStore(ABC):
+    """Interface: where ConversationEngine keeps SessionState objects."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> SessionState:
+        """The session's state, created on first use."""
+
+    @abstractmethod
+    def put(self, session_id: str, st: SessionState):
+        """
+        Saves st after a turn. Shared stores raise SessionConflict if the
+        session changed since st was loaded (optimistic concurrency).
+        """
+
+    @abstractmethod
+    def exists(self, session_id: str) -> bool:
+        """True if the session has been saved and not expired (resume check)."""
+
+    @abstractmethod
+    def discard(self, session_id: str):
+        """Drops the session (client left for good)."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Counters for /health and /metrics."""
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local store with max-size LRU eviction and an idle TTL.
+
+    Same contract as the shared stores: a session exists once put() has
+    saved it, and expires `idle_ttl` seconds after its last save. Entries
+    are kept in save order, so expired sessions are always at the front:
+    each access drops them in amortized O(1).
+    """
+
+    def __init__(self, max_sessions: int | None = None, idle_ttl: float | None = None):
+        self.max_sessions = max_sessions or settings.SESSION_MAX
+        self.idle_ttl = settings.SESSION_IDLE_TTL if idle_ttl is None else idle_ttl
+        self._data: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.closed = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _expire(self, now: float):
+        if not self.idle_ttl:
+            return
+        while self._data:
+            session_id, st = next(iter(self._data.items()))
+            if now - st.last_seen < self.idle_ttl:
+                break
+            del self._data[session_id]
+            self.expired += 1
+
+    def get(self, session_id: str) -> SessionState:
+        with self._lock:
+            self._expire(time.monotonic())
+            st = self._data.get(session_id)
+            if st is None:
+                self.created += 1
+                st = SessionState()
+            return st
+
+    def put(self, session_id: str, st: SessionState):
+        # get() hands out the stored object itself, so this mostly touches
+        # it; but a session evicted or expired while its turn ran is saved
+        # again instead of being lost. No other process can see it, hence
+        # no conflict check.
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._data[session_id] = st
+            self._data.move_to_end(session_id)
+            st.last_seen = now
+            st.version += 1
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+                self.evicted += 1
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return session_id in self._data
+
+    def discard(self, session_id: str):
+        with self._lock:
+            if self._data.pop(session_id, None) is not None:
+                self.closed += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            states = list(self._data.values())
+
+        return {
+            "backend": "memory",
+            "live_sessions": len(states),
+            "bytes_held": sum(st.sizeof() for st in states),
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+            "created": self.created,
+            "closed": self.closed,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions shared by every worker process on one host, in a SQLite file
+    (WAL mode: readers never block the single writer).
+
+    Each row carries a version; put() only succeeds if the row still has
+    the version the state was loaded at, so two workers can never silently
+    overwrite each other's turn.
+    """
+
+    sweep_every = 256
+
+    def __init__(self, path: str | None = None, max_sessions: int | None = None,
+                 idle_ttl: float | None = None):
+        self.path = path or settings.SESSION_STORE_PATH
+        self.max_sessions = max_sessions or settings.SESSION_MAX
+        self.idle_ttl = settings.SESSION_IDLE_TTL if idle_ttl is None else idle_ttl
+        self._local = threading.local()
+        self._puts = 0
+
+        self.created = 0
+        self.closed = 0
+        self.conflicts = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._conn() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS session ("
+                "id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_session_updated_at ON session (updated_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; autocommit, each statement is atomic
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id: str) -> SessionState:
+        row = self._conn().execute(
+            "SELECT version, updated_at, data FROM session WHERE id = ?", (session_id,)
+        ).fetchone()
+
+        if row:
+            version, updated_at, data = row
+            if not self.idle_ttl or time.time() - updated_at < self.idle_ttl:
+                try:
+                    return SessionState.loads(data, version)
+                except ValueError:
+                    pass            # older format: start over
+            self._conn().execute("DELETE FROM session WHERE id = ? AND version = ?", (session_id, version))
+
+        self.created += 1
+        return SessionState()
+
+    def put(self, session_id: str, st: SessionState):
+        db = self._conn()
+        now = time.time()
+
+        if st.version == 0:
+            cur = db.execute(
+                "INSERT INTO session (id, version, updated_at, data) VALUES (?, 1, ?, ?) "
+                "ON CONFLICT (id) DO NOTHING",
+                (session_id, now, st.dumps()),
+            )
+        else:
+            cur = db.execute(
+                "UPDATE session SET version = version + 1, updated_at = ?, data = ? "
+                "WHERE id = ? AND version = ?",
+                (now, st.dumps(), session_id, st.version),
+            )
+
+        if cur.rowcount != 1:
+            self.conflicts += 1
+            raise SessionConflict(session_id)
+        st.version += 1
+
+        self._puts += 1
+        if self._puts % self.sweep_every == 0:
+            self.sweep()
+
+    def exists(self, session_id: str) -> bool:
+        cutoff = time.time() - self.idle_ttl if self.idle_ttl else 0
+        return self._conn().execute(
+            "SELECT 1 FROM session WHERE id = ? AND updated_at >= ?", (session_id, cutoff)
+        ).fetchone() is not None
+
+    def discard(self, session_id: str):
+        if self._conn().execute("DELETE FROM session WHERE id = ?", (session_id,)).rowcount:
+            self.closed += 1
+
+    def sweep(self) -> int:
+        """Drops idle sessions, then the least recently used beyond max_sessions."""
+        db = self._conn()
+        removed = 0
+        if self.idle_ttl:
+            removed += db.execute(
+                "DELETE FROM session WHERE updated_at < ?", (time.time() - self.idle_ttl,)
+            ).rowcount
+        removed += db.execute(
+            "DELETE FROM session WHERE id IN "
+            "(SELECT id FROM session ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        ).rowcount
+        return removed
+
+    def stats(self) -> dict:
+        self.sweep()
+        live, held = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM session"
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "live_sessions": live,
+            "bytes_held": held,
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+            "created": self.created,
+            "closed": self.closed,
+            "conflicts": self.conflicts,
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions in Redis or anything speaking its protocol (Valkey, KeyDB,
+    Dragonfly, a local stand-in), shared across hosts.
+
+    Each session is a hash {v: version, d: data} with the idle TTL as key
+    expiry; put() is a WATCH / MULTI compare-and-set on the version. Size
+    bounding is left to the server's maxmemory policy (e.g. allkeys-lru).
+    """
+
+    prefix = "session:"
+
+    def __init__(self, url: str | None = None, idle_ttl: float | None = None, client=None):
+        if client is None:
+            import redis    # optional dependency, only needed for SESSION_STORE=redis
+            client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.redis = client
+        self.idle_ttl = settings.SESSION_IDLE_TTL if idle_ttl is None else idle_ttl
+
+        self.created = 0
+        self.closed = 0
+        self.conflicts = 0
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def get(self, session_id: str) -> SessionState:
+        version, data = self.redis.hmget(self._key(session_id), "v", "d")
+        if data is not None:
+            try:
+                return SessionState.loads(data, int(version))
+            except ValueError:
+                # older format: start over, replacing it (CAS on the version)
+                st = SessionState()
+                st.version = int(version)
+                self.created += 1
+                return st
+
+        self.created += 1
+        return SessionState()
+
+    def put(self, session_id: str, st: SessionState):
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.hget(key, "v")
+                if int(current or 0) != st.version:
+                    raise WatchError()
+
+                pipe.multi()
+                pipe.hset(key, mapping={"v": st.version + 1, "d": st.dumps()})
+                if self.idle_ttl:
+                    pipe.expire(key, max(1, int(self.idle_ttl)))
+                pipe.execute()
+            except WatchError:
+                self.conflicts += 1
+                raise SessionConflict(session_id)
+
+        st.version += 1
+
+    def exists(self, session_id: str) -> bool:
+        return bool(self.redis.exists(self._key(session_id)))
+
+    def discard(self, session_id: str):
+        if self.redis.delete(self._key(session_id)):
+            self.closed += 1
+
+    def stats(self) -> dict:
+        # walks the keyspace: fine for a metrics endpoint, not a hot path
+        live = held = 0
+        for key in self.redis.scan_iter(match=self.prefix + "*", count=1000):
+            live += 1
+            held += self.redis.hstrlen(key, "d")
+        return {
+            "backend": "redis",
+            "live_sessions": live,
+            "bytes_held": held,
+            "idle_ttl": self.idle_ttl,
+            "created": self.created,
+            "closed": self.closed,
+            "conflicts": self.conflicts,
+        }
+
+
+def make_session_store() -> SessionStore:
+    if settings.SESSION_STORE == "memory":
+        return MemorySessionStore()
+    if settings.SESSION_STORE == "sqlite":
+        return SQLiteSessionStore()
+    if settings.SESSION_STORE == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE: {settings.SESSION_STORE!r}")
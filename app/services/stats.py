@@ -0,0 +1,307 @@
+# app/services/stats.py
+#
+# Dashboard counters, maintained as records are written.
+#
+#   python -m app.services.stats --rebuild     (recount existing tables once)
+
+import argparse
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import delete, event, func, inspect
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.database import create_db_and_tables, engine
+from app.models.rental_models import RentalSearch
+from app.models.repair_models import RepairRequest
+from app.models.stats_models import DailyCounter
+from app.models.user_models import User
+
+settings = get_settings()
+
+CounterKey = Tuple[date, str, str]
+COUNTED = (RentalSearch, RepairRequest, User)
+
+
+def _key(value) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def increments(obj) -> Iterable[Tuple[str, str]]:
+    """(metric, key) pairs a newly written record adds 1 to."""
+    if isinstance(obj, RentalSearch):
+        yield "searches", ""
+        yield "searches_by_location", _key(obj.location)
+        yield "searches_by_property_type", _key(obj.property_type)
+    elif isinstance(obj, RepairRequest):
+        yield "repairs", ""
+        yield "repairs_by_category", _key(obj.category)
+        yield "repairs_by_status", _key(obj.status)
+        if obj.status == "open":
+            yield "open_repairs_by_category", _key(obj.category)
+    elif isinstance(obj, User):
+        yield "users", ""
+
+
+class StatsCounters:
+    """
+    Per-day counters for the admin dashboard.
+
+    Every commit on this engine that inserts a search, repair or user bumps
+    in-memory counters: inserts are collected per connection by mapper
+    events and handed over by the engine's commit event (dropped on
+    rollback), so save_search, save_request and the write-behind writer are
+    all covered, and other engines (tests, tools) never touch them. A
+    background thread rolls them up into the `dailycounter` table every
+    `flush_interval` seconds with additive upserts, which is safe with
+    several workers. Reads touch only the counter table, never
+    rentalsearch / repairrequest.
+    """
+
+    def __init__(self, db_engine=None, flush_interval: float | None = None):
+        self.engine = db_engine or engine
+        self.flush_interval = flush_interval if flush_interval is not None else settings.STATS_FLUSH_INTERVAL
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushes = 0
+
+    # -------------------------------------------------------------
+    # CAPTURE (mapper events on the counted models, commit / rollback
+    # events on this engine only)
+    # -------------------------------------------------------------
+    def _listeners(self) -> list:
+        return [(model, "after_insert", self._after_insert) for model in COUNTED] + [
+            (RepairRequest, "before_update", self._before_update),
+            (self.engine, "commit", self._on_commit),
+            (self.engine, "rollback", self._on_rollback),
+        ]
+
+    def start(self):
+        if self._thread:
+            return
+        for target, name, fn in self._listeners():
+            event.listen(target, name, fn)
+
+        self._thread = threading.Thread(target=self._run, name="stats-rollup", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        for target, name, fn in self._listeners():
+            event.remove(target, name, fn)
+        self.flush()
+
+    def _pending_on(self, connection) -> Counter | None:
+        """Counts of the open transaction on `connection`; None for other engines."""
+        if connection.engine is not self.engine:
+            return None
+        return connection.info.setdefault("stats", Counter())
+
+    def _after_insert(self, _mapper, connection, obj):
+        pending = self._pending_on(connection)
+        if pending is None:
+            return
+        day = (getattr(obj, "created_at", None) or datetime.utcnow()).date()
+        for metric, key in increments(obj):
+            pending[(day, metric, key)] += 1
+
+    def _before_update(self, _mapper, connection, obj):
+        # repairs leaving / re-entering "open"; the old status is read from
+        # the row, as an instance expired by a commit has no history for it
+        state = inspect(obj)
+        if not state.attrs.status.history.added:
+            return
+        pending = self._pending_on(connection)
+        if pending is None:
+            return
+        old_status, category, created_at = connection.execute(
+            select(RepairRequest.status, RepairRequest.category, RepairRequest.created_at)
+            .where(RepairRequest.id == state.identity[0])
+        ).one()
+        if old_status == obj.status:
+            return
+        day, key = created_at.date(), _key(category)
+        if old_status == "open":
+            pending[(day, "open_repairs_by_category", key)] -= 1
+        if obj.status == "open":
+            pending[(day, "open_repairs_by_category", key)] += 1
+
+    def _on_commit(self, connection):
+        pending = connection.info.pop("stats", None)
+        if pending:
+            self.add(pending)
+
+    def _on_rollback(self, connection):
+        connection.info.pop("stats", None)
+
+    def add(self, counts: Dict[CounterKey, int]):
+        with self._lock:
+            self._pending.update(counts)
+
+    # -------------------------------------------------------------
+    # ROLLUP → dailycounter
+    # -------------------------------------------------------------
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print("❌ Stats rollup failed:", e)
+
+    def _upsert(self, db: Session, counts: Dict[CounterKey, int]):
+        rows = [{"day": d, "metric": m, "key": k, "count": n} for (d, m, k), n in counts.items()]
+        dialect = self.engine.dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(DailyCounter).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "metric", "key"],
+                set_={"count": DailyCounter.count + stmt.excluded["count"]},
+            )
+            db.exec(stmt)
+            return
+
+        for row in rows:
+            counter = db.get(DailyCounter, (row["day"], row["metric"], row["key"]))
+            if counter:
+                counter.count += row["count"]
+            else:
+                db.add(DailyCounter(**row))
+
+    def flush(self) -> int:
+        with self._lock:
+            counts, self._pending = self._pending, Counter()
+        if not counts:
+            return 0
+
+        try:
+            with Session(self.engine) as db:
+                self._upsert(db, counts)
+                db.commit()
+        except Exception:
+            # keep the increments for the next attempt
+            self.add(counts)
+            raise
+
+        self.flushes += 1
+        return len(counts)
+
+    # -------------------------------------------------------------
+    # READ
+    # -------------------------------------------------------------
+    def summary(self, days: int = 30, today: date | None = None) -> dict:
+        """
+        Totals and per-key breakdowns over the last `days` days, plus a
+        per-day series of the totals. Includes not yet rolled-up counts.
+        """
+        today = today or datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+
+        with Session(self.engine) as db:
+            rows = db.exec(select(DailyCounter).where(DailyCounter.day >= since)).all()
+            all_time = db.exec(
+                select(DailyCounter.metric, func.sum(DailyCounter.count))
+                .where(DailyCounter.key == "")
+                .group_by(DailyCounter.metric)
+            ).all()
+
+        counts = Counter({(r.day, r.metric, r.key): r.count for r in rows})
+        totals = Counter(dict(all_time))
+        with self._lock:
+            for (day, metric, key), n in self._pending.items():
+                if key == "":
+                    totals[metric] += n
+                if day >= since:
+                    counts[(day, metric, key)] += n
+
+        window, breakdown, series = Counter(), {}, {}
+        for (day, metric, key), n in counts.items():
+            if key == "":
+                window[metric] += n
+                series.setdefault(day.isoformat(), Counter())[metric] += n
+            elif metric != "open_repairs_by_category":
+                breakdown.setdefault(metric, Counter())[key] += n
+
+        return {
+            "since": since.isoformat(),
+            "days": days,
+            "totals": dict(totals),
+            "window_totals": dict(window),
+            "breakdown": {m: dict(c.most_common()) for m, c in sorted(breakdown.items())},
+            "daily": {d: dict(series[d]) for d in sorted(series)},
+            "open_repairs_by_category": self.open_repairs_by_category(),
+        }
+
+    def open_repairs_by_category(self) -> dict:
+        """All-time open repairs, from counters only."""
+        with Session(self.engine) as db:
+            rows = db.exec(
+                select(DailyCounter.key, func.sum(DailyCounter.count))
+                .where(DailyCounter.metric == "open_repairs_by_category")
+                .group_by(DailyCounter.key)
+            ).all()
+        out = Counter(dict(rows))
+        with self._lock:
+            for (_, metric, key), n in self._pending.items():
+                if metric == "open_repairs_by_category":
+                    out[key] += n
+        return {k: n for k, n in out.most_common() if n}
+
+    # -------------------------------------------------------------
+    # REBUILD (one-off recount of existing data)
+    # -------------------------------------------------------------
+    def rebuild(self) -> int:
+        counts: Counter = Counter()
+        with Session(self.engine) as db:
+            for model in COUNTED:
+                # stream in id order, constant memory
+                after = 0
+                while True:
+                    batch = db.exec(
+                        select(model).where(model.id > after).order_by(model.id).limit(5000)
+                    ).all()
+                    if not batch:
+                        break
+                    for obj in batch:
+                        for metric, key in increments(obj):
+                            counts[(obj.created_at.date(), metric, key)] += 1
+                    after = batch[-1].id
+                    db.expunge_all()
+
+            db.exec(delete(DailyCounter))
+            if counts:
+                self._upsert(db, counts)
+            db.commit()
+        return len(counts)
+
+
+counters = StatsCounters()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard counters")
+    parser.add_argument("--rebuild", action="store_true", help="recount from the existing tables")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    if args.rebuild:
+        print(f"✅ Rebuilt {counters.rebuild()} daily counters")
+    else:
+        print(counters.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# app/services/turn_executor.py
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class ExecutorBusy(Exception):
+    """Raised when no turn slot frees up within the submit timeout."""
+
+
+class TurnExecutor:
+    """
+    Admission control for chat turns, and a bounded thread pool for the
+    blocking ones.
+
+    - at most `max_pending` turns are admitted: pool turns (run(), running
+      or queued for a thread) plus turns generated on the event loop
+      (on_loop(), i.e. LLM answers); further turns wait for a slot and fail
+      with ExecutorBusy after `submit_timeout` seconds
+    - turns of the same session run strictly one after another when the
+      caller holds `ordered(session_id)` around the whole turn
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        submit_timeout: float | None = None,
+    ):
+        self.max_workers = max_workers or settings.TURN_WORKERS
+        self.max_pending = max(max_pending or settings.TURN_MAX_PENDING, self.max_workers)
+        self.submit_timeout = submit_timeout if submit_timeout is not None else settings.TURN_SUBMIT_TIMEOUT
+
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="turn")
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+
+        self._stats_lock = threading.Lock()
+        self.waiting = 0          # blocked on admission (backpressure)
+        self.queued = 0           # admitted, waiting for a pool thread
+        self.running = 0          # executing in a pool thread
+        self.in_loop = 0          # admitted, running on the event loop
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.total_queue_wait = 0.0
+        self.total_run_time = 0.0
+
+    # -------------------------------------------------------------
+    # SUBMIT
+    # -------------------------------------------------------------
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        return lock
+
+    def ordered(self, session_id: str) -> asyncio.Lock:
+        """Held for a whole turn: turns of one session never overlap."""
+        return self._session_lock(session_id)
+
+    @asynccontextmanager
+    async def _admitted(self):
+        """Holds a turn slot for the block (ExecutorBusy if none frees up in time)."""
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.submit_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorBusy()
+        finally:
+            self.waiting -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def on_loop(self):
+        """Admits a turn that runs on the event loop instead of the pool."""
+        async with self._admitted():
+            self.in_loop += 1
+            try:
+                yield
+            finally:
+                self.in_loop -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the pool once a turn slot is free."""
+        async with self._admitted():
+            return await self._in_pool(fn, *args, **kwargs)
+
+    async def _in_pool(self, fn: Callable, *args, **kwargs):
+        enqueued = time.perf_counter()
+        with self._stats_lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        def run():
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_queue_wait += started - enqueued
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.total_run_time += time.perf_counter() - started
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, run)
+
+    def forget(self, session_id: str):
+        """Drops the ordering lock of a closed session."""
+        lock = self._session_locks.get(session_id)
+        if lock is not None and not lock.locked():
+            del self._session_locks[session_id]
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+    # -------------------------------------------------------------
+    # METRICS
+    # -------------------------------------------------------------
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            done = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "waiting": self.waiting,
+                "queued": self.queued,
+                "running": self.running,
+                "in_loop": self.in_loop,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_queue_wait_ms": round(self.total_queue_wait / done * 1000, 3),
+                "avg_run_time_ms": round(self.total_run_time / done * 1000, 3),
+                "sessions": len(self._session_locks),
+            }
@@ -0,0 +1,311 @@
+# app/services/vector_store.py
+
+import glob
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.ann_index import IVFIndex, top_k
+from app.utils.text_cleaner import chunk_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes
+    fcntl = None
+
+
+INDEX_FILE = "index.json"
+FORMAT = 2
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _index_stamp(index_path: str):
+    st = os.stat(index_path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class Snapshot:
+    """One published index: entries, matrix and ANN always from the same build."""
+
+    __slots__ = ("entries", "embeddings", "ann", "version")
+
+    def __init__(self, entries: List[dict], embeddings: np.ndarray, ann: Optional[IVFIndex], version):
+        self.entries = entries
+        self.embeddings = embeddings
+        self.ann = ann
+        self.version = version
+
+
+class VectorStore:
+    """
+    On-disk embedding index for the RAG documents.
+
+    <path>/index.json            → model name, dim, matrix file, file hashes, chunk entries
+    <path>/embeddings-<id>.npy   → L2-normalized float32 matrix, one row per chunk
+    <path>/ivf-<id>.npz          → optional ANN index (large corpora only)
+
+    The matrix is opened with mmap_mode="r", so every worker process shares
+    the same page-cache copy. sync() skips files whose hash is unchanged and
+    only encodes chunks that are new or changed since the last build; it can
+    run offline while workers serve the previous build, which they pick up
+    with reload_if_changed().
+    """
+
+    def __init__(self, path: str, model_name: str, dim: int = 384,
+                 chunk_size: int = 500, chunk_overlap: int = 80, ann_min_rows: int = 20_000):
+        self.path = path
+        self.model_name = model_name
+        self.dim = dim
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.ann_min_rows = ann_min_rows
+
+        self.snapshot = Snapshot([], np.zeros((0, dim), dtype=np.float32), None, None)
+        self._stamp = None
+
+    # Readers should take `snapshot` once per operation; these are shortcuts
+    @property
+    def entries(self) -> List[dict]:
+        return self.snapshot.entries
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self.snapshot.embeddings
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    # -------------------------------------------------------------
+    # LOAD → build a new snapshot, then swap it in one assignment
+    # -------------------------------------------------------------
+    def _read_index(self) -> dict | None:
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print("⚠️ Vector store index unreadable, rebuilding:", e)
+            return None
+        if index.get("format") != FORMAT or index.get("model") != self.model_name \
+                or index.get("dim") != self.dim:
+            return None
+        return index
+
+    def load(self) -> bool:
+        """
+        Maps the published index into memory. Returns False if missing.
+        """
+        try:
+            stamp = _index_stamp(os.path.join(self.path, INDEX_FILE))
+        except OSError:
+            return False
+        index = self._read_index()
+        if index is None:
+            return False
+
+        entries = index["entries"]
+        try:
+            # a newer build may have replaced these files since index.json was read
+            embeddings = np.load(os.path.join(self.path, index["matrix"]), mmap_mode="r") if entries else \
+                np.zeros((0, self.dim), dtype=np.float32)
+            ann = IVFIndex.load(os.path.join(self.path, index["ivf"])) if index.get("ivf") else None
+        except OSError:
+            return False
+
+        self.snapshot = Snapshot(entries, embeddings, ann, index["matrix"])
+        self._stamp = stamp
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Loads a newly published index.json; True if the snapshot changed."""
+        try:
+            if _index_stamp(os.path.join(self.path, INDEX_FILE)) == self._stamp:
+                return False
+        except OSError:
+            return False
+        version = self.version
+        return self.load() and self.version != version
+
+    @property
+    def texts(self) -> List[str]:
+        return [e["text"] for e in self.entries]
+
+    # -------------------------------------------------------------
+    # SEARCH
+    # -------------------------------------------------------------
+    def search(self, q: np.ndarray, k: int, nprobe: int = 16, snapshot: Snapshot | None = None) -> List[tuple]:
+        """
+        Top-k (row, score) pairs for a normalized query vector, best first.
+        Dot product == cosine similarity since all rows are normalized.
+        Rows index `snapshot.entries` (default: the current snapshot).
+        """
+        snap = snapshot or self.snapshot
+        if not snap.entries:
+            return []
+
+        q = np.asarray(q, dtype=np.float32).reshape(-1)
+
+        if snap.ann is not None:
+            rows, scores = snap.ann.search(snap.embeddings, q, k, nprobe)
+        else:
+            all_scores = snap.embeddings @ q
+            rows = top_k(all_scores, k)
+            scores = all_scores[rows]
+
+        return [(int(r), float(s)) for r, s in zip(rows, scores)]
+
+    # -------------------------------------------------------------
+    # BUILD / SYNC
+    # -------------------------------------------------------------
+    @contextmanager
+    def _build_lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _scan(self, docs_path: str, old_files: Dict[str, str], old_by_source: Dict[str, List[dict]],
+              full: bool) -> tuple[List[dict], Dict[str, str], int]:
+        """(entries, file hashes, changed file count) for docs_path/*.txt."""
+        entries, files, changed = [], {}, 0
+        for path in sorted(glob.glob(os.path.join(docs_path, "*.txt"))):
+            source = os.path.basename(path)
+            with open(path, "rb") as f:
+                raw = f.read()
+            files[source] = hashlib.sha256(raw).hexdigest()
+
+            if not full and old_files.get(source) == files[source] and source in old_by_source:
+                # unchanged file: keep its chunks without re-chunking
+                entries.extend(old_by_source[source])
+                continue
+
+            changed += 1
+            for i, chunk in enumerate(chunk_text(raw.decode("utf-8"), self.chunk_size, self.chunk_overlap)):
+                entries.append({
+                    "source": source,
+                    "chunk": i,
+                    "hash": content_hash(chunk),
+                    "text": chunk,
+                })
+        return entries, files, changed
+
+    def sync(self, docs_path: str, encode: Callable[[List[str]], np.ndarray], batch_size: int = 256,
+             full: bool = False, on_batch: Callable[[int, int], None] | None = None) -> dict:
+        """
+        Brings the index in line with docs_path/*.txt, encoding only new or
+        changed chunks (`batch_size` at a time), then publishes and loads it.
+        `encode` must return normalized rows; `full` re-encodes everything.
+        on_batch(done, total) is called after each encoded batch.
+        Returns counts of files and reused/encoded/removed chunks.
+        """
+        with self._build_lock():
+            index = self._read_index()
+            old_entries = index["entries"] if index is not None else []
+            old_files = index.get("files", {}) if index is not None else {}
+            old_rows, old_by_source = {}, {}
+            old_matrix = None
+
+            if old_entries and not full:
+                matrix_path = os.path.join(self.path, index["matrix"])
+                if os.path.exists(matrix_path):
+                    old_matrix = np.load(matrix_path, mmap_mode="r")
+                    for row, e in enumerate(old_entries):
+                        old_rows[e["hash"]] = row
+                        old_by_source.setdefault(e["source"], []).append(e)
+
+            entries, files, changed = self._scan(docs_path, old_files, old_by_source, full)
+
+            reused = [old_rows.get(e["hash"]) for e in entries]
+            new_hashes = {e["hash"] for e in entries}
+            stats = {
+                "files": len(files),
+                "files_changed": changed,
+                "files_removed": sum(name not in files for name in old_files),
+                "chunks": len(entries),
+                "reused": sum(r is not None for r in reused),
+                "encoded": sum(r is None for r in reused),
+                "removed": sum(e["hash"] not in new_hashes for e in old_entries),
+            }
+
+            if index is not None and not full and files == old_files \
+                    and [e["hash"] for e in entries] == [e["hash"] for e in old_entries]:
+                self.load()
+                return stats
+
+            matrix = np.zeros((len(entries), self.dim), dtype=np.float32)
+
+            todo = [i for i, r in enumerate(reused) if r is None]
+            for start in range(0, len(todo), batch_size):
+                batch = todo[start:start + batch_size]
+                vectors = np.asarray(encode([entries[i]["text"] for i in batch]), dtype=np.float32)
+                matrix[batch] = vectors.reshape(len(batch), self.dim)
+                if on_batch:
+                    on_batch(start + len(batch), len(todo))
+
+            for i, r in enumerate(reused):
+                if r is not None:
+                    matrix[i] = old_matrix[r]
+
+            self._publish(entries, matrix, files)
+            self.load()
+            return stats
+
+    def _publish(self, entries: List[dict], matrix: np.ndarray, files: Dict[str, str]):
+        """
+        Writes new matrix (and ANN) files, then atomically swaps index.json
+        to them. Processes still mapping the old files keep valid handles.
+        """
+        digest = hashlib.sha256(
+            "".join(e["hash"] for e in entries).encode("utf-8") + matrix.tobytes()
+        ).hexdigest()[:16]
+        matrix_name = f"embeddings-{digest}.npy"
+        ivf_name = None
+
+        matrix_tmp = os.path.join(self.path, matrix_name + ".tmp")
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, matrix)
+        os.replace(matrix_tmp, os.path.join(self.path, matrix_name))
+
+        if len(matrix) >= self.ann_min_rows:
+            ivf_name = f"ivf-{digest}.npz"
+            ivf_tmp = os.path.join(self.path, ivf_name + ".tmp")
+            IVFIndex.build(matrix).save(ivf_tmp)
+            os.replace(ivf_tmp, os.path.join(self.path, ivf_name))
+
+        index_tmp = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(index_tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": FORMAT,
+                "model": self.model_name,
+                "dim": self.dim,
+                "matrix": matrix_name,
+                "ivf": ivf_name,
+                "files": files,
+                "entries": entries,
+            }, f)
+        os.replace(index_tmp, os.path.join(self.path, INDEX_FILE))
+
+        # Old matrices / ANN indexes are no longer referenced
+        current = {matrix_name, ivf_name}
+        for old in glob.glob(os.path.join(self.path, "embeddings-*.npy")) + \
+                glob.glob(os.path.join(self.path, "ivf-*.npz")):
+            if os.path.basename(old) not in current:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
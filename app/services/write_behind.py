@@ -0,0 +1,257 @@
+# app/services/write_behind.py
+
+import atexit
+import queue
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlmodel import Session, SQLModel, select
+
+from app.config import get_settings
+from app.database import engine
+from app.models.user_models import User
+from app.utils.helpers import TTLCache
+from app.utils.metrics import DB_WRITE_BATCH_SECONDS, stage as metrics_stage
+
+settings = get_settings()
+
+_STOP = object()
+
+
+class WriteJob(NamedTuple):
+    kind: str                                     # "user", "search", "repair"
+    build: Callable[[Optional[int]], SQLModel]    # user id → row to insert
+    user_id: Optional[int] = None
+    user_phone: Optional[str] = None              # resolves user_id when still None
+    stage: Optional[str] = None                   # turn's stage (metrics), filled in by submit()
+
+
+class WriteBehindWriter:
+    """
+    Persists chat records off the request path.
+
+    Jobs go into a bounded FIFO queue; a background thread drains it in
+    batches of up to `batch_size` (or whatever arrived within
+    `flush_interval`) and writes each batch in one transaction, so rows
+    of a batch share multi-row INSERTs and one commit.
+
+    - a full queue blocks the submitting turn (backpressure, nothing dropped)
+    - users are written before the rest of their batch, so a search or
+      repair submitted right after its (still queued) user gets its id
+    - a job without user_id finds its user by phone: in its own batch, in
+      the phone → id cache of users already written, or in the table. The
+      queue is FIFO, so the user's insert has always run first; if it
+      failed, the job fails too (ValueError, counted in `failed`).
+      ConversationEngine copies the id into the session via user_id()
+    - a failed batch is retried job by job; only the bad jobs are lost
+    - close() (shutdown / interpreter exit) drains the queue before
+      returning; jobs submitted afterwards are written synchronously
+    """
+
+    def __init__(
+        self,
+        db_engine=None,
+        max_queue: int | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+    ):
+        self.engine = db_engine or engine
+        self.batch_size = batch_size or settings.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.WRITE_BEHIND_FLUSH_INTERVAL
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue or settings.WRITE_BEHIND_QUEUE_SIZE)
+
+        # phone → user id, for jobs submitted before their user was written
+        self._user_ids = TTLCache(max_size=10_000, ttl=None)
+
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.blocked = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.last_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------------------------------------
+    # SUBMIT
+    # -------------------------------------------------------------
+    def submit(self, job: WriteJob):
+        if job.stage is None:
+            job = job._replace(stage=metrics_stage.get())
+
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self.submitted += 1
+
+        if closed:
+            self._write([job])
+            return
+
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.blocked += 1
+            self.queue.put(job)
+
+    def submit_user(self, name: str, phone: str | None, email: str | None):
+        self.submit(WriteJob(
+            "user", lambda _: User(name=name, phone=phone, email=email), user_phone=phone,
+        ))
+
+    def user_id(self, phone: str | None) -> Optional[int]:
+        """Id of a user this writer has inserted or looked up, else None."""
+        return self._user_ids.get(phone) if phone else None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until everything submitted so far is written."""
+        done = threading.Event()
+        threading.Thread(target=lambda: (self.queue.join(), done.set()), daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 30.0):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ Write-behind: {self.queue.qsize()} jobs still pending at shutdown")
+
+    # -------------------------------------------------------------
+    # BACKGROUND WRITER
+    # -------------------------------------------------------------
+    def _run(self):
+        stopping = False
+        while True:
+            try:
+                # once stopping, exit as soon as the queue stays empty
+                job = self.queue.get(timeout=0.1 if stopping else None)
+            except queue.Empty:
+                return
+            if job is _STOP:
+                stopping = True
+                self.queue.task_done()
+                continue
+
+            # collect whatever else arrives within the flush interval
+            batch = [job]
+            deadline = time.monotonic() + (0.0 if stopping else self.flush_interval)
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    self.queue.task_done()
+                    continue
+                batch.append(job)
+
+            self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def _resolve_user(self, db: Session, job: WriteJob) -> Optional[int]:
+        if job.user_id is not None or not job.user_phone:
+            return job.user_id
+
+        user_id = self._user_ids.get(job.user_phone)
+        if user_id is None:
+            user = db.exec(select(User).where(User.phone == job.user_phone)).first()
+            if user:
+                user_id = user.id
+                self._user_ids.set(job.user_phone, user_id)
+        return user_id
+
+    def _insert(self, db: Session, jobs: List[WriteJob]) -> int:
+        # 1. users (deduplicated by phone), so their ids are known below
+        users = []
+        for job in jobs:
+            if job.kind != "user" or self._resolve_user(db, job) is not None:
+                continue
+            if any(u.phone == job.user_phone for u in users):
+                continue
+            users.append(job.build(None))
+        if users:
+            db.add_all(users)
+            db.flush()
+
+        # 2. everything else, in one unit of work
+        new_ids = {u.phone: u.id for u in users if u.phone}
+        rows = []
+        for job in jobs:
+            if job.kind == "user":
+                continue
+            user_id = job.user_id or new_ids.get(job.user_phone) or self._resolve_user(db, job)
+            if user_id is None:
+                raise ValueError(f"no user for {job.kind} (phone {job.user_phone!r})")
+            rows.append(job.build(user_id))
+        db.add_all(rows)
+        db.commit()
+
+        for phone, user_id in new_ids.items():
+            self._user_ids.set(phone, user_id)
+        return len(users) + len(rows)
+
+    def _write(self, jobs: List[WriteJob]):
+        started = time.perf_counter()
+        written = 0
+
+        try:
+            with Session(self.engine) as db:
+                written = self._insert(db, jobs)
+        except Exception as e:
+            if len(jobs) == 1:
+                print(f"❌ Write-behind failed ({jobs[0].kind}):", e)
+                self.failed += 1
+            else:
+                # isolate the bad job(s), keep the rest
+                for job in jobs:
+                    try:
+                        with Session(self.engine) as db:
+                            written += self._insert(db, [job])
+                    except Exception as job_error:
+                        print(f"❌ Write-behind failed ({job.kind}):", job_error)
+                        self.failed += 1
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # the writer thread has no turn context: label by the jobs' stage
+        stages = {job.stage for job in jobs}
+        DB_WRITE_BATCH_SECONDS.observe(elapsed_ms / 1000, stage=stages.pop() if len(stages) == 1 else "mixed")
+        with self._lock:
+            self.written += written
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(jobs))
+            self.last_flush_ms = elapsed_ms
+            self.total_flush_ms += elapsed_ms
+
+    # -------------------------------------------------------------
+    # METRICS
+    # -------------------------------------------------------------
+    def metrics(self) -> dict:
+        return {
+            "mode": "write_behind",
+            "pending": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "submitted": self.submitted,
+            "blocked": self.blocked,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.batches, 2) if self.batches else 0.0,
+            "closed": self._closed,
+        }
@@ -9,25 +9,33 @@ document.addEventListener("DOMContentLoaded", () => {
     const connStatus = document.getElementById("connection-status");
 
     let ws = null;
+    let streamBubble = null;
+    let streamText = "";
+    let sessionId = null;       // issued by the server, sent back on reconnect
+    let retryDelay = 1000;
 
     function connectWebSocket() {
         const protocol = window.location.protocol === "https:" ? "wss" : "ws";
-        const wsUrl = `${protocol}://${window.location.host}/ws`;
+        const query = sessionId ? `?session=${encodeURIComponent(sessionId)}` : "";
+        const wsUrl = `${protocol}://${window.location.host}/ws${query}`;
         ws = new WebSocket(wsUrl);
 
         ws.onopen = () => {
             if (connDot) connDot.classList.remove("bg-red-500");
             if (connDot) connDot.classList.add("bg-emerald-400");
             if (connStatus) connStatus.textContent = "Connected";
-
-            // Trigger initial greeting
-            ws.send(JSON.stringify({ text: "start" }));
+            retryDelay = 1000;
         };
 
         ws.onclose = () => {
             if (connDot) connDot.classList.remove("bg-emerald-400");
             if (connDot) connDot.classList.add("bg-red-500");
-            if (connStatus) connStatus.textContent = "Disconnected";
+            if (connStatus) connStatus.textContent = "Reconnecting…";
+
+            // Resume the same conversation (possibly on another worker)
+            streamBubble = null;
+            setTimeout(connectWebSocket, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, 15000);
         };
 
         ws.onerror = () => {
@@ -39,7 +47,15 @@ document.addEventListener("DOMContentLoaded", () => {
         ws.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
-                renderBotResponse(data);
+                if (data.session !== undefined) {
+                    sessionId = data.session;
+                    // New (or expired) conversation: trigger the greeting
+                    if (!data.resumed) ws.send(JSON.stringify({ text: "start" }));
+                } else if (data.delta !== undefined) {
+                    renderDelta(data.delta);
+                } else {
+                    renderBotResponse(data);
+                }
             } catch (err) {
                 console.error("Invalid bot response:", err);
             }
@@ -51,6 +67,12 @@ document.addEventListener("DOMContentLoaded", () => {
         messagesEl.scrollTop = messagesEl.scrollHeight;
     }
 
+    function formatText(text) {
+        return text
+            .replace(/\n/g, "<br>")
+            .replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
+    }
+
     function createMessageBubble(text, side = "bot") {
         const wrapper = document.createElement("div");
         wrapper.className = `flex ${side === "user" ? "justify-end" : "justify-start"}`;
@@ -61,13 +83,23 @@ document.addEventListener("DOMContentLoaded", () => {
                 ? "max-w-[80%] rounded-2xl px-3 py-2 text-xs sm:text-sm bg-emerald-500 text-slate-900 shadow-md"
                 : "max-w-[80%] rounded-2xl px-3 py-2 text-xs sm:text-sm bg-slate-800 text-slate-100 border border-slate-700 shadow-md";
 
-        bubble.innerHTML = text
-            .replace(/\n/g, "<br>")
-            .replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
+        bubble.innerHTML = formatText(text);
 
         wrapper.appendChild(bubble);
         messagesEl.appendChild(wrapper);
         scrollToBottom();
+        return bubble;
+    }
+
+    // Partial LLM output: grow one bubble until the final response arrives
+    function renderDelta(delta) {
+        if (!streamBubble) {
+            streamText = "";
+            streamBubble = createMessageBubble("", "bot");
+        }
+        streamText += delta;
+        streamBubble.innerHTML = formatText(streamText);
+        scrollToBottom();
     }
 
     function clearOptions() {
@@ -150,7 +182,13 @@ document.addEventListener("DOMContentLoaded", () => {
         if (!data) return;
 
         const text = data.text || "";
-        createMessageBubble(text, "bot");
+        if (streamBubble) {
+            streamBubble.innerHTML = formatText(text);
+            streamBubble = null;
+            streamText = "";
+        } else {
+            createMessageBubble(text, "bot");
+        }
 
         renderOptions(data.options || []);
         renderProperties(data.properties || []);
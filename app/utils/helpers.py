@@ -0,0 +1,146 @@
+# app/utils/helpers.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a max size and per-entry time-to-live.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+
+            expires, value = item
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class Lazy:
+    """
+    Builds a heavy component on first use, or ahead of time in a background
+    thread via start(). status() reports pending / loading / ready / failed.
+    """
+
+    def __init__(self, name: str, factory):
+        self.name = name
+        self.factory = factory
+        self.state = "pending"
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def peek(self):
+        """The instance if already built, else None (never blocks)."""
+        return self._value if self.state == "ready" else None
+
+    def get(self):
+        if self.state == "ready":
+            return self._value
+
+        with self._lock:
+            if self.state != "ready":
+                self._load()
+        if self.state == "failed":
+            raise RuntimeError(f"{self.name} failed to load: {self.error}")
+        return self._value
+
+    def _load(self):
+        self.state = "loading"
+        started = time.perf_counter()
+        try:
+            self._value = self.factory()
+            self.state = "ready"
+            self.error = None
+        except Exception as e:
+            print(f"❌ Failed to load {self.name}:", e)
+            self.state = "failed"
+            self.error = str(e)
+        self.load_seconds = round(time.perf_counter() - started, 3)
+
+    def start(self) -> threading.Thread | None:
+        """Loads in a background thread; None if already loading or loaded."""
+        with self._lock:
+            if self.state != "pending":
+                return None
+            self.state = "loading"
+
+        def run():
+            try:
+                self.get()
+            except RuntimeError:
+                pass
+
+        thread = threading.Thread(target=run, name=f"warmup-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
@@ -0,0 +1,244 @@
+# app/utils/metrics.py
+#
+# Minimal Prometheus instrumentation: counters, gauges and histograms with
+# labels, rendered in the text exposition format at /metrics.
+#
+# Hot-path cost is one dict lookup + one short lock per observation.
+# Numbers the services already keep (cache hits, gate / executor state) are
+# read at scrape time by collectors instead of being counted twice.
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Conversation stage of the turn being handled: the default "stage" label
+stage: ContextVar[str] = ContextVar("stage", default="none")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]        # (name suffix, labels, value)
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if "stage" in self.labelnames and "stage" not in labels:
+            labels["stage"] = stage.get()
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _child(self, labels: Dict[str, str]):
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Per-label-set state: an object with samples()."""
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            for suffix, extra, value in child.samples():
+                yield suffix, {**labels, **extra}, value
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, amount: float):
+        with self.lock:
+            self.value += amount
+
+    def samples(self):
+        yield "", {}, self.value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._child(labels).add(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._child(labels).add(amount)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self._child(labels).add(-amount)
+
+    @contextmanager
+    def track(self, **labels):
+        """In-flight gauge around a block."""
+        child = self._child(labels)
+        child.add(1)
+        try:
+            yield
+        finally:
+            child.add(-1)
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)      # last one: +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def samples(self):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, n in zip(self.bounds + (float("inf"),), counts):
+            cumulative += n
+            yield "_bucket", {"le": _number(bound)}, cumulative
+        yield "_sum", {}, total
+        yield "_count", {}, cumulative
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float, **labels):
+        self._child(labels).observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the block's duration in seconds (also when it raises)."""
+        child = self._child(labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - started)
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def collector(self, fn: Callable[[], Iterable[tuple]]):
+        """fn() yields (name, kind, help, [(labels, value), ...]) at scrape time."""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics:
+            lines.append(f"# HELP {m.name} {_escape_help(m.help)}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for suffix, labels, value in m.samples():
+                lines.append(f"{m.name}{suffix}{_labels(labels)} {_number(value)}")
+
+        for fn in self.collectors:
+            try:
+                families = list(fn())
+            except Exception as e:
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} failed: {_escape_help(e)}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(help)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# -------------------------------------------------------------
+# APP METRICS (labelled by conversation stage where it applies)
+# -------------------------------------------------------------
+TURN_SECONDS = registry.histogram("chat_turn_seconds", "Whole chat turn (ConversationEngine.handle)", ["stage"])
+TURNS_IN_FLIGHT = registry.gauge("chat_turns_in_flight", "Chat turns being handled")
+RAG_RETRIEVE_SECONDS = registry.histogram("rag_retrieve_seconds", "RAGEngine.retrieve", ["stage"])
+LLM_GENERATE_SECONDS = registry.histogram("llm_generate_seconds", "Ollama generation", ["stage"])
+LLM_CALLS = registry.counter("llm_calls_total", "LLM requests by outcome", ["result"])
+RENTAL_MATCH_SECONDS = registry.histogram("rental_find_matches_seconds", "RentalEngine.find_matches", ["stage"])
+DB_SAVE_SECONDS = registry.histogram("db_save_seconds", "Chat record save: commit, or write-behind enqueue",
+                                     ["kind", "mode", "stage"])
+DB_WRITE_BATCH_SECONDS = registry.histogram("db_write_batch_seconds",
+                                            "Write-behind batch insert + commit (stage \"mixed\" if its jobs differ)",
+                                            ["stage"])
+SESSIONS = registry.counter("chat_sessions_total", "WebSocket chat sessions opened", ["resumed"])
+SESSIONS_ACTIVE = registry.gauge("chat_sessions_active", "Open WebSocket chat sessions")
@@ -0,0 +1,263 @@
+# app/utils/profiler.py
+#
+# Opt-in sampling profiler for a running worker.
+#
+#   POST /api/profiler/start?rate=0.2&interval_ms=5&duration=60
+#   POST /api/profiler/stop        → app/data/profiles/profile-<time>-<pid>.folded
+#
+# A fraction `rate` of chat turns and HTTP requests is sampled. While a
+# sampled unit runs, a background thread reads its thread's Python stack
+# every `interval` seconds. Identical stacks are counted and written in the
+# "folded" format (`root;frame;frame count`), which flamegraph.pl,
+# speedscope and inferno all read. When stopped, the only cost left is one
+# attribute check per turn / request.
+#
+# Stacks are attributed per thread, so a unit opened on the event loop
+# thread (an async LLM turn) can't tell its samples from other sessions'
+# coroutines and WebSocket I/O: those are recorded under `event-loop`.
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+from app.config import get_settings
+
+settings = get_settings()
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# threads that serve HTTP requests: the event loop and Starlette's sync pool
+HTTP_THREADS = ("MainThread", "AnyIO worker thread")
+_NOT_SAMPLED = nullcontext()
+EVENT_LOOP = "event-loop"
+
+
+def _frame_label(code, cache: Dict[object, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        path = code.co_filename
+        if path.startswith(APP_ROOT):
+            path = os.path.relpath(path, os.path.dirname(APP_ROOT))
+        else:
+            path = os.path.basename(path)
+        name = getattr(code, "co_qualname", code.co_name)
+        label = cache[code] = f"{name} ({path}:{code.co_firstlineno})".replace(";", ":")
+    return label
+
+
+class SamplingProfiler:
+
+    def __init__(self):
+        self.active = False
+        self.rate = settings.PROFILE_SAMPLE_RATE
+        self.interval = settings.PROFILE_INTERVAL_MS / 1000
+
+        self._lock = threading.Lock()
+        self._threads: Dict[int, List[str]] = {}    # thread id → root labels of sampled units
+        self._broad: List[str] = []                  # sampled HTTP requests in flight
+        self._stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self._deadline = None
+
+        self.samples = 0
+        self.units = 0
+        self.last: dict | None = None
+
+    # -------------------------------------------------------------
+    # CONTROL
+    # -------------------------------------------------------------
+    def start(self, rate: float | None = None, interval_ms: float | None = None,
+              duration: float | None = None) -> dict:
+        with self._lock:
+            if self.active:
+                return self.status()
+            self.rate = settings.PROFILE_SAMPLE_RATE if rate is None else rate
+            self.interval = (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000
+            duration = min(duration or settings.PROFILE_MAX_SECONDS, settings.PROFILE_MAX_SECONDS)
+
+            self._stacks = Counter()
+            self.samples = self.units = 0
+            self._started_at = time.time()
+            self._deadline = time.monotonic() + duration
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self.active = True
+            self._thread.start()
+        print(f"🔬 Profiler started (rate {self.rate}, every {self.interval * 1000:g} ms, up to {duration:g}s)")
+        return self.status()
+
+    def stop(self) -> dict | None:
+        """Stops sampling and writes the profile; returns its summary."""
+        thread = self._thread
+        if thread is None:
+            return self.last
+        self._stop.set()
+        thread.join()
+        return self.last
+
+    def status(self) -> dict:
+        return {
+            "active": self.active,
+            "rate": self.rate,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "sampled_units": self.units,
+            "seconds_left": round(max(0.0, self._deadline - time.monotonic()), 1) if self.active else None,
+            "last": self.last,
+        }
+
+    # -------------------------------------------------------------
+    # HOOKS (a shared no-op context unless active and sampled)
+    # -------------------------------------------------------------
+    def unit(self, kind: str, detail: str = ""):
+        """
+        Profiles the current thread for the duration of a turn (root
+        `kind:detail`, or `event-loop` when called on the loop's thread).
+        """
+        if not self.active or random.random() >= self.rate:
+            return _NOT_SAMPLED
+        return self._unit(EVENT_LOOP if self._on_event_loop() else f"{kind}:{detail}")
+
+    @staticmethod
+    def _on_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    @contextmanager
+    def _unit(self, label: str):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.setdefault(ident, []).append(label)
+            self.units += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                labels = self._threads.get(ident)
+                if labels:
+                    labels.remove(label)
+                    if not labels:
+                        del self._threads[ident]
+
+    def broad(self, label: str):
+        """
+        Profiles every request-serving thread that is running app code while
+        the block runs: sync endpoints execute on pool threads the caller
+        can't name.
+        """
+        if not self.active or random.random() >= self.rate:
+            return _NOT_SAMPLED
+        return self._broad_unit(label)
+
+    @contextmanager
+    def _broad_unit(self, label: str):
+        with self._lock:
+            self._broad.append(label)
+            self.units += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._broad.remove(label)
+
+    # -------------------------------------------------------------
+    # SAMPLER
+    # -------------------------------------------------------------
+    def _fold(self, frame, root: str) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code, self._labels))
+            frame = frame.f_back
+        labels.append(root)
+        return ";".join(reversed(labels))
+
+    @staticmethod
+    def _runs_app_code(frame) -> bool:
+        while frame is not None:
+            if frame.f_code.co_filename.startswith(APP_ROOT):
+                return True
+            frame = frame.f_back
+        return False
+
+    def _sample(self):
+        me = threading.get_ident()
+        with self._lock:
+            threads = {ident: labels[-1] for ident, labels in self._threads.items()}
+            broad = self._broad[-1] if self._broad else None
+        if not threads and broad is None:
+            return
+
+        names = {t.ident: t.name for t in threading.enumerate()} if broad else {}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            root = threads.get(ident)
+            if root is None:
+                if broad is None or names.get(ident) not in HTTP_THREADS or not self._runs_app_code(frame):
+                    continue
+                root = broad
+            self._stacks[self._fold(frame, root)] += 1
+            self.samples += 1
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if time.monotonic() >= self._deadline:
+                    break
+                try:
+                    self._sample()
+                except Exception as e:
+                    print("⚠️ Profiler sample failed:", e)
+        finally:
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self.active = False
+            self._thread = None
+            stacks, self._stacks = self._stacks, Counter()
+
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            settings.PROFILE_DIR,
+            f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self._started_at))}-{os.getpid()}.folded",
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        self.last = {
+            "path": path,
+            "samples": self.samples,
+            "sampled_units": self.units,
+            "distinct_stacks": len(stacks),
+            "seconds": round(time.time() - self._started_at, 1),
+        }
+        print(f"🔬 Profiler stopped: {self.samples} samples → {path}")
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware: samples HTTP requests while the profiler is on."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.active or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with profiler.broad(f"http:{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
@@ -0,0 +1,81 @@
+# app/utils/text_cleaner.py
+
+import re
+from typing import List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_NON_WORD = re.compile(r"[^\w]+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Cache key form of a user question: "Boiler not working?!" → "boiler not working".
+    """
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough LLM token count: words and punctuation, plus ~30% for words the
+    tokenizer splits further. Close enough to budget prompts with.
+    """
+    pieces = len(_TOKEN.findall(text))
+    return pieces + (pieces * 3 + 9) // 10
+
+
+def first_sentence(text: str, max_chars: int = 120) -> str:
+    line = text.strip().split("\n", 1)[0]
+    sentence = _SENTENCE_END.split(line, 1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 1].rstrip() + "…"
+
+
+def _units(text: str, max_chars: int) -> List[str]:
+    """
+    Splits text into lines, long lines into sentences, and anything still
+    longer than max_chars into hard slices.
+    """
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        pieces = [line] if len(line) <= max_chars else _SENTENCE_END.split(line)
+        for piece in pieces:
+            for i in range(0, len(piece), max_chars):
+                units.append(piece[i:i + max_chars])
+    return units
+
+
+def chunk_text(text: str, max_chars: int = 500, overlap: int = 80) -> List[str]:
+    """
+    Packs lines/sentences into chunks of at most max_chars. Consecutive
+    chunks share up to `overlap` trailing characters of whole units so an
+    answer split across a boundary is still retrievable.
+    """
+    chunks = []
+    current: List[str] = []
+    size = 0
+
+    for unit in _units(text, max_chars):
+        if current and size + len(unit) + 1 > max_chars:
+            chunks.append("\n".join(current))
+
+            # carry trailing units into the next chunk
+            carry, carried = [], 0
+            for prev in reversed(current):
+                if carried + len(prev) + 1 > overlap:
+                    break
+                carry.insert(0, prev)
+                carried += len(prev) + 1
+            if carried + len(unit) + 1 > max_chars:
+                carry, carried = [], 0
+            current, size = carry, carried
+
+        current.append(unit)
+        size += len(unit) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
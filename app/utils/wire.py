@@ -0,0 +1,64 @@
+# app/utils/wire.py
+#
+# WebSocket frame encoding / decoding.
+#
+# - static replies (menus, prompts): serialized once by freeze(), then sent
+#   as the cached JSON string
+# - other replies: pydantic's own serializer (faster than dumping the
+#   model to a dict for orjson)
+# - stream deltas, one per LLM token: orjson when installed
+# - incoming frames: parsed and validated in one pass, plain text fallback
+
+import json
+from typing import Dict, Tuple
+
+from pydantic import ValidationError
+
+from app.models.chat_models import ChatBotResponse, ChatClientMessage
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output
+    orjson = None
+
+# id → (response, frame). Holding the response keeps its id from being reused.
+_frozen: Dict[int, Tuple[ChatBotResponse, str]] = {}
+
+
+def dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def freeze(response: ChatBotResponse) -> ChatBotResponse:
+    """Marks a shared reply as static: serialized now, never mutated after."""
+    _frozen[id(response)] = (response, response.model_dump_json())
+    return response
+
+
+def is_static(response: ChatBotResponse) -> bool:
+    return id(response) in _frozen
+
+
+def encode_response(response: ChatBotResponse) -> str:
+    entry = _frozen.get(id(response))
+    return entry[1] if entry is not None else response.model_dump_json()
+
+
+def delta_frame(chunk: str) -> str:
+    """Same JSON as ChatStreamDelta(delta=chunk).model_dump_json()."""
+    return dumps({"delta": chunk})
+
+
+def session_frame(session_id: str, resumed: bool) -> str:
+    """Same JSON as ChatSession(session=..., resumed=...).model_dump_json()."""
+    return dumps({"session": session_id, "resumed": resumed})
+
+
+def decode_message(raw: str) -> ChatClientMessage:
+    """{"text": ...} frames; anything else is taken as the message text."""
+    try:
+        return ChatClientMessage.model_validate_json(raw)
+    except ValidationError:
+        return ChatClientMessage(text=raw)
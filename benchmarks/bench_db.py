@@ -0,0 +1,117 @@
+# benchmarks/bench_db.py
+#
+# Hot database paths on a default engine with the indexes dropped
+# ("before") vs the tuned engine with the indexed schema ("after"):
+# phone lookups, matches by search, repairs by user, and inserts.
+#
+#   python -m benchmarks.bench_db --users 10000 --searches 20000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, select
+
+from app.database import create_db_and_tables, make_engine
+from app.models.rental_models import RentalMatch
+from app.models.repair_models import RepairRequest
+from app.models.user_models import User
+from app.services.rental_engine import RentalEngine
+from app.services.repair_engine import RepairEngine
+from benchmarks.synthetic import make_properties, make_requirements
+
+
+def seed(db_engine, users: int, searches: int, rng: random.Random):
+    rental = RentalEngine(make_properties(2_000))
+    repair = RepairEngine()
+    reqs = make_requirements(200)
+
+    with Session(db_engine) as db:
+        db.add_all(User(name=f"user {i}", phone=f"07{i:09d}") for i in range(users))
+        db.commit()
+
+        for start in range(0, searches, 1_000):
+            for _ in range(start, min(searches, start + 1_000)):
+                req = reqs[rng.randrange(len(reqs))]
+                user_id = rng.randint(1, users)
+                db.add(rental.build_search(user_id, req, rental.find_matches(req)))
+                db.add(repair.build_request(user_id, {"category": "Plumbing", "address": "1 High Street",
+                                                      "description": "Leaking tap"}))
+            db.commit()
+
+
+def rate(fn, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - started)
+
+
+def measure(db_engine, users: int, searches: int, ops: int, rng: random.Random) -> dict:
+    phones = [f"07{rng.randrange(users):09d}" for _ in range(ops)]
+    search_ids = [rng.randint(1, searches) for _ in range(ops)]
+    user_ids = [rng.randint(1, users) for _ in range(ops)]
+    out = {}
+
+    with Session(db_engine) as db:
+        out["user by phone"] = rate(lambda i: db.exec(select(User).where(User.phone == phones[i])).first(), ops)
+        out["matches by search"] = rate(
+            lambda i: db.exec(select(RentalMatch).where(RentalMatch.search_id == search_ids[i])).all(), ops
+        )
+        out["repairs by user"] = rate(
+            lambda i: db.exec(select(RepairRequest).where(RepairRequest.user_id == user_ids[i])).all(), ops
+        )
+
+    # one commit per insert, as the synchronous chat path does
+    def insert(i):
+        with Session(db_engine) as db:
+            db.add(RepairRequest(user_id=user_ids[i], category="Electrical", address="2 Mill Lane",
+                                 description="No power"))
+            db.commit()
+
+    out["insert + commit"] = rate(insert, min(ops, 500))
+    return out
+
+
+def build(path: str, tuned: bool, users: int, searches: int):
+    db_engine = make_engine(f"sqlite:///{path}", tuned=tuned)
+    if tuned:
+        create_db_and_tables(db_engine)
+    else:
+        SQLModel.metadata.create_all(db_engine)
+        with db_engine.begin() as conn:
+            for table in SQLModel.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    seed(db_engine, users, searches, random.Random(1))
+    return db_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database lookup / insert benchmark")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--searches", type=int, default=20_000)
+    parser.add_argument("--ops", type=int, default=2_000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuned in (("before", False), ("after", True)):
+            t = time.perf_counter()
+            db_engine = build(os.path.join(tmp, f"{label}.db"), tuned, args.users, args.searches)
+            print(f"🗄  {label}: seeded {args.users:,} users / {args.searches:,} searches "
+                  f"in {time.perf_counter() - t:.1f}s")
+            results[label] = measure(db_engine, args.users, args.searches, args.ops, random.Random(2))
+            db_engine.dispose()
+
+    print(f"\n{'ops/s':<20}{'before':>12}{'after':>12}{'speed-up':>10}")
+    for name in results["before"]:
+        before, after = results["before"][name], results["after"][name]
+        print(f"{name:<20}{before:>12,.0f}{after:>12,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
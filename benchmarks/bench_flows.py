@@ -0,0 +1,323 @@
+# benchmarks/bench_flows.py
+#
+# End-to-end ConversationEngine.handle() flows (onboarding, rental, repair,
+# general questions), in-process, against the fake Ollama server, a hashed
+# bag-of-words embedder and synthetic catalogues. Reports p50/p95/p99 per
+# stage, plus RentalEngine.find_matches and RAGEngine.retrieve on their own,
+# and the WebSocket frame (de)serialization cost per message in µs.
+#
+#   python -m benchmarks.bench_flows --properties 100000 --docs 500 --sessions 200 --output flows.json
+#   python -m benchmarks.bench_flows --compare flows.json          (same run, diffed against a saved one)
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.synthetic import make_documents, make_properties, make_questions, make_requirements
+from tools.fake_embedder import HashEmbedder
+from tools.fake_ollama import start_in_thread
+
+FLOWS = ["rental", "repair", "general"]     # each session starts with onboarding
+
+
+# -------------------------------------------------------------
+# SCRIPTS: (stage, message) per turn
+# -------------------------------------------------------------
+def onboarding(i: int) -> List[tuple]:
+    return [
+        ("onboarding.step", "hi"),
+        ("onboarding.step", f"Bench User {i}"),
+        ("onboarding.step", f"07{i:09d}"),
+        ("onboarding.register", f"user{i}@example.com"),
+    ]
+
+
+def rental(req: dict) -> List[tuple]:
+    furnished = {True: "furnished", False: "unfurnished", None: "none"}[req["furnished"]]
+    return [
+        ("rental.step", "rent"),
+        ("rental.step", req["location"]),
+        ("rental.step", req["property_type"]),
+        ("rental.step", str(req["bedrooms"])),
+        ("rental.step", str(req["budget"] or "")),
+        ("rental.step", furnished),
+        ("rental.step", "yes" if req["garden"] else "no"),
+        ("rental.match", "yes" if req["parking"] else "no"),
+    ]
+
+
+def repair(rng: random.Random, categories: List[str]) -> List[tuple]:
+    return [
+        ("repair.step", "repair"),
+        ("repair.step", rng.choice(categories)),
+        ("repair.step", f"{rng.randint(1, 200)} High Street"),
+        ("repair.submit", "Water is dripping through the ceiling below the bathroom"),
+        ("repair.step", "done"),
+    ]
+
+
+def general(questions: List[str]) -> List[tuple]:
+    # outside "general" the intent menu doesn't route free text to the LLM
+    return [("general.llm", "general")] + [("general.llm", f"General question: {q}") for q in questions]
+
+
+# -------------------------------------------------------------
+# STATS
+# -------------------------------------------------------------
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize(times: List[float]) -> dict:
+    ordered = sorted(times)
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(_percentile(ordered, 0.50), 3),
+        "p95": round(_percentile(ordered, 0.95), 3),
+        "p99": round(_percentile(ordered, 0.99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def print_stages(stages: Dict[str, dict], baseline: Dict[str, dict] | None = None, unit: str = "ms"):
+    print(f"\n   {'stage':<22}{'count':>7}{'p50 ' + unit:>10}{'p95 ' + unit:>10}{'p99 ' + unit:>10}"
+          + ("   p50 / p95 vs baseline" if baseline else ""))
+    for name, s in stages.items():
+        line = f"   {name:<22}{s['count']:>7}{s['p50']:>10.2f}{s['p95']:>10.2f}{s['p99']:>10.2f}"
+        old = (baseline or {}).get(name)
+        if old:
+            deltas = [
+                f"{(s[p] - old[p]) / old[p] * 100:+6.1f}%" if old[p] else "     -"
+                for p in ("p50", "p95")
+            ]
+            line += "   " + " / ".join(deltas)
+        print(line)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# -------------------------------------------------------------
+# ENVIRONMENT (before any app import: settings are read at import)
+# -------------------------------------------------------------
+def configure(args, workdir: str, ollama_url: str):
+    os.environ.update({
+        "OLLAMA_URL": ollama_url,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "RAG_DOCS_PATH": os.path.join(workdir, "rag_docs"),
+        "VECTOR_STORE_PATH": os.path.join(workdir, "vectorstore"),
+        "RAG_RELOAD_INTERVAL": "0",
+        "SESSION_STORE": args.session_store,
+        "SESSION_STORE_PATH": os.path.join(workdir, "sessions.db"),
+        "DB_WRITE_MODE": args.write_mode,
+        "ANSWER_CACHE_ENABLED": str(not args.no_answer_cache).lower(),
+    })
+
+    os.makedirs(os.environ["RAG_DOCS_PATH"])
+    for name, text in make_documents(args.docs, seed=args.seed).items():
+        with open(os.path.join(os.environ["RAG_DOCS_PATH"], name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def run(args) -> dict:
+    from sqlmodel import Session
+
+    from app.database import create_db_and_tables, engine as db_engine
+    from app.services.conversation_engine import ConversationEngine
+    from app.services.rag_engine import RAGEngine
+    from app.services.rental_engine import RentalEngine
+    from app.utils.helpers import Lazy
+    from app.utils.wire import decode_message, delta_frame, encode_response, is_static
+
+    setup = {}
+    create_db_and_tables()
+
+    # ---------------- components, built up front ----------------
+    t = time.perf_counter()
+    if args.embedder == "hash":
+        rag = RAGEngine(reload_interval=0, model=HashEmbedder(), model_name=HashEmbedder.NAME)
+    else:
+        rag = RAGEngine(reload_interval=0)
+    setup["rag_build_ms"] = round((time.perf_counter() - t) * 1000, 1)
+    setup["rag_chunks"] = len(rag.store.entries)
+
+    t = time.perf_counter()
+    rental_engine = RentalEngine(make_properties(args.properties, seed=args.seed))
+    setup["rental_build_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    engine = ConversationEngine()
+    engine.components["rag"] = Lazy("rag", lambda: rag)
+    engine.components["rental"] = Lazy("rental", lambda: rental_engine)
+    for component in engine.components.values():
+        component.get()
+
+    # ---------------- scripted sessions through handle() ----------------
+    rng = random.Random(args.seed)
+    reqs = make_requirements(max(args.sessions, 1), seed=args.seed)
+    questions = make_questions(max(args.sessions * args.questions, 1), seed=args.seed)
+    times: Dict[str, List[float]] = defaultdict(list)
+    wire: Dict[str, List[float]] = defaultdict(list)      # µs per frame
+    tokens = [0]
+
+    def on_token(chunk: str):
+        tokens[0] += 1
+        t = time.perf_counter()
+        delta_frame(chunk)
+        wire["wire.delta"].append((time.perf_counter() - t) * 1e6)
+
+    started = time.perf_counter()
+    turns = 0
+    for i in range(args.sessions):
+        session_id = str(uuid.uuid4())
+        scripts = {
+            "onboarding": onboarding(i),
+            "rental": rental(reqs[i]),
+            "repair": repair(rng, engine.repair.REPAIR_CATEGORIES),
+            "general": general(questions[i * args.questions:(i + 1) * args.questions]),
+        }
+        for flow in ["onboarding"] + [f for f in FLOWS if f in args.flows]:
+            flow_started = time.perf_counter()
+            for stage, text in scripts[flow]:
+                raw = json.dumps({"text": text})        # what chat.js sends
+                t = time.perf_counter()
+                msg = decode_message(raw)
+                wire["wire.decode"].append((time.perf_counter() - t) * 1e6)
+
+                with Session(db_engine) as db:
+                    t = time.perf_counter()
+                    response = engine.handle(session_id, msg, db, on_token=on_token)
+                    times[stage].append((time.perf_counter() - t) * 1000)
+
+                t = time.perf_counter()
+                encode_response(response)
+                kind = "static" if is_static(response) else "dynamic"
+                wire[f"wire.encode.{kind}"].append((time.perf_counter() - t) * 1e6)
+                turns += 1
+            times[f"flow.{flow}"].append((time.perf_counter() - flow_started) * 1000)
+        engine.end_session(session_id)
+    elapsed = time.perf_counter() - started
+
+    if engine.writer:
+        t = time.perf_counter()
+        engine.writer.flush()
+        times["writer.flush"].append((time.perf_counter() - t) * 1000)
+
+    # ---------------- components on their own ----------------
+    for req in make_requirements(args.component_queries, seed=args.seed + 1):
+        t = time.perf_counter()
+        rental_engine.find_matches(req)
+        times["rental.find_matches"].append((time.perf_counter() - t) * 1000)
+
+    for q in make_questions(args.component_queries, seed=args.seed + 1):
+        # uncached: encoder + search every time
+        rag.embedding_cache.clear()
+        rag.hit_cache.clear()
+        t = time.perf_counter()
+        rag.retrieve(q)
+        times["rag.retrieve"].append((time.perf_counter() - t) * 1000)
+
+    metrics = {
+        "llm_gate": engine.llm_gate.metrics(),
+        "prompts": engine.prompt_stats.stats(),
+        "sessions": engine.sessions.stats(),
+        "rag_cache": rag.cache_stats(),
+        "answer_cache": engine.answer_cache.stats() if engine.answer_cache else None,
+        "writer": engine.writer.metrics() if engine.writer else None,
+        "streamed_tokens": tokens[0],
+    }
+    if engine.writer:
+        engine.writer.close()
+    engine.close_components()
+    engine.ollama.close()
+
+    return {
+        "setup": setup,
+        "throughput": {
+            "sessions": args.sessions,
+            "turns": turns,
+            "seconds": round(elapsed, 3),
+            "turns_per_s": round(turns / elapsed, 1) if elapsed else None,
+        },
+        "stages": {name: summarize(values) for name, values in sorted(times.items())},
+        "serialization_us": {name: summarize(values) for name, values in sorted(wire.items())},
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ConversationEngine flow benchmark")
+    parser.add_argument("--properties", type=int, default=10_000, help="synthetic rental listings")
+    parser.add_argument("--docs", type=int, default=100, help="synthetic RAG documents")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=3, help="general questions per session")
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=FLOWS)
+    parser.add_argument("--component-queries", type=int, default=200)
+    parser.add_argument("--embedder", choices=["hash", "minilm"], default="hash",
+                        help="hash: fast fake (default); minilm: the real model")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake Ollama time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="fake Ollama delay per token (s)")
+    parser.add_argument("--tokens", type=int, default=24, help="fake Ollama tokens per reply")
+    parser.add_argument("--write-mode", choices=["write_behind", "sync"], default="write_behind")
+    parser.add_argument("--session-store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--no-answer-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to diff against")
+    args = parser.parse_args()
+
+    server, url = start_in_thread(latency=args.llm_latency, token_delay=args.token_delay, n_tokens=args.tokens)
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-flows-") as workdir:
+            configure(args, workdir, url)
+            results = run(args)
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "benchmark": "flows",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        **results,
+    }
+
+    baseline = baseline_wire = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline, baseline_wire = saved["stages"], saved.get("serialization_us", {})
+
+    tp, setup = report["throughput"], report["setup"]
+    print(f"\n💬 {tp['sessions']} sessions, {tp['turns']} turns in {tp['seconds']:.2f}s "
+          f"({tp['turns_per_s']} turns/s)")
+    print(f"   {args.properties:,} listings (built in {setup['rental_build_ms']:,.0f} ms), "
+          f"{setup['rag_chunks']:,} RAG chunks (built in {setup['rag_build_ms']:,.0f} ms, {args.embedder})")
+    print_stages(report["stages"], baseline)
+    print_stages(report["serialization_us"], baseline_wire, unit="µs")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_rental.py
+#
+# RentalEngine.find_matches: per-listing Python loop vs columnar full scan
+# vs index-pruned columnar scoring.
+#
+#   python -m benchmarks.bench_rental --sizes 10000 100000 1000000
+
+import argparse
+import statistics
+import time
+
+from app.services.rental_engine import RentalEngine
+from benchmarks.synthetic import make_properties, make_requirements
+
+
+def loop_find_matches(engine: RentalEngine, req: dict, limit: int = 6):
+    """The original implementation, kept as the reference."""
+    results = []
+    for p in engine.properties:
+        score = engine._score(req, p)
+        if score > 0:
+            prop = p.copy()
+            prop["score"] = score
+            results.append(prop)
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:limit]
+
+
+def scan_find_matches(engine: RentalEngine, req: dict, limit: int = 6):
+    """Columnar scoring over the whole catalogue, no index."""
+    rows, scores = engine.columns.top_k(req, k=limit)
+    return [{**engine.properties[r], "score": int(s)} for r, s in zip(rows, scores)]
+
+
+def timed(fn, reqs) -> tuple[list, list]:
+    out, times = [], []
+    for req in reqs:
+        t = time.perf_counter()
+        out.append(fn(req))
+        times.append((time.perf_counter() - t) * 1000)
+    return out, times
+
+
+def summary(times: list) -> str:
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f"p50 {statistics.median(times):8.2f} ms   p95 {p95:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RentalEngine.find_matches benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--loop-queries", type=int, default=5, help="queries for the slow reference loop")
+    args = parser.parse_args()
+
+    reqs = make_requirements(args.queries)
+
+    for n in args.sizes:
+        t = time.perf_counter()
+        engine = RentalEngine(make_properties(n))
+        build_ms = (time.perf_counter() - t) * 1000
+
+        fast, fast_times = timed(engine.find_matches, reqs)
+        scan, scan_times = timed(lambda r: scan_find_matches(engine, r), reqs)
+        slow, slow_times = timed(lambda r: loop_find_matches(engine, r), reqs[:args.loop_queries])
+
+        same = all(a == b for a, b in zip(fast, slow)) and fast == scan
+
+        print(f"\n🏠 {n:,} listings (load + columns + index {build_ms:,.0f} ms)")
+        print(f"   loop      {summary(slow_times)}")
+        print(f"   columnar  {summary(scan_times)}")
+        print(f"   indexed   {summary(fast_times)}   tiers {engine.index.stats}")
+        print(f"   identical results: {'✅' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
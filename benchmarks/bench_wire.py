@@ -0,0 +1,130 @@
+# benchmarks/bench_wire.py
+#
+# WebSocket serialization cost per message: building + dumping each reply on
+# every turn (what /ws used to do) vs the cached static frames and the
+# app.utils.wire encode / decode path. No server or database needed.
+#
+#   python -m benchmarks.bench_wire --number 20000 --output wire.json
+
+import argparse
+import json
+import platform
+import time
+from typing import Callable, Dict
+
+from app.models.chat_models import (
+    ChatBotResponse,
+    ChatClientMessage,
+    ChatOption,
+    ChatPropertyCard,
+    ChatStreamDelta,
+)
+from app.services import conversation_engine as replies
+from app.services.repair_engine import RepairEngine
+from app.utils.wire import decode_message, delta_frame, encode_response, orjson
+from benchmarks.bench_flows import git_revision
+from benchmarks.synthetic import make_properties
+
+
+def per_call_us(fn: Callable[[], object], number: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def _legacy_decode(raw: str) -> ChatClientMessage:
+    try:
+        return ChatClientMessage(**json.loads(raw))
+    except Exception:
+        return ChatClientMessage(text=raw)
+
+
+# -------------------------------------------------------------
+# CASES: name → (before, after)
+# -------------------------------------------------------------
+def cases() -> Dict[str, tuple]:
+    cards = [
+        ChatPropertyCard(
+            id=p["id"], title=p["title"], price_per_month=p["price_per_month"], location=p["location"],
+            bedrooms=p["bedrooms"], furnished=p["furnished"], has_garden=p.get("has_garden"),
+            parking=p.get("parking"), url=p["url"], score=90,
+        ) for p in make_properties(10, seed=1)
+    ]
+    matches = ChatBotResponse(text="Here are your matched properties:", properties=cards,
+                              options=replies.RESULT_OPTIONS)
+    client_frame = json.dumps({"text": "Which documents do I need to rent a flat?"})
+
+    return {
+        "main menu": (
+            lambda: ChatBotResponse(
+                text="What would you like help with today?",
+                options=[
+                    ChatOption(label="🏠 Rent a Property", value="rent"),
+                    ChatOption(label="🛠 Request a Repair / Service", value="repair"),
+                    ChatOption(label="💬 General Questions", value="general"),
+                ]
+            ).model_dump_json(),
+            lambda: encode_response(replies.MAIN_MENU),
+        ),
+        "repair categories": (
+            lambda: ChatBotResponse(
+                text="What type of issue are you having?",
+                options=[ChatOption(label=f"🔧 {c}", value=c) for c in RepairEngine.REPAIR_CATEGORIES]
+            ).model_dump_json(),
+            lambda: encode_response(replies.ASK_REPAIR_CATEGORY),
+        ),
+        "text prompt": (
+            lambda: ChatBotResponse(text="Your *maximum monthly budget*?").model_dump_json(),
+            lambda: encode_response(replies.ASK_BUDGET),
+        ),
+        "10 property cards": (
+            lambda: matches.model_dump_json(),
+            lambda: encode_response(matches),
+        ),
+        "stream delta": (
+            lambda: ChatStreamDelta(delta=" boiler").model_dump_json(),
+            lambda: delta_frame(" boiler"),
+        ),
+        "incoming frame": (
+            lambda: _legacy_decode(client_frame),
+            lambda: decode_message(client_frame),
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket frame serialization benchmark")
+    parser.add_argument("--number", type=int, default=20_000, help="calls per case")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"\n   {'message':<22}{'before µs':>11}{'after µs':>11}{'speedup':>10}")
+    for name, (before, after) in cases().items():
+        b, a = per_call_us(before, args.number), per_call_us(after, args.number)
+        results[name] = {"before_us": round(b, 3), "after_us": round(a, 3), "speedup": round(b / a, 1)}
+        print(f"   {name:<22}{b:>11.2f}{a:>11.2f}{b / a:>9.1f}x")
+    print(f"\n   orjson: {'yes' if orjson is not None else 'no (stdlib json)'}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "benchmark": "wire",
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "number": args.number,
+                "orjson": orjson is not None,
+            },
+            "cases": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
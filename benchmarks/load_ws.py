@@ -0,0 +1,338 @@
+# benchmarks/load_ws.py
+#
+# Load generator for the /ws chat endpoint: N concurrent virtual users each
+# replay mixed conversations (onboarding, then rental / repair / general),
+# with think time between messages and an optional target arrival rate of
+# new conversations. Records per-message round-trip latency and errors, one
+# step per concurrency level, to find where one worker's latency collapses.
+#
+#   python -m benchmarks.load_ws --spawn --levels 1 5 10 25 50 --duration 20 --output load.json
+#   python -m benchmarks.load_ws --url ws://127.0.0.1:8000/ws --levels 20 --rate 5
+#
+# --spawn starts one uvicorn worker of app.main against a fake Ollama (temp DB).
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import httpx
+import websockets
+
+from app.services.ollama_client import ERROR_REPLY, TIMEOUT_REPLY
+from app.services.repair_engine import RepairEngine
+from benchmarks.bench_flows import general, git_revision, onboarding, rental, repair, summarize
+from benchmarks.synthetic import make_questions, make_requirements
+from tools.fake_ollama import start_in_thread
+
+
+# -------------------------------------------------------------
+# CONVERSATIONS
+# -------------------------------------------------------------
+class Scripts:
+    """Endless supply of mixed conversations: onboarding + one weighted flow."""
+
+    def __init__(self, mix: Dict[str, float], questions: int, seed: int):
+        self.flows, self.weights = zip(*mix.items())
+        self.questions = questions
+        self.rng = random.Random(seed)
+        self.reqs = make_requirements(1_000, seed=seed)
+        self.qs = make_questions(1_000, seed=seed)
+        self.ids = itertools.count(1)
+
+    def next(self) -> tuple[str, List[tuple]]:
+        i = next(self.ids)
+        flow = self.rng.choices(self.flows, self.weights)[0]
+        if flow == "rental":
+            turns = rental(self.rng.choice(self.reqs))
+        elif flow == "repair":
+            turns = repair(self.rng, RepairEngine.REPAIR_CATEGORIES)
+        else:
+            turns = general(self.rng.sample(self.qs, self.questions))
+        return flow, onboarding(i) + turns
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("rental", "repair", "general"):
+            raise argparse.ArgumentTypeError(f"unknown flow {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# -------------------------------------------------------------
+# ONE LEVEL: N virtual users for `duration` seconds
+# -------------------------------------------------------------
+class Level:
+
+    def __init__(self, users: int):
+        self.users = users
+        self.rtt: Dict[str, List[float]] = defaultdict(list)      # stage → ms
+        self.first_frame: List[float] = []                         # LLM turns: ms to first delta
+        self.errors: Counter = Counter()
+        self.messages = 0
+        self.conversations = Counter()
+        self.arrival_lag: List[float] = []
+
+    def report(self, seconds: float, slo_ms: float, max_error_rate: float) -> dict:
+        all_rtt = [t for times in self.rtt.values() for t in times]
+        failed = sum(self.errors[k] for k in ("connect", "timeout", "closed"))
+        attempts = self.messages + failed
+        error_rate = (failed + self.errors["busy"] + self.errors["llm"]) / attempts if attempts else 0.0
+        latency = summarize(all_rtt) if all_rtt else None
+        return {
+            "users": self.users,
+            "seconds": round(seconds, 2),
+            "messages": self.messages,
+            "messages_per_s": round(self.messages / seconds, 1) if seconds else 0.0,
+            "conversations": dict(self.conversations),
+            "errors": dict(self.errors),
+            "error_rate": round(error_rate, 4),
+            "latency_ms": latency,
+            "first_token_ms": summarize(self.first_frame) if self.first_frame else None,
+            "arrival_lag_ms": summarize(self.arrival_lag) if self.arrival_lag else None,
+            "stages": {name: summarize(t) for name, t in sorted(self.rtt.items())},
+            "ok": latency is not None and latency["p95"] <= slo_ms and error_rate <= max_error_rate,
+        }
+
+
+async def send(ws, text: str, timeout: float) -> tuple[dict, float, float | None]:
+    """(final frame, round trip ms, first delta ms or None)."""
+    started = time.perf_counter()
+    first = None
+    await ws.send(json.dumps({"text": text}))
+
+    async def receive():
+        nonlocal first
+        while True:
+            frame = json.loads(await ws.recv())
+            if "session" in frame:      # sent once, when the connection opens
+                continue
+            if "delta" not in frame:
+                return frame
+            if first is None:
+                first = (time.perf_counter() - started) * 1000
+
+    frame = await asyncio.wait_for(receive(), timeout)
+    return frame, (time.perf_counter() - started) * 1000, first
+
+
+async def user(url: str, level: Level, scripts: Scripts, arrivals: asyncio.Queue | None,
+               stop_at: float, args):
+    rng = random.Random()
+    while time.monotonic() < stop_at:
+        if arrivals is not None:
+            try:
+                scheduled = await asyncio.wait_for(arrivals.get(), max(0.0, stop_at - time.monotonic()))
+            except asyncio.TimeoutError:
+                return
+            level.arrival_lag.append((time.monotonic() - scheduled) * 1000)
+
+        flow, turns = scripts.next()
+        try:
+            async with websockets.connect(url, open_timeout=args.timeout, max_size=None) as ws:
+                for stage, text in turns:
+                    try:
+                        frame, rtt, first = await send(ws, text, args.timeout)
+                    except asyncio.TimeoutError:
+                        level.errors["timeout"] += 1
+                        break
+
+                    level.messages += 1
+                    reply = frame.get("text", "")
+                    if reply.startswith("⏳"):
+                        # executor or LLM gate turned the message away
+                        level.errors["busy"] += 1
+                    elif reply in (ERROR_REPLY, TIMEOUT_REPLY):
+                        level.errors["llm"] += 1
+                    else:
+                        level.rtt[stage].append(rtt)
+                        if first is not None:
+                            level.first_frame.append(first)
+
+                    if time.monotonic() >= stop_at:
+                        break
+                    if args.think:
+                        await asyncio.sleep(rng.expovariate(1 / args.think))
+                else:
+                    level.conversations[flow] += 1
+        except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+            level.errors["connect"] += 1
+            await asyncio.sleep(0.1)
+        except websockets.ConnectionClosed:
+            level.errors["closed"] += 1
+
+
+async def arrivals_at(rate: float, queue: asyncio.Queue, stop_at: float):
+    """Poisson arrivals: puts the scheduled start time of each new conversation."""
+    rng = random.Random(7)
+    next_at = time.monotonic()
+    while next_at < stop_at:
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+        queue.put_nowait(next_at)
+        next_at += rng.expovariate(rate)
+
+
+async def run_level(url: str, users: int, scripts: Scripts, args) -> dict:
+    level = Level(users)
+    started = time.monotonic()
+    stop_at = started + args.duration
+
+    tasks = []
+    arrivals = None
+    if args.rate:
+        arrivals = asyncio.Queue()
+        tasks.append(asyncio.create_task(arrivals_at(args.rate, arrivals, stop_at)))
+    tasks += [asyncio.create_task(user(url, level, scripts, arrivals, stop_at, args)) for _ in range(users)]
+
+    # users finish their in-flight message (at most one timeout) after stop_at
+    await asyncio.wait(tasks, timeout=args.duration + args.timeout + 5)
+    for t in tasks:
+        t.cancel()
+    return level.report(time.monotonic() - started, args.slo_ms, args.max_error_rate)
+
+
+def server_metrics(http_url: str) -> dict:
+    out = {}
+    for name in ("executor", "llm", "sessions"):
+        try:
+            out[name] = httpx.get(f"{http_url}/metrics/{name}", timeout=5).json()
+        except (httpx.HTTPError, ValueError):
+            out[name] = None
+    return out
+
+
+# -------------------------------------------------------------
+# --spawn: one local worker against a fake Ollama
+# -------------------------------------------------------------
+def spawn_server(args, workdir: str) -> tuple[subprocess.Popen, object, str]:
+    ollama, ollama_url = start_in_thread(latency=args.llm_latency, token_delay=args.token_delay,
+                                         n_tokens=args.tokens)
+    env = {
+        **os.environ,
+        "OLLAMA_URL": ollama_url,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "SESSION_STORE_PATH": os.path.join(workdir, "sessions.db"),
+    }
+    log = open(os.path.join(workdir, "server.log"), "w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", "1", "--log-level", "warning"],
+        env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+    http_url = f"http://127.0.0.1:{args.port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"❌ Server exited, see {log.name}")
+        try:
+            if httpx.get(f"{http_url}/health", timeout=1).status_code == 200:
+                return server, ollama, f"ws://127.0.0.1:{args.port}/ws"
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("❌ Server did not become healthy within 60s")
+
+
+def print_level(r: dict):
+    lat = r["latency_ms"] or {"p50": 0, "p95": 0, "p99": 0}
+    errors = ", ".join(f"{k} {v}" for k, v in sorted(r["errors"].items())) or "-"
+    print(f"   {r['users']:>6}{r['messages_per_s']:>10.1f}{lat['p50']:>10.1f}{lat['p95']:>10.1f}"
+          f"{lat['p99']:>10.1f}{r['error_rate'] * 100:>9.2f}%   {'✅' if r['ok'] else '❌'}  {errors}")
+
+
+async def run(url: str, args) -> List[dict]:
+    scripts = Scripts(args.mix, args.questions, args.seed)
+    http_url = url.replace("ws://", "http://").replace("wss://", "https://").rsplit("/ws", 1)[0]
+
+    print(f"\n🔌 {url}  mix {args.mix}  think {args.think}s  rate {args.rate or 'closed loop'}")
+    print(f"   {'users':>6}{'msg/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}")
+
+    results = []
+    for users in args.levels:
+        r = await run_level(url, users, scripts, args)
+        r["server"] = await asyncio.to_thread(server_metrics, http_url)
+        results.append(r)
+        print_level(r)
+        if not r["ok"] and args.stop_on_fail:
+            break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /ws load generator")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws")
+    parser.add_argument("--spawn", action="store_true", help="start one local worker + fake Ollama")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="concurrent users per step")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per step")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="new conversations per second (Poisson); 0 = users start the next at once")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between messages (s)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("rental=0.4,repair=0.3,general=0.3"))
+    parser.add_argument("--questions", type=int, default=2, help="questions per general conversation")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-message timeout (s)")
+    parser.add_argument("--slo-ms", type=float, default=2_000.0, help="p95 round trip a step must meet")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-on-fail", action="store_true", help="stop at the first step missing the SLO")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="--spawn: fake time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="--spawn: fake delay per token (s)")
+    parser.add_argument("--tokens", type=int, default=24, help="--spawn: fake tokens per reply")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    server = ollama = None
+    with tempfile.TemporaryDirectory(prefix="load-ws-") as workdir:
+        url = args.url
+        if args.spawn:
+            server, ollama, url = spawn_server(args, workdir)
+        try:
+            levels = asyncio.run(run(url, args))
+        finally:
+            if server:
+                server.terminate()
+                server.wait(10)
+                ollama.shutdown()
+
+    passing = [r["users"] for r in levels if r["ok"]]
+    capacity = max(passing) if passing else 0
+    print(f"\n📈 Highest step within p95 ≤ {args.slo_ms:.0f} ms and ≤ {args.max_error_rate:.0%} errors: "
+          f"{capacity} concurrent users" if capacity else "\n📉 No step met the SLO")
+
+    if args.output:
+        report = {
+            "meta": {
+                "benchmark": "load_ws",
+                "run_id": str(uuid.uuid4()),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k != "output"},
+            },
+            "capacity_users": capacity,
+            "levels": levels,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
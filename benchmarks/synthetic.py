@@ -0,0 +1,120 @@
+# benchmarks/synthetic.py
+#
+# Deterministic synthetic data for the benchmarks.
+
+import random
+from typing import List
+
+AREAS = [
+    ("Camden", "NW1"), ("Islington", "N1"), ("Hackney", "E8"), ("Brixton", "SW2"),
+    ("Clapham", "SW4"), ("Greenwich", "SE10"), ("Croydon", "CR0"), ("Ealing", "W5"),
+    ("Stratford", "E15"), ("Wimbledon", "SW19"), ("Richmond", "TW9"), ("Harrow", "HA1"),
+    ("Salford", "M5"), ("Didsbury", "M20"), ("Headingley", "LS6"), ("Clifton", "BS8"),
+    ("Jesmond", "NE2"), ("Edgbaston", "B15"), ("Kemptown", "BN2"), ("Cowley", "OX4"),
+]
+CITIES = {
+    "M": "Manchester", "LS": "Leeds", "BS": "Bristol", "NE": "Newcastle",
+    "B": "Birmingham", "BN": "Brighton", "OX": "Oxford",
+}
+STREETS = ["High Street", "Station Road", "Park Lane", "Church Road", "Mill Lane", "Victoria Road"]
+TYPES = ["house", "flat", "apartment", "studio"]
+
+
+def _city(postcode: str) -> str:
+    prefix = postcode.rstrip("0123456789")
+    return CITIES.get(prefix, "London")
+
+
+def make_properties(n: int, seed: int = 42) -> List[dict]:
+    """
+    n rental listings shaped like app/data/properties.json.
+    """
+    rng = random.Random(seed)
+    props = []
+
+    for i in range(1, n + 1):
+        area, district = rng.choice(AREAS)
+        ptype = rng.choice(TYPES)
+        bedrooms = 1 if ptype == "studio" else rng.randint(1, 5)
+        postcode = f"{district} {rng.randint(1, 9)}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}"
+
+        props.append({
+            "id": i,
+            "title": f"{bedrooms} bed {ptype} on {rng.choice(STREETS)}",
+            "location": f"{area}, {_city(district)} {postcode}",
+            "property_type": ptype.title(),
+            "bedrooms": bedrooms,
+            "price_per_month": rng.randrange(600, 4500, 25),
+            "furnished": rng.random() < 0.5,
+            "has_garden": rng.random() < (0.6 if ptype == "house" else 0.15),
+            "parking": rng.random() < 0.4,
+            "url": f"https://example.com/properties/{i}",
+        })
+
+    return props
+
+
+def make_requirements(n: int, seed: int = 7) -> List[dict]:
+    """
+    n rental searches as ConversationEngine builds them.
+    """
+    rng = random.Random(seed)
+    reqs = []
+
+    for _ in range(n):
+        area, district = rng.choice(AREAS)
+        reqs.append({
+            "location": rng.choice([area, district, _city(district), area.lower()]),
+            "property_type": rng.choice(TYPES),
+            "bedrooms": rng.randint(1, 4),
+            "budget": rng.choice([None, rng.randrange(800, 4000, 100)]),
+            "furnished": rng.choice([True, False, None]),
+            "garden": rng.random() < 0.3,
+            "parking": rng.random() < 0.3,
+        })
+
+    return reqs
+
+
+TOPICS = {
+    "boiler": ["pressure", "bar", "reset", "pilot", "thermostat", "radiator", "bleed", "error code", "engineer"],
+    "leak": ["stopcock", "ceiling", "sink", "cistern", "washing machine", "pipe", "joint", "plumber", "bucket"],
+    "damp": ["mould", "condensation", "ventilation", "extractor fan", "window", "wall", "heating", "dehumidifier"],
+    "electrics": ["fuse box", "trip switch", "socket", "circuit breaker", "electrician", "smoke alarm", "RCD"],
+    "tenancy": ["deposit", "inventory", "notice period", "check-out", "landlord", "contract", "guarantor"],
+    "pests": ["mice", "rats", "wasps", "bed bugs", "pest control", "droppings", "traps", "holes"],
+}
+FILLER = ["check", "the", "and", "before", "contact", "your", "if", "turn", "off", "make", "sure", "never",
+          "always", "usually", "within", "hours", "days", "safely", "then", "report", "to", "a", "is"]
+
+
+def make_documents(n: int, words: int = 1_500, seed: int = 11) -> dict:
+    """
+    n RAG documents ({file name: text}) shaped like app/data/rag_docs/*.txt.
+    """
+    rng = random.Random(seed)
+    docs = {}
+
+    for i in range(n):
+        topic = rng.choice(list(TOPICS))
+        terms = TOPICS[topic]
+        lines = [f"{topic.title()} guide {i}"]
+        while sum(len(line.split()) for line in lines) < words:
+            sentence = [rng.choice(FILLER) if rng.random() < 0.6 else rng.choice(terms) for _ in range(12)]
+            lines.append("- " + " ".join(sentence).capitalize() + ".")
+        docs[f"{topic}_{i:05d}.txt"] = "\n".join(lines)
+
+    return docs
+
+
+def make_questions(n: int, seed: int = 13) -> List[str]:
+    """
+    n general questions about the topics in make_documents().
+    """
+    rng = random.Random(seed)
+    forms = ["What should I do about {a}?", "How do I check the {a} and {b}?",
+             "Who fixes {a} problems?", "Is {a} my landlord's responsibility?", "My {a} and {b}, help"]
+    return [
+        rng.choice(forms).format(a=rng.choice(terms), b=rng.choice(terms))
+        for terms in (TOPICS[rng.choice(list(TOPICS))] for _ in range(n))
+    ]
@@ -0,0 +1,21 @@
+# tests/conftest.py
+
+import pytest
+
+from tools import fake_ollama
+
+
+@pytest.fixture
+def fake_ollama_url():
+    """Base URL of a fake Ollama server (tools/fake_ollama.py); call it with its options."""
+    servers = []
+
+    def start(**options) -> str:
+        server, url = fake_ollama.start_in_thread(**options)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,141 @@
+# tests/test_answer_cache.py
+
+import time
+
+import numpy as np
+import pytest
+
+from app.services.answer_cache import SemanticAnswerCache
+
+DOCS = ("boiler.txt#0", "boiler.txt#1")
+
+
+def unit(*values) -> np.ndarray:
+    v = np.array(values + (0.0,) * (4 - len(values)), dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def tilted(angle_deg: float) -> np.ndarray:
+    """Unit vector at `angle_deg` from unit(1): cosine similarity cos(angle)."""
+    a = np.radians(angle_deg)
+    return unit(np.cos(a), np.sin(a))
+
+
+def cache(**kwargs) -> SemanticAnswerCache:
+    options = {"threshold": 0.95, "max_size": 4, "ttl": 0}
+    return SemanticAnswerCache(**{**options, **kwargs})
+
+
+# -------------------------------------------------------------
+# SEMANTIC HITS
+# -------------------------------------------------------------
+def test_similar_question_with_the_same_documents_hits():
+    c = cache()
+    c.put(unit(1), DOCS, "Check the pressure gauge.")
+
+    assert c.get(unit(1), DOCS) == "Check the pressure gauge."
+    assert c.get(tilted(15), DOCS) == "Check the pressure gauge."     # cos 15° ≈ 0.966
+
+
+def test_question_below_the_threshold_misses():
+    c = cache()
+    c.put(unit(1), DOCS, "Check the pressure gauge.")
+
+    assert c.get(tilted(20), DOCS) is None                             # cos 20° ≈ 0.940
+    assert (c.hits, c.misses) == (0, 1)
+
+
+def test_same_question_with_other_documents_misses():
+    c = cache()
+    c.put(unit(1), DOCS, "Check the pressure gauge.")
+    assert c.get(unit(1), ("deposit.txt#0",)) is None
+
+
+def test_closest_entry_wins():
+    c = cache(threshold=0.9)
+    c.put(tilted(20), DOCS, "far")
+    c.put(tilted(-5), DOCS, "near")
+    assert c.get(unit(1), DOCS) == "near"
+    assert c.stats()["avg_hit_similarity"] == pytest.approx(np.cos(np.radians(5)), abs=1e-4)
+
+
+def test_near_duplicate_put_replaces_the_entry():
+    c = cache()
+    c.put(unit(1), DOCS, "old answer")
+    c.put(tilted(5), DOCS, "new answer")
+
+    assert c.stats()["size"] == 1
+    assert c.get(unit(1), DOCS) == "new answer"
+
+
+# -------------------------------------------------------------
+# TTL / LRU
+# -------------------------------------------------------------
+def test_entries_expire_after_ttl():
+    c = cache(ttl=0.05)
+    c.put(unit(1), DOCS, "answer")
+    assert c.get(unit(1), DOCS) == "answer"
+
+    time.sleep(0.1)
+    assert c.get(unit(1), DOCS) is None
+    assert c.stats()["expirations"] == 1
+    assert c.stats()["size"] == 0
+
+
+def test_without_ttl_entries_never_expire():
+    c = cache(ttl=0)
+    c.put(unit(1), DOCS, "answer")
+    time.sleep(0.01)
+    assert c.get(unit(1), DOCS) == "answer"
+
+
+def test_least_recently_used_entry_is_evicted():
+    c = cache(max_size=2)
+    c.put(unit(1), DOCS, "a")
+    c.put(unit(0, 1), DOCS, "b")
+    assert c.get(unit(1), DOCS) == "a"          # "b" is now the least recently used
+
+    c.put(unit(0, 0, 1), DOCS, "c")
+    assert c.get(unit(0, 1), DOCS) is None
+    assert (c.get(unit(1), DOCS), c.get(unit(0, 0, 1), DOCS)) == ("a", "c")
+    assert c.stats()["evictions"] == 1
+
+
+def test_expired_slot_is_reused_before_evicting():
+    c = cache(max_size=2, ttl=0.05)
+    c.put(unit(1), DOCS, "a")
+    time.sleep(0.1)
+    c.put(unit(0, 1), DOCS, "b")
+    c.put(unit(0, 0, 1), DOCS, "c")
+
+    assert c.stats()["evictions"] == 0
+    assert c.stats()["size"] == 2
+
+
+# -------------------------------------------------------------
+# INVALIDATION: a new RAG index version drops every answer
+# -------------------------------------------------------------
+def test_version_change_clears_the_cache():
+    c = cache()
+    c.sync_version("embeddings-a.npy")
+    c.put(unit(1), DOCS, "answer")
+
+    c.sync_version("embeddings-a.npy")          # same build: kept
+    assert c.get(unit(1), DOCS) == "answer"
+
+    c.sync_version("embeddings-b.npy")
+    assert c.get(unit(1), DOCS) is None
+    assert c.stats()["invalidations"] == 1
+    assert c.stats()["size"] == 0
+
+
+def test_first_version_and_empty_cache_are_not_invalidations():
+    c = cache()
+    c.sync_version("embeddings-a.npy")
+    c.sync_version("embeddings-b.npy")
+    assert c.stats()["invalidations"] == 0
+
+    c.put(unit(1), DOCS, "answer")
+    c.sync_version("embeddings-c.npy")
+    c.put(unit(1), DOCS, "fresh answer")
+    assert c.get(unit(1), DOCS) == "fresh answer"
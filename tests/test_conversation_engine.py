@@ -0,0 +1,96 @@
+# tests/test_conversation_engine.py
+
+import threading
+import time
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database import create_db_and_tables, make_engine
+from app.models.repair_models import RepairRequest
+from app.services.conversation_engine import ConversationEngine
+from app.services.ollama_client import OllamaClient
+from app.services.rag_engine import RAGEngine
+from app.services.session_store import SessionState
+from app.services.write_behind import WriteBehindWriter
+from app.utils.helpers import Lazy
+from tools.fake_embedder import HashEmbedder
+
+LOADING = "documentation is still loading"
+
+
+@pytest.fixture
+def engine(tmp_path, fake_ollama_url):
+    engine = ConversationEngine()
+    engine.ollama = OllamaClient(base_url=fake_ollama_url())
+    engine.components["rag"] = Lazy("rag", lambda: RAGEngine(
+        store_path=str(tmp_path / "vectorstore"), reload_interval=0,
+        model=HashEmbedder(), model_name=HashEmbedder.NAME,
+    ))
+    yield engine
+    wait_until_loaded(engine.components["rag"])
+    engine.close_components()
+    engine.ollama.close()
+    if engine.writer:
+        engine.writer.close()
+
+
+def wait_until_loaded(component: Lazy, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while component.state == "loading" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_rag_loads_on_first_llm_turn_without_warm_up(engine):
+    rag = engine.components["rag"]
+    assert rag.state == "pending"
+
+    reply = engine.ask_llm("Which documents do I need to rent a flat?", SessionState())
+    assert reply
+    assert rag.state in ("loading", "ready")
+
+    wait_until_loaded(rag)
+    assert rag.state == "ready"
+
+    prompt, _ = engine._build_prompt("Which documents do I need to rent a flat?", SessionState())
+    assert LOADING not in prompt
+
+
+def test_first_turn_does_not_wait_for_rag(engine):
+    rag, released = engine.components["rag"], threading.Event()
+    build = rag.factory
+
+    def slow_build():
+        released.wait(5)                # still loading when the prompt is built
+        return build()
+
+    rag.factory = slow_build
+    prompt, _ = engine._build_prompt("How long is a tenancy?", SessionState())
+    released.set()
+    assert LOADING in prompt
+
+
+# -------------------------------------------------------------
+# WRITE-BEHIND: the session picks up its user's id once written
+# -------------------------------------------------------------
+def test_write_behind_backfills_the_session_user_id(engine, tmp_path):
+    db_engine = make_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    create_db_and_tables(db_engine)
+    engine.writer = WriteBehindWriter(db_engine, flush_interval=0.01)
+
+    st = SessionState()
+    st.user_phone = "0700"
+
+    def repair(user_id):
+        return RepairRequest(user_id=user_id, category="Plumbing", address="1 High St", description="leak")
+
+    with Session(db_engine) as db:
+        assert engine._ensure_user(db, st, "Ana", "0700") is None     # queued, id unknown yet
+        engine._save(db, st, "repair", repair)                         # resolved by phone in the writer
+        assert engine.writer.flush(5)
+
+        engine._save(db, st, "repair", repair)
+        assert st.user_id is not None
+        assert engine.writer.flush(5)
+
+        assert [r.user_id for r in db.exec(select(RepairRequest))] == [st.user_id, st.user_id]
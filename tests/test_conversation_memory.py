@@ -0,0 +1,104 @@
+# tests/test_conversation_memory.py
+
+import pytest
+
+from app.services.conversation_memory import SUMMARY_HEADER, ConversationMemory
+from app.utils.text_cleaner import estimate_tokens
+
+
+def exchange(i: int) -> tuple[str, str]:
+    return (f"Question {i} about the boiler? It makes a noise at night.",
+            f"Answer {i}: check the pressure gauge. Then call a plumber if it stays low.")
+
+
+def memory(n: int, max_turns: int = 3, summary_tokens: int = 200) -> ConversationMemory:
+    m = ConversationMemory(max_turns=max_turns, summary_tokens=summary_tokens)
+    for i in range(n):
+        m.add(*exchange(i))
+    return m
+
+
+# -------------------------------------------------------------
+# RING BUFFER + GIST SUMMARY
+# -------------------------------------------------------------
+def test_ring_buffer_keeps_the_last_turns_verbatim():
+    m = memory(5)
+    assert len(m) == 3
+    assert [t.text for t in m.turns] == [
+        "User: {}\nAssistant: {}\n".format(*exchange(i)) for i in (2, 3, 4)
+    ]
+
+
+def test_evicted_turns_are_folded_into_gists_in_order():
+    m = memory(5)
+    assert [gist for gist, _ in m.summary] == [
+        "- User: Question 0 about the boiler? → Answer 0: check the pressure gauge.",
+        "- User: Question 1 about the boiler? → Answer 1: check the pressure gauge.",
+    ]
+
+
+def test_gist_truncates_long_sentences():
+    m = ConversationMemory(max_turns=1)
+    m.add("x" * 200, "y" * 200)
+    gist = m.turns[0].gist
+    assert gist == "- User: " + "x" * 79 + "… → " + "y" * 79 + "…"
+
+
+def test_summary_drops_the_oldest_gists_past_its_cap():
+    m = memory(20, summary_tokens=60)
+    gists = [gist for gist, _ in m.summary]
+
+    assert sum(tokens for _, tokens in m.summary) <= 60
+    assert gists and gists[-1].startswith("- User: Question 16 ")      # newest folded turn kept
+    assert not any("Question 0 " in g for g in gists)
+
+
+# -------------------------------------------------------------
+# RENDER: newest first, within the token budget
+# -------------------------------------------------------------
+def test_render_with_room_for_everything():
+    m = memory(5)
+    text, used = m.render(10_000)
+
+    assert text.startswith(SUMMARY_HEADER + "- User: Question 0 ")
+    assert text.endswith("User: {}\nAssistant: {}\n".format(*exchange(4)))
+    positions = [text.index(f"Question {i} ") for i in range(5)]
+    assert positions == sorted(positions)
+    assert used >= estimate_tokens(text)
+
+
+def test_turns_that_do_not_fit_verbatim_fall_back_to_their_gist():
+    m = memory(3)
+    newest = m.turns[-1].tokens
+    text, _ = m.render(newest + 40)
+
+    assert text.endswith(m.turns[-1].text)
+    assert m.turns[-2].text not in text
+    assert m.turns[-2].gist in text
+
+
+@pytest.mark.parametrize("budget", range(0, 400, 7))
+def test_render_never_exceeds_the_budget(budget):
+    text, used = memory(8).render(budget)
+    assert estimate_tokens(text) <= used <= budget
+
+
+def test_zero_budget_renders_nothing():
+    assert memory(4).render(0) == ("", 0)
+
+
+def test_empty_memory_renders_nothing():
+    assert ConversationMemory().render() == ("", 0)
+
+
+# -------------------------------------------------------------
+# SERIALIZATION
+# -------------------------------------------------------------
+def test_dump_and_load_round_trip():
+    m = memory(6, summary_tokens=80)
+    loaded = ConversationMemory.load(m.dump())
+
+    assert loaded.dump() == m.dump()
+    assert loaded.render(150) == m.render(150)
+    loaded.add("One more?", "Sure.")
+    assert len(loaded) == 3
@@ -0,0 +1,89 @@
+# tests/test_helpers.py
+
+import time
+
+from app.utils.helpers import TTLCache
+
+
+# -------------------------------------------------------------
+# TTLCache: LRU bound
+# -------------------------------------------------------------
+def test_evicts_least_recently_used_first():
+    cache = TTLCache(max_size=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "b" is now the oldest
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_set_on_existing_key_refreshes_it():
+    cache = TTLCache(max_size=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+
+    cache.set("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_zero_size_caches_nothing():
+    cache = TTLCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+# -------------------------------------------------------------
+# TTLCache: expiry
+# -------------------------------------------------------------
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_size=10, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_restarts_the_ttl():
+    cache = TTLCache(max_size=10, ttl=0.1)
+    cache.set("a", 1)
+    time.sleep(0.06)
+    cache.set("a", 2)
+    time.sleep(0.06)
+    assert cache.get("a") == 2
+
+
+def test_without_ttl_entries_never_expire():
+    for ttl in (None, 0):
+        cache = TTLCache(max_size=10, ttl=ttl)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        assert cache.get("a") == 1
+
+
+# -------------------------------------------------------------
+# TTLCache: stats
+# -------------------------------------------------------------
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(max_size=10, ttl=None)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,250 @@
+# tests/test_llm_gate.py
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.llm_gate import LLMBusy, LLMGate
+
+
+def gate(**kwargs) -> LLMGate:
+    options = {"max_concurrency": 1, "max_waiting": 2, "queue_timeout": 1.0, "deadline": 5.0}
+    return LLMGate(**{**options, **kwargs})
+
+
+async def hold_slot(g: LLMGate, key="holder"):
+    """Starts a generation that keeps its slot until the returned event is set."""
+    release = asyncio.Event()
+    started = asyncio.Event()
+
+    async def fn(_deadline):
+        started.set()
+        await release.wait()
+        return key
+
+    task = asyncio.create_task(g.arun(key, fn))
+    await started.wait()
+    return task, release
+
+
+async def queued(g: LLMGate, key, fn):
+    """Starts arun(key, fn) and returns once it waits in the (empty) queue."""
+    task = asyncio.create_task(g.arun(key, fn))
+    while g.waiting == 0 and not task.done():
+        await asyncio.sleep(0)
+    return task
+
+
+async def answer(_deadline):
+    return "answer"
+
+
+# -------------------------------------------------------------
+# ADMISSION
+# -------------------------------------------------------------
+def test_rejects_when_queue_full():
+    async def main():
+        g = gate(max_waiting=1)
+        holder, release = await hold_slot(g)
+        waiter = await queued(g, "waiter", answer)
+
+        with pytest.raises(LLMBusy):
+            await g.arun("third", answer)
+        assert g.rejected == 1
+
+        release.set()
+        assert await holder == "holder"
+        assert await waiter == "answer"
+        assert (g.running, g.waiting) == (0, 0)
+
+    asyncio.run(main())
+
+
+def test_queue_timeout():
+    async def main():
+        g = gate(queue_timeout=0.05)
+        holder, release = await hold_slot(g)
+
+        with pytest.raises(LLMBusy):
+            await g.arun("late", answer)
+        assert g.queue_timeouts == 1
+        assert g.waiting == 0
+
+        release.set()
+        await holder
+        assert g.running == 0
+
+    asyncio.run(main())
+
+
+def test_queue_timeout_from_thread():
+    g = gate(queue_timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def hold(_deadline):
+        started.set()
+        release.wait(5)
+        return "holder"
+
+    holder = threading.Thread(target=g.run, args=("holder", hold))
+    holder.start()
+    started.wait(5)
+
+    with pytest.raises(LLMBusy):
+        g.run("late", lambda _deadline: "answer")
+    assert g.queue_timeouts == 1
+
+    release.set()
+    holder.join(5)
+    assert (g.running, g.waiting) == (0, 0)
+    assert g.run("next", lambda _deadline: "answer") == "answer"
+
+
+def test_queued_caller_gets_freed_slot_in_order():
+    async def main():
+        g = gate(max_waiting=5)
+        holder, release = await hold_slot(g)
+        order = []
+
+        def record(name):
+            async def fn(_deadline):
+                order.append(name)
+                return name
+            return fn
+
+        first = await queued(g, "first", record("first"))
+        second = asyncio.create_task(g.arun("second", record("second")))
+        while g.waiting < 2:
+            await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(holder, first, second)
+        assert order == ["first", "second"]
+        assert g.running == 0
+
+    asyncio.run(main())
+
+
+# -------------------------------------------------------------
+# COALESCING
+# -------------------------------------------------------------
+def test_identical_keys_coalesce():
+    async def main():
+        g = gate()
+        calls = []
+        release = asyncio.Event()
+
+        async def fn(_deadline):
+            calls.append(1)
+            await release.wait()
+            return "shared"
+
+        tasks = [asyncio.create_task(g.arun("same prompt", fn)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["shared"] * 5
+        assert len(calls) == 1
+        assert g.coalesced == 4
+        assert g.metrics()["in_flight_keys"] == 0
+
+    asyncio.run(main())
+
+
+def test_followers_get_the_leaders_error():
+    async def main():
+        g = gate()
+        release = asyncio.Event()
+
+        async def fn(_deadline):
+            await release.wait()
+            raise RuntimeError("ollama down")
+
+        tasks = [asyncio.create_task(g.arun("same prompt", fn)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert g.errors == 1
+
+    asyncio.run(main())
+
+
+def test_sync_and_async_callers_coalesce():
+    async def main():
+        g = gate()
+        release = threading.Event()
+        calls = []
+
+        def fn(_deadline):
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+
+        leader = asyncio.create_task(asyncio.to_thread(g.run, "same prompt", fn))
+        while g.running == 0:
+            await asyncio.sleep(0.001)
+        follower = asyncio.create_task(g.arun("same prompt", answer))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(leader, follower) == ["shared", "shared"]
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+# -------------------------------------------------------------
+# CANCELLATION → the slot is never lost
+# -------------------------------------------------------------
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        g = gate()
+        holder, release = await hold_slot(g)
+        waiter = await queued(g, "waiter", answer)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert g.waiting == 0
+
+        release.set()
+        await holder
+        assert g.running == 0
+        assert await g.arun("next", answer) == "answer"
+
+    asyncio.run(main())
+
+
+def test_cancelled_generation_releases_its_slot():
+    async def main():
+        g = gate()
+        holder, _ = await hold_slot(g)
+
+        holder.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await holder
+        assert g.running == 0
+        assert await g.arun("next", answer) == "answer"
+
+    asyncio.run(main())
+
+
+def test_slot_granted_to_a_cancelled_waiter_is_passed_on():
+    async def main():
+        g = gate()
+        assert g._try_acquire()          # a generation holds the only slot
+        waiter = await queued(g, "waiter", answer)
+
+        g._release()                     # hands the slot to the waiter...
+        waiter.cancel()                  # ...which is cancelled before it wakes up
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+
+        assert (g.running, g.waiting) == (0, 0)
+        assert await g.arun("next", answer) == "answer"
+
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+# tests/test_metrics.py
+#
+# Registry.render() against the Prometheus text exposition format.
+
+import re
+
+import pytest
+
+from app.utils.metrics import CONTENT_TYPE, TURN_SECONDS, Registry, stage
+from app.utils.metrics import registry as app_registry
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def lines(registry: Registry) -> list:
+    text = registry.render()
+    assert text.endswith("\n")
+    return text.splitlines()
+
+
+def assert_well_formed(text_lines: list):
+    """Every line is a comment, a HELP / TYPE line or one sample (an unescaped newline breaks this)."""
+    for line in text_lines:
+        if line.startswith("# TYPE "):
+            assert re.match(r"^# TYPE \S+ (counter|gauge|histogram|untyped)$", line), line
+        elif not line.startswith("#"):
+            assert SAMPLE.match(line), line
+
+
+# -------------------------------------------------------------
+# COUNTERS / GAUGES
+# -------------------------------------------------------------
+def test_counter_with_labels(registry):
+    calls = registry.counter("llm_calls_total", "LLM requests by outcome", ["result"])
+    calls.inc(result="ok")
+    calls.inc(2, result="ok")
+    calls.inc(result="timeout")
+
+    assert lines(registry) == [
+        "# HELP llm_calls_total LLM requests by outcome",
+        "# TYPE llm_calls_total counter",
+        'llm_calls_total{result="ok"} 3',
+        'llm_calls_total{result="timeout"} 1',
+    ]
+
+
+def test_gauge_tracks_a_block(registry):
+    in_flight = registry.gauge("turns_in_flight", "Turns being handled")
+    with in_flight.track():
+        assert lines(registry)[-1] == "turns_in_flight 1"
+    assert lines(registry)[-1] == "turns_in_flight 0"
+
+    in_flight.inc(0.5)
+    assert lines(registry)[-1] == "turns_in_flight 0.5"
+
+
+def test_metric_without_samples_has_only_its_header(registry):
+    registry.counter("unused_total", "Never incremented", ["kind"])
+    assert lines(registry) == ["# HELP unused_total Never incremented", "# TYPE unused_total counter"]
+
+
+# -------------------------------------------------------------
+# HISTOGRAMS
+# -------------------------------------------------------------
+def test_histogram_buckets_are_cumulative(registry):
+    h = registry.histogram("rag_retrieve_seconds", "RAGEngine.retrieve", buckets=(0.1, 0.5, 1.0))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        h.observe(value)
+
+    assert lines(registry)[2:] == [
+        'rag_retrieve_seconds_bucket{le="0.1"} 2',      # le is inclusive
+        'rag_retrieve_seconds_bucket{le="0.5"} 3',
+        'rag_retrieve_seconds_bucket{le="1"} 3',
+        'rag_retrieve_seconds_bucket{le="+Inf"} 4',
+        "rag_retrieve_seconds_sum 2.45",
+        "rag_retrieve_seconds_count 4",
+    ]
+
+
+def test_histogram_time_observes_when_the_block_raises(registry):
+    h = registry.histogram("turn_seconds", "Whole turn", buckets=(10.0,))
+    with pytest.raises(RuntimeError):
+        with h.time():
+            raise RuntimeError("boom")
+    assert "turn_seconds_count 1" in lines(registry)
+
+
+def test_stage_label_defaults_to_the_current_stage(registry):
+    h = registry.histogram("turn_seconds", "Whole turn", ["stage"], buckets=(10.0,))
+    h.observe(1.0)
+    token = stage.set("rent_budget")
+    try:
+        h.observe(1.0)
+        h.observe(1.0, stage="explicit")
+    finally:
+        stage.reset(token)
+
+    counts = [line for line in lines(registry) if line.startswith("turn_seconds_count")]
+    assert counts == [
+        'turn_seconds_count{stage="none"} 1',
+        'turn_seconds_count{stage="rent_budget"} 1',
+        'turn_seconds_count{stage="explicit"} 1',
+    ]
+
+
+# -------------------------------------------------------------
+# ESCAPING / COLLECTORS
+# -------------------------------------------------------------
+def test_label_values_and_help_are_escaped(registry):
+    c = registry.counter("odd_total", 'Help with "quotes", a back\\slash\nand a newline', ["v"])
+    c.inc(v='say "hi"\\\n')
+
+    out = lines(registry)
+    assert out[0] == '# HELP odd_total Help with "quotes", a back\\\\slash\\nand a newline'
+    assert out[2] == 'odd_total{v="say \\"hi\\"\\\\\\n"} 1'
+    assert_well_formed(out)
+
+
+def test_collectors_are_read_at_scrape_time(registry):
+    state = {"running": 1}
+
+    @registry.collector
+    def executor():
+        yield "turn_executor_turns", "gauge", "Turns by state", [({"state": "running"}, state["running"])]
+
+    assert lines(registry)[-1] == 'turn_executor_turns{state="running"} 1'
+    state["running"] = 3
+    assert lines(registry)[-1] == 'turn_executor_turns{state="running"} 3'
+
+
+def test_failing_collector_leaves_a_comment_and_the_rest(registry):
+    registry.counter("ok_total", "Still rendered").inc()
+
+    @registry.collector
+    def broken():
+        raise RuntimeError("db\ndown")
+
+    out = lines(registry)
+    assert "ok_total 1" in out
+    assert out[-1] == "# collector broken failed: db\\ndown"
+    assert_well_formed(out)
+
+
+def test_app_registry_renders_well_formed():
+    TURN_SECONDS.observe(0.2, stage="start")
+    assert_well_formed(lines(app_registry))
+    assert CONTENT_TYPE.startswith("text/plain; version=0.0.4")
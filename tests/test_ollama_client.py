@@ -0,0 +1,222 @@
+# tests/test_ollama_client.py
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.services.ollama_client import ERROR_REPLY, TIMEOUT_REPLY, OllamaClient
+from tools import fake_ollama
+from tools.fake_ollama import fake_reply
+
+TOLERANCE = 0.25
+
+
+@pytest.fixture
+def client():
+    clients = []
+
+    def make(base_url: str) -> OllamaClient:
+        clients.append(OllamaClient(model_name="fake", base_url=base_url))
+        return clients[-1]
+
+    yield make
+    for c in clients:
+        c.close()
+
+
+def mocked(handler) -> OllamaClient:
+    """Client whose pooled clients answer through handler(request) → httpx.Response."""
+    ollama = OllamaClient(model_name="fake", base_url="http://ollama.test")
+    ollama._client = httpx.Client(transport=httpx.MockTransport(handler))
+    ollama._aclient = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ollama
+
+
+def ndjson(*lines) -> httpx.Response:
+    body = "".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines)
+    return httpx.Response(200, content=body.encode("utf-8"))
+
+
+def generate(ollama: OllamaClient, mode: str, prompt: str = "hi", **kwargs) -> str:
+    if mode == "sync":
+        return ollama.generate(prompt, **kwargs)
+
+    async def main():
+        try:
+            return await ollama.agenerate(prompt, **kwargs)
+        finally:
+            await ollama.aclose()
+    return asyncio.run(main())
+
+
+def timed(fn, *args, **kwargs):
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, time.monotonic() - started
+
+
+# -------------------------------------------------------------
+# STREAMING
+# -------------------------------------------------------------
+def test_stream_yields_each_token_as_it_arrives(fake_ollama_url, client):
+    ollama = client(fake_ollama_url(n_tokens=8))
+    assert list(ollama.stream("hi")) == fake_reply("hi", 8)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_on_token_gets_every_delta_in_order(fake_ollama_url, client, mode):
+    ollama = client(fake_ollama_url(n_tokens=8))
+    deltas = []
+
+    if mode == "sync":
+        reply = ollama.generate("hi", on_token=deltas.append)
+    else:
+        async def on_token(chunk):
+            deltas.append(chunk)
+        reply = generate(ollama, mode, on_token=on_token)
+
+    assert deltas == fake_reply("hi", 8)
+    assert reply == "".join(deltas).strip()
+
+
+def test_max_tokens_is_sent_as_num_predict(fake_ollama_url, client):
+    ollama = client(fake_ollama_url(n_tokens=24))
+    assert list(ollama.stream("hi", max_tokens=3)) == fake_reply("hi", 3)
+
+
+# -------------------------------------------------------------
+# MALFORMED STREAMS AND HTTP ERRORS → ERROR_REPLY
+# -------------------------------------------------------------
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_blank_lines_are_skipped(mode):
+    ollama = mocked(lambda _: ndjson({"response": "Hello "}, "", {"response": "there"}, {"done": True}))
+    assert generate(ollama, mode) == "Hello there"
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_malformed_line_keeps_the_tokens_before_it(mode):
+    ollama = mocked(lambda _: ndjson({"response": "Check the "}, "{not json", {"response": "boiler"}))
+    assert generate(ollama, mode) == "Check the"
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_malformed_first_line_is_an_error(mode):
+    ollama = mocked(lambda _: ndjson("<html>bad gateway</html>"))
+    assert generate(ollama, mode) == ERROR_REPLY
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_error_line_is_an_error(mode):
+    ollama = mocked(lambda _: ndjson({"error": "model 'fake' not found"}))
+    assert generate(ollama, mode) == ERROR_REPLY
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+@pytest.mark.parametrize("status", [404, 500, 503])
+def test_http_error_status_is_an_error(mode, status):
+    ollama = mocked(lambda _: httpx.Response(status, json={"error": "unavailable"}))
+    assert generate(ollama, mode) == ERROR_REPLY
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_unreachable_server_is_an_error(fake_ollama_url, mode):
+    url = fake_ollama_url()
+    ollama = OllamaClient(model_name="fake", base_url=url.rsplit(":", 1)[0] + ":1")
+    assert generate(ollama, mode) == ERROR_REPLY
+    ollama.close()
+
+
+# -------------------------------------------------------------
+# CONNECTION REUSE: one pooled keep-alive connection, many calls
+# -------------------------------------------------------------
+@pytest.fixture
+def counting_server():
+    """Fake Ollama that records every TCP connection it accepts → (url, accepted)."""
+    server, url = fake_ollama.start_in_thread(n_tokens=4)
+    accepted = []
+    process = server.process_request
+
+    def counted(request, address):
+        accepted.append(address)
+        process(request, address)
+
+    server.process_request = counted
+    yield url, accepted
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_calls_share_one_connection(counting_server, client):
+    url, accepted = counting_server
+    ollama = client(url)
+    pool = ollama.client
+
+    for prompt in ("a", "b", "c"):
+        assert ollama.generate(prompt) == "".join(fake_reply(prompt, 4)).strip()
+    assert ollama.client is pool
+    assert len(accepted) == 1
+
+
+def test_async_calls_share_one_connection(counting_server):
+    url, accepted = counting_server
+    ollama = OllamaClient(model_name="fake", base_url=url)
+
+    async def main():
+        pool = ollama.aclient
+        replies = [await ollama.agenerate(prompt) for prompt in ("a", "b", "c")]
+        assert ollama.aclient is pool
+        await ollama.aclose()
+        return replies
+
+    assert asyncio.run(main()) == ["".join(fake_reply(p, 4)).strip() for p in ("a", "b", "c")]
+    assert len(accepted) == 1
+
+
+# -------------------------------------------------------------
+# DEADLINE: a hard limit on the whole call, not on each read
+# -------------------------------------------------------------
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_trickling_stream_stops_at_the_deadline(fake_ollama_url, client, mode):
+    # a token every 0.7 s: the second one is due after the 1 s deadline
+    ollama = client(fake_ollama_url(token_delay=0.7, n_tokens=10))
+    deadline = time.monotonic() + 1.0
+
+    if mode == "sync":
+        reply, elapsed = timed(ollama.generate, "hi", deadline=deadline)
+    else:
+        reply, elapsed = timed(asyncio.run, ollama.agenerate("hi", deadline=deadline))
+
+    assert elapsed < 1.0 + TOLERANCE
+    assert reply == fake_reply("hi")[0].strip()       # the partial reply
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_stalled_stream_without_tokens_times_out(fake_ollama_url, client, mode):
+    ollama = client(fake_ollama_url(token_delay=5.0, n_tokens=2))
+    deadline = time.monotonic() + 0.5
+
+    if mode == "sync":
+        reply, elapsed = timed(ollama.generate, "hi", deadline=deadline)
+    else:
+        reply, elapsed = timed(asyncio.run, ollama.agenerate("hi", deadline=deadline))
+
+    assert elapsed < 0.5 + TOLERANCE
+    assert reply == TIMEOUT_REPLY
+
+
+def test_slow_first_byte_times_out(fake_ollama_url, client):
+    ollama = client(fake_ollama_url(latency=5.0))
+    reply, elapsed = timed(ollama.generate, "hi", deadline=time.monotonic() + 0.5)
+
+    assert elapsed < 0.5 + TOLERANCE
+    assert reply == TIMEOUT_REPLY
+
+
+def test_connection_cut_at_the_deadline_is_not_reused(fake_ollama_url, client):
+    ollama = client(fake_ollama_url(token_delay=0.7, n_tokens=3))
+    ollama.generate("hi", deadline=time.monotonic() + 1.0)
+
+    assert ollama.generate("hi", deadline=time.monotonic() + 10) == "".join(fake_reply("hi", 3)).strip()
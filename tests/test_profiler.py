@@ -0,0 +1,92 @@
+# tests/test_profiler.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils import profiler as profiler_module
+from app.utils.profiler import EVENT_LOOP, SamplingProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler_module.settings, "PROFILE_DIR", str(tmp_path))
+    p = SamplingProfiler()
+    p.start(rate=1.0, interval_ms=1, duration=30)
+    yield p
+    p.stop()
+
+
+def folded(p: SamplingProfiler) -> dict:
+    """root → stacks (leaf frames included) of the written profile."""
+    roots = {}
+    with open(p.stop()["path"], encoding="utf-8") as f:
+        for line in f:
+            stack, _count = line.rsplit(" ", 1)
+            root = stack.split(";", 1)[0]
+            roots.setdefault(root, []).append(stack)
+    return roots
+
+
+def spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def alpha_work():
+    spin(0.2)
+
+
+def beta_work():
+    spin(0.2)
+
+
+def test_thread_units_get_their_own_stacks(profiler):
+    def turn(stage, work):
+        with profiler.unit("turn", stage):
+            work()
+
+    threads = [threading.Thread(target=turn, args=("alpha", alpha_work)),
+               threading.Thread(target=turn, args=("beta", beta_work))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    roots = folded(profiler)
+    assert set(roots) == {"turn:alpha", "turn:beta"}
+    assert all("alpha_work" in s and "beta_work" not in s for s in roots["turn:alpha"])
+    assert all("beta_work" in s and "alpha_work" not in s for s in roots["turn:beta"])
+
+
+def test_units_on_the_event_loop_are_not_credited_to_the_turn(profiler):
+    async def llm_turn():
+        with profiler.unit("turn", "alpha"):
+            await asyncio.sleep(0.3)            # waits for Ollama; the loop runs others
+
+    async def other_session():
+        await asyncio.sleep(0.02)
+        beta_work()                              # CPU work of another coroutine
+
+    async def main():
+        await asyncio.gather(llm_turn(), other_session())
+
+    asyncio.run(main())
+
+    roots = folded(profiler)
+    assert "turn:alpha" not in roots
+    assert any("beta_work" in s for s in roots[EVENT_LOOP])
+
+
+def test_unsampled_units_cost_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler_module.settings, "PROFILE_DIR", str(tmp_path))
+    p = SamplingProfiler()
+    assert p.unit("turn", "alpha") is p.unit("turn", "beta")     # shared no-op context
+
+    p.start(rate=0.0, interval_ms=1, duration=30)
+    with p.unit("turn", "alpha"):
+        alpha_work()
+    assert p.stop()["samples"] == 0
@@ -0,0 +1,100 @@
+# tests/test_rag_engine.py
+#
+# RAGEngine's query caches, on a small docs folder and the hashed
+# bag-of-words embedder (no model download).
+
+import pytest
+
+from app.services.rag_engine import RAGEngine
+from tools.fake_embedder import HashEmbedder
+
+DOCS = {
+    "boiler.txt": "If the boiler is not working, check the pressure gauge and reset the boiler.",
+    "deposit.txt": "The tenancy deposit is usually five weeks of rent and must be protected.",
+}
+
+
+class CountingEmbedder(HashEmbedder):
+    """Records every text the engine asks to encode."""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def encode(self, texts, **kwargs):
+        self.seen.extend([texts] if isinstance(texts, str) else list(texts))
+        return super().encode(texts, **kwargs)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    path = tmp_path / "docs"
+    path.mkdir()
+    for name, text in DOCS.items():
+        (path / name).write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def rag(tmp_path, docs):
+    model = CountingEmbedder()
+    rag = RAGEngine(docs_path=str(docs), store_path=str(tmp_path / "vectorstore"),
+                    reload_interval=0, model=model, model_name=HashEmbedder.NAME)
+    model.seen.clear()                  # forget the index build
+    yield rag
+    rag.close()
+
+
+# -------------------------------------------------------------
+# QUERY EMBEDDINGS
+# -------------------------------------------------------------
+def test_question_variants_share_one_encoding_of_the_normalized_text(rag):
+    first = rag.embed_query("Boiler NOT working?!")
+    second = rag.embed_query("boiler not working")
+
+    assert rag.model.seen == ["boiler not working"]
+    assert second is first
+    assert not first.flags.writeable
+
+
+# -------------------------------------------------------------
+# RETRIEVAL CACHE
+# -------------------------------------------------------------
+def test_repeated_question_is_served_from_the_retrieval_cache(rag):
+    first = rag.retrieve("How much is the deposit?", k=1)
+    again = rag.retrieve("how much is the DEPOSIT", k=1)
+
+    assert again == first
+    assert first[0]["source"] == "deposit.txt"
+    assert rag.cache_stats()["retrieval"]["hits"] == 1
+    assert rag.cache_stats()["embeddings"]["misses"] == 1
+
+
+def test_retrieval_cache_is_keyed_by_k(rag):
+    assert len(rag.retrieve("boiler deposit", k=1)) == 1
+    assert len(rag.retrieve("boiler deposit", k=2)) == 2
+
+
+def test_new_index_version_drops_cached_results_but_keeps_embeddings(rag, docs):
+    before = rag.retrieve("boiler pressure", k=1)
+    assert before[0]["source"] == "boiler.txt"
+    version = rag.store.version
+
+    (docs / "boiler.txt").write_text("Boiler pressure below one bar: top it up at the filling loop.",
+                                     encoding="utf-8")
+    rag.store.sync(str(docs), rag.encode)
+    assert rag.store.version != version
+    rag.model.seen.clear()
+
+    after = rag.retrieve("boiler pressure", k=1)
+    assert after[0]["text"].startswith("Boiler pressure below one bar")
+    assert rag.model.seen == []         # the query vector was still cached
+    assert rag.cache_stats()["retrieval"]["size"] == 1
+
+
+def test_unchanged_index_keeps_cached_results(rag, docs):
+    rag.retrieve("boiler pressure", k=1)
+    rag.store.sync(str(docs), rag.encode)       # nothing changed → same version
+
+    rag.retrieve("boiler pressure", k=1)
+    assert rag.cache_stats()["retrieval"]["hits"] == 1
@@ -0,0 +1,98 @@
+# tests/test_rental_index.py
+#
+# RentalEngine.find_matches (ListingIndex tiers + columnar fallback) must
+# return exactly what scoring every listing with _score would.
+
+import random
+
+import pytest
+
+from app.services.rental_engine import RentalEngine
+from app.services.rental_index import ListingIndex
+from benchmarks.synthetic import AREAS, TYPES, make_properties
+
+
+def reference(engine: RentalEngine, req: dict, limit: int = 6) -> list:
+    """The original per-listing loop: stable sort by _score, best first."""
+    scored = [{**p, "score": engine._score(req, p)} for p in engine.properties]
+    scored = [p for p in scored if p["score"] > 0]
+    scored.sort(key=lambda p: p["score"], reverse=True)
+    return scored[:limit]
+
+
+def tier(engine: RentalEngine, req: dict) -> str:
+    before = dict(engine.index.stats)
+    engine.find_matches(req)
+    changed = [name for name, count in engine.index.stats.items() if count != before[name]]
+    return changed[0] if changed else "below min_rows"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return RentalEngine(make_properties(20_000, seed=1))
+
+
+# -------------------------------------------------------------
+# ONE REQUEST PER TIER
+# -------------------------------------------------------------
+@pytest.mark.parametrize("expected, req", [
+    ("intersection", {"location": "Camden", "property_type": "flat", "bedrooms": 2, "budget": 2000,
+                      "furnished": True, "garden": True, "parking": True}),
+    ("intersection", {"bedrooms": 3, "furnished": False, "parking": True}),
+    ("single", {"property_type": "flat", "bedrooms": 7, "budget": 800}),
+    ("single", {"location": "BN2", "property_type": "house", "bedrooms": 7, "furnished": False}),
+    ("union", {"location": "CR0", "bedrooms": 7, "budget": 300, "parking": True}),
+    ("union", {"property_type": "flat", "budget": 300}),
+    ("fallback", {"parking": True}),
+    ("fallback", {"location": "--", "budget": 1500}),
+    ("fallback", {"location": "zzzz", "property_type": "castle", "bedrooms": 9, "budget": 10,
+                  "parking": True}),
+])
+def test_tier_matches_reference(engine, expected, req):
+    assert tier(engine, req) == expected
+    assert engine.find_matches(req) == reference(engine, req)
+
+
+def test_small_catalogue_skips_index():
+    small = RentalEngine(make_properties(ListingIndex.min_rows - 1, seed=2))
+    req = {"location": "Camden", "bedrooms": 2, "budget": 1500}
+    assert tier(small, req) == "below min_rows"
+    assert small.find_matches(req) == reference(small, req)
+
+
+# -------------------------------------------------------------
+# RANDOM SEARCHES: every tier, same results
+# -------------------------------------------------------------
+def random_requests(engine: RentalEngine, n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    locations = [a for a, _ in AREAS] + [d for _, d in AREAS]
+    locations += [p["location"] for p in engine.properties[:50]] + ["zz", "sw", "London"]
+
+    reqs = []
+    for _ in range(n):
+        req = {}
+        if rng.random() < 0.7:
+            req["location"] = rng.choice(locations)
+        if rng.random() < 0.6:
+            req["property_type"] = rng.choice(TYPES + ["castle"])
+        if rng.random() < 0.6:
+            req["bedrooms"] = rng.randint(1, 7)
+        if rng.random() < 0.6:
+            req["budget"] = rng.choice([300, 500, 800, 1200, 2000, 5000])
+        if rng.random() < 0.5:
+            req["furnished"] = rng.choice([True, False])
+        if rng.random() < 0.4:
+            req["garden"] = True
+        if rng.random() < 0.4:
+            req["parking"] = True
+        reqs.append(req)
+    return reqs
+
+
+@pytest.mark.parametrize("limit", [1, 6, 25])
+def test_random_requests_match_reference(engine, limit):
+    tiers = set()
+    for req in random_requests(engine, 100, seed=limit):
+        tiers.add(tier(engine, req))
+        assert engine.find_matches(req, limit=limit) == reference(engine, req, limit), req
+    assert {"intersection", "single", "union", "fallback"} <= tiers
@@ -0,0 +1,140 @@
+# tests/test_router.py
+#
+# The admin API against a throwaway database: /api/v2 keyset pages, the
+# original bare-array lists, and the streaming exports.
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+import app.router as router_module
+from app.database import create_db_and_tables, get_session, make_engine
+from app.models.repair_models import RepairRequest
+from app.models.user_models import User
+
+CATEGORIES = ["Plumbing", "Electrical", "Heating"]
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    db_engine = make_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    create_db_and_tables(db_engine)
+    with Session(db_engine) as db:
+        user = User(name="Ana", phone="0700")
+        db.add(user)
+        db.commit()
+        for i in range(25):
+            db.add(RepairRequest(user_id=user.id, category=CATEGORIES[i % 3],
+                                 address=f"{i} High St", description=f"issue {i}"))
+        db.commit()
+    monkeypatch.setattr(router_module, "engine", db_engine)     # exports open their own sessions
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.fixture
+def client(db_engine):
+    api = FastAPI()
+    api.include_router(router_module.router)
+
+    def session():
+        with Session(db_engine) as db:
+            yield db
+
+    api.dependency_overrides[get_session] = session
+    with TestClient(api) as client:
+        yield client
+
+
+def all_pages(client, params: dict) -> list:
+    """Follows next_after until the last page; returns every page body."""
+    pages, after = [], None
+    while True:
+        query = dict(params, **({"after": after} if after is not None else {}))
+        body = client.get("/api/v2/repairs", params=query).json()
+        pages.append(body)
+        after = body["next_after"]
+        if after is None:
+            return pages
+
+
+# -------------------------------------------------------------
+# KEYSET PAGES (/api/v2)
+# -------------------------------------------------------------
+def test_pages_cover_every_row_once_in_id_order(client):
+    pages = all_pages(client, {"limit": 10})
+    ids = [row["id"] for page in pages for row in page["items"]]
+
+    assert [len(page["items"]) for page in pages] == [10, 10, 5]
+    assert ids == sorted(ids) and len(set(ids)) == 25
+    assert pages[0]["next_after"] == pages[0]["items"][-1]["id"]
+
+
+def test_desc_pages_continue_below_the_boundary(client):
+    first = client.get("/api/v2/repairs", params={"limit": 10, "order": "desc"}).json()
+    second = client.get("/api/v2/repairs", params={"limit": 10, "order": "desc",
+                                                   "after": first["next_after"]}).json()
+
+    ids = [row["id"] for row in first["items"] + second["items"]]
+    assert ids == sorted(ids, reverse=True)
+    assert max(row["id"] for row in second["items"]) == first["next_after"] - 1
+
+
+def test_last_page_has_no_next_after(client):
+    exact = client.get("/api/v2/repairs", params={"limit": 25}).json()
+    assert len(exact["items"]) == 25
+    assert exact["next_after"] is None
+
+    past_end = client.get("/api/v2/repairs", params={"after": exact["items"][-1]["id"]}).json()
+    assert past_end == {"items": [], "next_after": None}
+
+
+def test_filters_apply_to_every_page(client):
+    pages = all_pages(client, {"limit": 3, "category": "Plumbing"})
+    rows = [row for page in pages for row in page["items"]]
+    assert len(rows) == 9
+    assert {row["category"] for row in rows} == {"Plumbing"}
+
+
+# -------------------------------------------------------------
+# ORIGINAL LISTS: bare arrays, as before paging
+# -------------------------------------------------------------
+def test_list_without_parameters_returns_every_row(client):
+    body = client.get("/api/repairs").json()
+    assert isinstance(body, list)
+    assert [row["description"] for row in body] == [f"issue {i}" for i in range(25)]
+
+
+def test_list_offset_and_limit(client):
+    body = client.get("/api/repairs", params={"offset": 20, "limit": 3}).json()
+    assert [row["description"] for row in body] == ["issue 20", "issue 21", "issue 22"]
+    assert client.get("/api/users").json()[0]["phone"] == "0700"
+
+
+# -------------------------------------------------------------
+# EXPORT
+# -------------------------------------------------------------
+def test_ndjson_export_streams_every_row(client, monkeypatch):
+    monkeypatch.setattr(router_module, "EXPORT_BATCH", 7)       # several batches
+    res = client.get("/api/repairs/export", params={"order": "desc"})
+
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="repairs.ndjson"' in res.headers["content-disposition"]
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["description"] for row in rows] == [f"issue {i}" for i in reversed(range(25))]
+
+
+def test_csv_export_has_a_header_and_one_line_per_row(client, monkeypatch):
+    monkeypatch.setattr(router_module, "EXPORT_BATCH", 7)
+    res = client.get("/api/repairs/export", params={"format": "csv", "category": "Heating"})
+
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert list(rows[0]) == list(RepairRequest.model_fields)
+    assert [row["description"] for row in rows] == [f"issue {i}" for i in range(2, 25, 3)]
+    assert rows[0]["provider_selected"] == ""
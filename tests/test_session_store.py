@@ -0,0 +1,218 @@
+# tests/test_session_store.py
+#
+# The SessionStore contract, run against every backend. `store()` builds
+# another handle on the same sessions: a second worker for the shared
+# stores, the same instance for the process-local one. Redis tests run
+# when the redis package and a server at REDIS_URL are available.
+
+import json
+import sqlite3
+import time
+import uuid
+
+import pytest
+
+from app.config import get_settings
+from app.services.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionConflict,
+    SessionState,
+    SQLiteSessionStore,
+)
+
+SHARED = ["sqlite", "redis"]
+
+
+def redis_client():
+    redis = pytest.importorskip("redis")
+    client = redis.Redis.from_url(get_settings().REDIS_URL)
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("no Redis server at REDIS_URL")
+    return client
+
+
+@pytest.fixture
+def session_id():
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def make_store(request, tmp_path, session_id):
+    """make_store(backend, idle_ttl=...) → factory for handles on one store."""
+    cleanup = []
+
+    def make(backend: str, idle_ttl: float = 60):
+        if backend == "memory":
+            shared = MemorySessionStore(idle_ttl=idle_ttl)
+            return lambda: shared
+        if backend == "sqlite":
+            path = str(tmp_path / "sessions.db")
+            return lambda: SQLiteSessionStore(path, idle_ttl=idle_ttl)
+        client = redis_client()
+        cleanup.append(lambda: client.delete(RedisSessionStore.prefix + session_id))
+        return lambda: RedisSessionStore(idle_ttl=idle_ttl, client=client)
+
+    yield make
+    for fn in cleanup:
+        fn()
+
+
+# -------------------------------------------------------------
+# CONTRACT (every backend)
+# -------------------------------------------------------------
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_state_round_trips(make_store, session_id, backend):
+    store = make_store(backend)
+    a, b = store(), store()
+
+    st = a.get(session_id)
+    st.stage, st.user_name, st.rental = "rent_budget", "Ana", {"location": "Camden", "bedrooms": 2}
+    st.memory.add("Do I need a deposit?", "Usually five weeks' rent.")
+    a.put(session_id, st)
+
+    loaded = b.get(session_id)
+    assert (loaded.stage, loaded.user_name, loaded.rental) == ("rent_budget", "Ana", st.rental)
+    assert loaded.memory.dump() == st.memory.dump()
+    assert loaded.version == st.version == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_exists_only_for_saved_live_sessions(make_store, session_id, backend):
+    store = make_store(backend)()
+    assert not store.exists(session_id)
+
+    store.get(session_id)
+    assert not store.exists(session_id)       # get() alone saves nothing
+
+    store.put(session_id, store.get(session_id))
+    assert store.exists(session_id)
+
+    store.discard(session_id)
+    assert not store.exists(session_id)
+    assert store.get(session_id).version == 0
+
+
+@pytest.mark.parametrize("backend, idle_ttl", [("memory", 0.2), ("sqlite", 0.2), ("redis", 1)])
+def test_idle_session_expires_after_its_last_save(make_store, session_id, backend, idle_ttl):
+    store = make_store(backend, idle_ttl=idle_ttl)()
+    store.put(session_id, store.get(session_id))
+
+    time.sleep(idle_ttl * 0.6)
+    store.put(session_id, store.get(session_id))       # a later turn keeps it alive
+    time.sleep(idle_ttl * 0.6)
+    assert store.exists(session_id)
+
+    time.sleep(idle_ttl * 0.6)
+    assert not store.exists(session_id)
+    assert store.get(session_id).version == 0
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_stats_count_live_sessions(make_store, session_id, backend):
+    store = make_store(backend)()
+    store.put(session_id, store.get(session_id))
+
+    stats = store.stats()
+    assert stats["backend"] == backend
+    assert stats["live_sessions"] >= 1
+    assert stats["created"] == 1
+
+
+# -------------------------------------------------------------
+# SHARED STORES: optimistic concurrency between workers
+# -------------------------------------------------------------
+@pytest.mark.parametrize("backend", SHARED)
+def test_concurrent_update_conflicts(make_store, session_id, backend):
+    store = make_store(backend)
+    a, b = store(), store()
+    a.put(session_id, a.get(session_id))
+
+    mine, theirs = a.get(session_id), b.get(session_id)
+    mine.stage = "repair_address"
+    a.put(session_id, mine)
+
+    theirs.stage = "rent_location"
+    with pytest.raises(SessionConflict):
+        b.put(session_id, theirs)
+    assert b.stats()["conflicts"] == 1
+
+    # the winner's turn is kept; a reload sees it and can save again
+    reloaded = b.get(session_id)
+    assert (reloaded.stage, reloaded.version) == ("repair_address", 2)
+    b.put(session_id, reloaded)
+    assert reloaded.version == 3
+
+
+@pytest.mark.parametrize("backend", SHARED)
+def test_concurrent_first_save_conflicts(make_store, session_id, backend):
+    store = make_store(backend)
+    a, b = store(), store()
+    mine, theirs = a.get(session_id), b.get(session_id)
+
+    a.put(session_id, mine)
+    with pytest.raises(SessionConflict):
+        b.put(session_id, theirs)
+
+
+# -------------------------------------------------------------
+# MEMORY: a session dropped while its turn runs is saved again
+# -------------------------------------------------------------
+def test_memory_put_restores_an_evicted_session():
+    store = MemorySessionStore(max_sessions=1)
+    st = store.get("a")
+    store.put("a", st)
+
+    store.put("b", store.get("b"))              # evicts "a" mid-turn
+    assert not store.exists("a")
+
+    st.stage = "rent_budget"
+    store.put("a", st)
+    assert store.exists("a")
+    assert store.get("a").stage == "rent_budget"
+    assert store.stats()["evicted"] == 2        # "a", then "b" to make room
+
+
+def test_memory_put_restores_an_expired_session():
+    store = MemorySessionStore(idle_ttl=0.05)
+    st = store.get("a")
+    store.put("a", st)
+
+    time.sleep(0.1)                             # turn outlives the idle TTL
+    assert not store.exists("a")
+
+    store.put("a", st)
+    assert store.exists("a")
+    assert store.stats()["expired"] == 1
+
+
+def test_memory_without_idle_ttl_never_expires():
+    store = MemorySessionStore(idle_ttl=0)
+    store.put("a", store.get("a"))
+    time.sleep(0.01)
+    assert store.exists("a")
+
+
+# -------------------------------------------------------------
+# SQLITE: rows written by other versions
+# -------------------------------------------------------------
+def test_sqlite_unknown_format_starts_a_new_session(tmp_path, session_id):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path)
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "INSERT INTO session (id, version, updated_at, data) VALUES (?, 4, ?, ?)",
+            (session_id, time.time(), json.dumps([1, "rent_budget"]).encode()),
+        )
+
+    st = store.get(session_id)
+    assert (st.stage, st.version) == ("start", 0)
+    store.put(session_id, st)
+    assert store.get(session_id).version == 1
+
+
+def test_loads_rejects_other_formats():
+    with pytest.raises(ValueError):
+        SessionState.loads(b'{"stage": "start"}')
@@ -0,0 +1,219 @@
+# tests/test_stats.py
+
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database import create_db_and_tables, make_engine
+from app.models.rental_models import RentalSearch
+from app.models.repair_models import RepairRequest
+from app.models.stats_models import DailyCounter
+from app.models.user_models import User
+from app.services.stats import StatsCounters
+from app.services.write_behind import WriteBehindWriter, WriteJob
+
+TODAY = datetime.utcnow().date()
+
+
+def new_engine(path):
+    db_engine = make_engine(f"sqlite:///{path}")
+    create_db_and_tables(db_engine)
+    return db_engine
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    db_engine = new_engine(tmp_path / "app.db")
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.fixture
+def counters(db_engine):
+    counters = StatsCounters(db_engine, flush_interval=3600)      # rolled up by the tests
+    counters.start()
+    yield counters
+    counters.close()
+
+
+def add_user(db: Session) -> User:
+    user = User(name="Ana", phone="0700")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_repair(db: Session, user: User, category="Plumbing") -> RepairRequest:
+    repair = RepairRequest(user_id=user.id, category=category, address="1 High St", description="leak")
+    db.add(repair)
+    db.commit()
+    return repair
+
+
+def stored(db_engine) -> dict:
+    with Session(db_engine) as db:
+        return {(r.day, r.metric, r.key): r.count for r in db.exec(select(DailyCounter))}
+
+
+# -------------------------------------------------------------
+# CAPTURE: committed inserts on this engine only
+# -------------------------------------------------------------
+def test_committed_inserts_are_counted(db_engine, counters):
+    with Session(db_engine) as db:
+        user = add_user(db)
+        add_repair(db, user)
+        db.add(RentalSearch(user_id=user.id, location="Camden", property_type="Flat"))
+        db.commit()
+
+    assert counters._pending == {
+        (TODAY, "users", ""): 1,
+        (TODAY, "repairs", ""): 1,
+        (TODAY, "repairs_by_category", "plumbing"): 1,
+        (TODAY, "repairs_by_status", "open"): 1,
+        (TODAY, "open_repairs_by_category", "plumbing"): 1,
+        (TODAY, "searches", ""): 1,
+        (TODAY, "searches_by_location", "camden"): 1,
+        (TODAY, "searches_by_property_type", "flat"): 1,
+    }
+
+
+def test_rolled_back_inserts_are_not_counted(db_engine, counters):
+    with Session(db_engine) as db:
+        db.add(User(name="Ana", phone="0700"))
+        db.flush()
+        db.rollback()
+
+    with Session(db_engine) as db:
+        db.add(User(name="Bo", phone="0701"))
+        db.flush()                              # closed without commit
+
+    assert not counters._pending
+
+
+def test_write_behind_batches_are_counted(db_engine, counters):
+    writer = WriteBehindWriter(db_engine, flush_interval=0.01)
+    writer.submit_user("Ana", "0700", None)
+    writer.submit(WriteJob("repair", lambda uid: RepairRequest(
+        user_id=uid, category="Heating", address="1 High St", description="boiler"), user_phone="0700"))
+    writer.submit(WriteJob("repair", lambda uid: RepairRequest(
+        user_id=uid, category="Heating", address="1 High St", description="radiator"), user_phone="0999"))
+    assert writer.flush(5)
+    writer.close()
+
+    assert counters._pending[(TODAY, "users", "")] == 1
+    assert counters._pending[(TODAY, "repairs", "")] == 1       # the failed job is not counted
+
+
+def test_other_engines_are_not_counted(tmp_path, counters):
+    other = new_engine(tmp_path / "other.db")
+    with Session(other) as db:
+        add_repair(db, add_user(db))
+    other.dispose()
+
+    assert not counters._pending
+
+
+def test_status_changes_move_open_repairs(db_engine, counters):
+    with Session(db_engine) as db:
+        repair = add_repair(db, add_user(db))
+        repair.status = "closed"
+        db.commit()
+        assert counters.open_repairs_by_category() == {}
+
+        repair.status = "open"
+        db.commit()
+    assert counters.open_repairs_by_category() == {"plumbing": 1}
+
+
+def test_closed_counters_stop_counting(db_engine, counters):
+    counters.close()
+    with Session(db_engine) as db:
+        add_user(db)
+    assert not counters._pending
+
+
+# -------------------------------------------------------------
+# ROLLUP → dailycounter
+# -------------------------------------------------------------
+def test_rollup_is_additive_and_never_counts_twice(db_engine, counters):
+    with Session(db_engine) as db:
+        user = add_user(db)
+        add_repair(db, user)
+        assert counters.flush() == 5
+        assert counters.flush() == 0            # nothing pending: nothing re-added
+
+        add_repair(db, user)
+        counters.flush()
+
+    rows = stored(db_engine)
+    assert rows[(TODAY, "users", "")] == 1
+    assert rows[(TODAY, "repairs", "")] == 2
+    assert rows[(TODAY, "open_repairs_by_category", "plumbing")] == 2
+
+
+def test_workers_rolling_up_the_same_day_add_up(db_engine, counters):
+    other_worker = StatsCounters(db_engine)
+    counters.add({(TODAY, "repairs", ""): 2})
+    other_worker.add({(TODAY, "repairs", ""): 3})
+    counters.flush()
+    other_worker.flush()
+
+    assert stored(db_engine)[(TODAY, "repairs", "")] == 5
+
+
+def test_failed_rollup_keeps_counts_for_the_next_one(db_engine, counters, monkeypatch):
+    counters.add({(TODAY, "repairs", ""): 2})
+
+    def broken(db, counts):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(counters, "_upsert", broken)
+    with pytest.raises(RuntimeError):
+        counters.flush()
+    monkeypatch.undo()
+
+    counters.flush()
+    assert stored(db_engine) == {(TODAY, "repairs", ""): 2}
+
+
+def test_rebuild_matches_the_incremental_counts(db_engine, counters):
+    with Session(db_engine) as db:
+        user = add_user(db)
+        for category in ("Plumbing", "Plumbing", "Electrical"):
+            add_repair(db, user, category)
+    counters.flush()
+    incremental = stored(db_engine)
+
+    counters.rebuild()
+    assert stored(db_engine) == incremental
+
+
+# -------------------------------------------------------------
+# SUMMARY
+# -------------------------------------------------------------
+def test_summary_includes_counts_not_yet_rolled_up(db_engine, counters):
+    with Session(db_engine) as db:
+        user = add_user(db)
+        add_repair(db, user)
+        counters.flush()
+        add_repair(db, user, "Electrical")      # still pending
+
+    summary = counters.summary(days=7)
+    assert summary["totals"]["repairs"] == 2
+    assert summary["window_totals"]["repairs"] == 2
+    assert summary["breakdown"]["repairs_by_category"] == {"plumbing": 1, "electrical": 1}
+    assert summary["daily"][TODAY.isoformat()]["repairs"] == 2
+    assert summary["open_repairs_by_category"] == {"plumbing": 1, "electrical": 1}
+
+    counters.flush()
+    assert counters.summary(days=7) == summary
+
+
+def test_summary_window_excludes_older_days(db_engine, counters):
+    counters.add({(TODAY.replace(year=TODAY.year - 1), "repairs", ""): 4, (TODAY, "repairs", ""): 1})
+    counters.flush()
+
+    summary = counters.summary(days=30)
+    assert summary["totals"]["repairs"] == 5
+    assert summary["window_totals"]["repairs"] == 1
@@ -0,0 +1,157 @@
+# tests/test_turn_executor.py
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.turn_executor import ExecutorBusy, TurnExecutor
+
+
+def executor(**kwargs) -> TurnExecutor:
+    options = {"max_workers": 1, "max_pending": 1, "submit_timeout": 0.05}
+    return TurnExecutor(**{**options, **kwargs})
+
+
+async def hold_pool_turn(ex: TurnExecutor):
+    """Starts a pool turn that keeps its slot until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def turn():
+        started.set()
+        release.wait(5)
+        return "held"
+
+    task = asyncio.create_task(ex.run(turn))
+    await asyncio.to_thread(started.wait, 5)
+    return task, release
+
+
+# -------------------------------------------------------------
+# ADMISSION
+# -------------------------------------------------------------
+def test_busy_when_no_slot_frees_up():
+    async def main():
+        ex = executor()
+        holder, release = await hold_pool_turn(ex)
+
+        with pytest.raises(ExecutorBusy):
+            await ex.run(lambda: "late")
+        assert ex.rejected == 1
+        assert ex.waiting == 0
+
+        release.set()
+        assert await holder == "held"
+        assert await ex.run(lambda: "next") == "next"
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+def test_waiting_turn_gets_the_freed_slot():
+    async def main():
+        ex = executor(submit_timeout=5)
+        holder, release = await hold_pool_turn(ex)
+
+        waiter = asyncio.create_task(ex.run(lambda: "waiter"))
+        while ex.waiting == 0:
+            await asyncio.sleep(0)
+        assert ex.metrics()["waiting"] == 1
+
+        release.set()
+        assert await asyncio.gather(holder, waiter) == ["held", "waiter"]
+        assert ex.metrics()["completed"] == 2
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+def test_loop_turns_share_the_admission_limit():
+    async def main():
+        ex = executor()
+        async with ex.on_loop():
+            assert ex.metrics()["in_loop"] == 1
+            with pytest.raises(ExecutorBusy):
+                await ex.run(lambda: "pool turn")
+            with pytest.raises(ExecutorBusy):
+                async with ex.on_loop():
+                    pass
+        assert ex.rejected == 2
+        assert ex.in_loop == 0
+        assert await ex.run(lambda: "pool turn") == "pool turn"
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failing_turn_releases_its_slot():
+    async def main():
+        ex = executor()
+
+        def broken():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await ex.run(broken)
+        with pytest.raises(RuntimeError):
+            async with ex.on_loop():
+                raise RuntimeError("ollama down")
+
+        assert await ex.run(lambda: "next") == "next"
+        assert ex.in_loop == ex.running == ex.queued == 0
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+# -------------------------------------------------------------
+# ORDERING
+# -------------------------------------------------------------
+async def turn(ex: TurnExecutor, session_id: str, name: str, log: list, delay: float = 0.02):
+    """One turn as main.py runs it: ordered, a pool step, then an in-loop step."""
+    async with ex.ordered(session_id):
+        log.append(("start", name))
+        await ex.run(lambda: name)
+        async with ex.on_loop():
+            await asyncio.sleep(delay)
+        log.append(("end", name))
+
+
+def test_turns_of_one_session_run_in_order():
+    async def main():
+        ex = executor(max_workers=2, max_pending=4, submit_timeout=5)
+        log = []
+        await asyncio.gather(*(turn(ex, "chat", f"t{i}", log) for i in range(4)))
+
+        assert log == [(edge, f"t{i}") for i in range(4) for edge in ("start", "end")]
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+def test_turns_of_different_sessions_overlap():
+    async def main():
+        ex = executor(max_workers=2, max_pending=4, submit_timeout=5)
+        log = []
+        await asyncio.gather(turn(ex, "a", "a", log, delay=0.1), turn(ex, "b", "b", log, delay=0.1))
+
+        assert [edge for edge, _ in log[:2]] == ["start", "start"]
+        ex.shutdown()
+
+    asyncio.run(main())
+
+
+def test_forget_drops_idle_session_locks_only():
+    async def main():
+        ex = executor()
+        async with ex.ordered("busy"):
+            async with ex.ordered("idle"):
+                pass
+            ex.forget("idle")
+            ex.forget("busy")
+            assert ex.metrics()["sessions"] == 1
+        ex.forget("busy")
+        assert ex.metrics()["sessions"] == 0
+        ex.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,258 @@
+# tests/test_vector_store.py
+#
+# VectorStore builds with the hashed bag-of-words embedder: incremental
+# sync, the atomic index swap, and IVF recall against exact search.
+
+import glob
+import os
+
+import numpy as np
+import pytest
+
+import app.services.vector_store as vector_store
+from app.services.ann_index import IVFIndex, top_k
+from app.services.vector_store import INDEX_FILE, VectorStore
+from tools.fake_embedder import HashEmbedder
+
+DOCS = {
+    "boiler.txt": "If the boiler is not working, check the pressure gauge. " * 6,
+    "deposit.txt": "The tenancy deposit is usually five weeks of rent. " * 6,
+    "leak.txt": "Turn off the water supply at the stopcock before calling a plumber. " * 6,
+}
+
+
+class CountingEmbedder(HashEmbedder):
+    """encode() for sync(): records how many chunks it was asked for."""
+
+    def __init__(self):
+        super().__init__(dim=64)
+        self.encoded = 0
+
+    def __call__(self, texts):
+        self.encoded += len(texts)
+        return self.encode(texts, normalize_embeddings=True)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    path = tmp_path / "docs"
+    path.mkdir()
+    for name, text in DOCS.items():
+        (path / name).write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """make_store(**options) → a VectorStore handle (a worker) on one index folder."""
+    def make(**options) -> VectorStore:
+        options = {"dim": 64, "chunk_size": 120, "chunk_overlap": 20, **options}
+        return VectorStore(str(tmp_path / "vectorstore"), HashEmbedder.NAME, **options)
+    return make
+
+
+def rows_by_hash(store: VectorStore) -> dict:
+    return {e["hash"]: np.array(store.embeddings[i]) for i, e in enumerate(store.entries)}
+
+
+# -------------------------------------------------------------
+# INCREMENTAL SYNC
+# -------------------------------------------------------------
+def test_first_sync_encodes_every_chunk(make_store, docs):
+    store, encode = make_store(), CountingEmbedder()
+    stats = store.sync(str(docs), encode)
+
+    assert stats["files"] == 3 and stats["chunks"] > 3
+    assert (stats["encoded"], stats["reused"]) == (stats["chunks"], 0)
+    assert encode.encoded == stats["chunks"] == len(store.entries)
+    assert np.allclose(np.linalg.norm(store.embeddings, axis=1), 1.0)
+
+
+def test_unchanged_docs_encode_nothing_and_keep_the_version(make_store, docs):
+    store, encode = make_store(), CountingEmbedder()
+    store.sync(str(docs), encode)
+    version, encode.encoded = store.version, 0
+
+    stats = make_store().sync(str(docs), encode)
+    assert (stats["encoded"], stats["reused"]) == (0, stats["chunks"])
+    assert encode.encoded == 0
+    assert not store.reload_if_changed()
+    assert store.version == version
+
+
+def test_changed_file_reencodes_only_its_chunks(make_store, docs):
+    store, encode = make_store(), CountingEmbedder()
+    store.sync(str(docs), encode)
+    before = rows_by_hash(store)
+
+    (docs / "deposit.txt").write_text("Deposits must be protected within 30 days.", encoding="utf-8")
+    (docs / "leak.txt").unlink()
+    (docs / "mould.txt").write_text("Ventilate rooms daily to prevent mould.", encoding="utf-8")
+    encode.encoded = 0
+    stats = store.sync(str(docs), encode)
+
+    assert (stats["files_changed"], stats["files_removed"]) == (2, 1)
+    assert encode.encoded == stats["encoded"] == 2
+    assert {e["source"] for e in store.entries} == {"boiler.txt", "deposit.txt", "mould.txt"}
+
+    after = rows_by_hash(store)
+    boiler = [e["hash"] for e in store.entries if e["source"] == "boiler.txt"]
+    assert stats["reused"] == len(boiler)
+    for h in boiler:                    # reused rows are copied, not recomputed
+        assert np.array_equal(after[h], before[h])
+
+
+def test_full_sync_reencodes_everything(make_store, docs):
+    store, encode = make_store(), CountingEmbedder()
+    chunks = store.sync(str(docs), encode)["chunks"]
+
+    encode.encoded = 0
+    stats = store.sync(str(docs), encode, full=True)
+    assert encode.encoded == stats["encoded"] == chunks
+
+
+def test_batches_are_reported_as_they_are_encoded(make_store, docs):
+    progress = []
+    stats = make_store().sync(str(docs), CountingEmbedder(), batch_size=2,
+                              on_batch=lambda done, total: progress.append((done, total)))
+
+    total = stats["encoded"]
+    assert progress[-1] == (total, total)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert len(progress) == (total + 1) // 2
+
+
+# -------------------------------------------------------------
+# PUBLISH: readers never see a half-written index
+# -------------------------------------------------------------
+def test_rebuild_swaps_in_a_new_snapshot_and_keeps_the_old_one_valid(make_store, docs):
+    store, encode = make_store(), CountingEmbedder()
+    store.sync(str(docs), encode)
+    old = store.snapshot
+    old_rows = np.array(old.embeddings)
+    query = encode(["boiler pressure"])[0]
+    old_hits = store.search(query, 2, snapshot=old)
+
+    (docs / "boiler.txt").write_text("Bleed the radiators if the heating is noisy.", encoding="utf-8")
+    store.sync(str(docs), encode)
+
+    assert store.snapshot is not old and store.version != old.version
+    assert np.array_equal(np.array(old.embeddings), old_rows)      # mapped file outlives its removal
+    assert store.search(query, 2, snapshot=old) == old_hits
+    assert old.entries[old_hits[0][0]]["source"] == "boiler.txt"
+
+    files = os.listdir(store.path)
+    assert [f for f in files if f.startswith("embeddings-")] == [store.version]
+    assert not [f for f in files if f.endswith(".tmp")]
+
+
+def test_other_workers_pick_up_a_published_build(make_store, docs):
+    builder, worker, encode = make_store(), make_store(), CountingEmbedder()
+    builder.sync(str(docs), encode)
+    assert worker.load()
+    assert worker.version == builder.version
+
+    (docs / "mould.txt").write_text("Ventilate rooms daily to prevent mould.", encoding="utf-8")
+    builder.sync(str(docs), encode)
+
+    assert worker.reload_if_changed()
+    assert worker.version == builder.version
+    assert not worker.reload_if_changed()
+
+
+def test_failed_publish_leaves_the_previous_index(make_store, docs, monkeypatch):
+    store, encode = make_store(), CountingEmbedder()
+    store.sync(str(docs), encode)
+    version = store.version
+
+    real_replace = os.replace
+
+    def crash_before_swap(src, dst):
+        if dst.endswith(INDEX_FILE):
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(vector_store.os, "replace", crash_before_swap)
+    (docs / "boiler.txt").write_text("Bleed the radiators if the heating is noisy.", encoding="utf-8")
+    with pytest.raises(OSError):
+        store.sync(str(docs), encode)
+    monkeypatch.undo()
+
+    worker = make_store()
+    assert worker.load()
+    assert worker.version == version
+    assert os.path.exists(os.path.join(store.path, version))
+    assert len(worker.entries) == len(worker.embeddings)
+
+
+def test_index_for_another_model_is_rebuilt(make_store, docs, tmp_path):
+    make_store().sync(str(docs), CountingEmbedder())
+    other = VectorStore(str(tmp_path / "vectorstore"), "another-model", dim=64,
+                        chunk_size=120, chunk_overlap=20)
+    assert not other.load()
+
+    encode = CountingEmbedder()
+    stats = other.sync(str(docs), encode)
+    assert encode.encoded == stats["chunks"]
+
+
+# -------------------------------------------------------------
+# IVF: approximate search close to exact search
+# -------------------------------------------------------------
+def clustered(n: int, dim: int = 64, clusters: int = 50, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    rows = centres[rng.integers(clusters, size=n)] + 0.35 * rng.normal(size=(n, dim))
+    rows = rows.astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def recall(index: IVFIndex, matrix: np.ndarray, queries: np.ndarray, k: int, nprobe: int) -> float:
+    found = 0
+    for q in queries:
+        exact = set(top_k(matrix @ q, k).tolist())
+        approx, _ = index.search(matrix, q, k, nprobe)
+        found += len(exact & set(approx.tolist()))
+    return found / (len(queries) * k)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    matrix = clustered(8000)
+    queries = clustered(50, seed=1)
+    return matrix, queries, IVFIndex.build(matrix)
+
+
+def test_ivf_recall_against_exact_search(corpus):
+    matrix, queries, index = corpus
+    assert index.n_lists == int(np.sqrt(len(matrix)))
+    assert recall(index, matrix, queries, k=10, nprobe=16) >= 0.9
+
+
+def test_ivf_probing_every_list_is_exact(corpus):
+    matrix, queries, index = corpus
+    for q in queries[:10]:
+        rows, scores = index.search(matrix, q, 10, nprobe=index.n_lists)
+        exact = top_k(matrix @ q, 10)
+        assert rows.tolist() == exact.tolist()
+        assert np.allclose(scores, (matrix @ q)[exact])
+
+
+def test_ivf_buckets_hold_every_row_once(corpus):
+    matrix, _, index = corpus
+    assert sorted(index.order.tolist()) == list(range(len(matrix)))
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(matrix)
+
+
+def test_store_uses_ivf_above_ann_min_rows(make_store, docs):
+    store = make_store(ann_min_rows=5)
+    store.sync(str(docs), CountingEmbedder())
+    assert store.snapshot.ann is not None
+    assert glob.glob(os.path.join(store.path, "ivf-*.npz"))
+
+    worker = make_store(ann_min_rows=5)
+    assert worker.load() and worker.snapshot.ann is not None
+    q = CountingEmbedder()(["boiler pressure"])[0]
+    scores = worker.embeddings @ q
+    best = int(np.argmax(scores))
+    assert worker.search(q, 1, nprobe=worker.snapshot.ann.n_lists) == [(best, float(scores[best]))]
@@ -0,0 +1,97 @@
+# tests/test_wire.py
+#
+# Frames built by app/utils/wire.py must be byte-identical to pydantic's
+# model_dump_json() of the matching model, with and without orjson.
+
+import pytest
+
+import app.services.conversation_engine  # noqa: F401  (freezes its static replies)
+from app.models.chat_models import (
+    ChatBotResponse,
+    ChatOption,
+    ChatPropertyCard,
+    ChatSession,
+    ChatStreamDelta,
+)
+from app.utils import wire
+
+TRICKY = [
+    "",
+    "plain",
+    'quotes " and \\ backslashes',
+    "new\nline\ttab\r\x00\x1f\x7f",
+    "£1,200 · Café · 東京 · 🏠",
+    "</script><script>alert(1)</script>",
+    "  ",
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(wire, "orjson", None)
+    return request.param
+
+
+# -------------------------------------------------------------
+# STATIC REPLIES
+# -------------------------------------------------------------
+def test_frozen_static_replies_match_model_dump_json():
+    frozen = list(wire._frozen.values())
+    assert frozen, "conversation_engine froze no replies"
+    for response, frame in frozen:
+        assert frame == response.model_dump_json()
+        assert wire.encode_response(response) == frame
+
+
+def test_freeze_a_reply_with_options_and_properties():
+    response = wire.freeze(ChatBotResponse(
+        text="Here are 1 matches in Camden 🏠",
+        options=[ChatOption(label="Book a viewing", value="view")],
+        properties=[ChatPropertyCard(id=7, title='2 bed "garden" flat', price_per_month=1800,
+                                     location="Camden", bedrooms=2, furnished=True, url="https://x.test/7")],
+        show_input=False,
+    ))
+    assert wire.is_static(response)
+    assert wire.encode_response(response) == response.model_dump_json()
+
+
+def test_other_replies_are_serialized_when_sent():
+    response = ChatBotResponse(text="first")
+    assert not wire.is_static(response)
+    assert wire.encode_response(response) == response.model_dump_json()
+
+    response.text = "changed"
+    assert wire.encode_response(response) == response.model_dump_json()
+
+
+# -------------------------------------------------------------
+# STREAM / SESSION FRAMES
+# -------------------------------------------------------------
+@pytest.mark.parametrize("chunk", TRICKY)
+def test_delta_frame_matches_model_dump_json(encoder, chunk):
+    assert wire.delta_frame(chunk) == ChatStreamDelta(delta=chunk).model_dump_json()
+
+
+@pytest.mark.parametrize("resumed", [True, False])
+@pytest.mark.parametrize("session_id", ["3f2b9c1e-0d6a-4c55-9a43-7d2e1f0b8a61", "é\"\\"])
+def test_session_frame_matches_model_dump_json(encoder, session_id, resumed):
+    frame = wire.session_frame(session_id, resumed)
+    assert frame == ChatSession(session=session_id, resumed=resumed).model_dump_json()
+
+
+# -------------------------------------------------------------
+# INCOMING FRAMES
+# -------------------------------------------------------------
+@pytest.mark.parametrize("raw, text", [
+    ('{"text": "rent"}', "rent"),
+    ('{"text": "Caf\\u00e9 \\ud83c\\udfe0"}', "Café 🏠"),
+    ("rent", "rent"),
+    ('{"message": "rent"}', '{"message": "rent"}'),
+    ("42", "42"),
+    ('{"text": ', '{"text": '),
+])
+def test_decode_message(raw, text):
+    assert wire.decode_message(raw).text == text
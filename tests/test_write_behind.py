@@ -0,0 +1,141 @@
+# tests/test_write_behind.py
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database import create_db_and_tables, make_engine
+from app.models.repair_models import RepairRequest
+from app.models.user_models import User
+from app.services.write_behind import WriteBehindWriter, WriteJob
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    db_engine = make_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    create_db_and_tables(db_engine)
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.fixture
+def writer(db_engine):
+    writer = WriteBehindWriter(db_engine, max_queue=100, batch_size=50, flush_interval=0.05)
+    yield writer
+    writer.close()
+
+
+def repair(description: str, phone: str | None = None, user_id: int | None = None) -> WriteJob:
+    return WriteJob(
+        "repair",
+        lambda uid: RepairRequest(user_id=uid, category="Plumbing", address="1 High St", description=description),
+        user_id=user_id,
+        user_phone=phone,
+    )
+
+
+def rows(db_engine, model) -> list:
+    with Session(db_engine) as db:
+        return db.exec(select(model)).all()
+
+
+# -------------------------------------------------------------
+# BATCHING
+# -------------------------------------------------------------
+def test_jobs_queued_behind_their_user_get_its_id(db_engine, writer):
+    writer.submit_user("Ana", "0700", "ana@example.com")
+    writer.submit(repair("leak", phone="0700"))
+    writer.submit(repair("boiler", phone="0700"))
+    assert writer.flush(5)
+
+    users = rows(db_engine, User)
+    assert [u.phone for u in users] == ["0700"]
+    repairs = rows(db_engine, RepairRequest)
+    assert sorted(r.description for r in repairs) == ["boiler", "leak"]
+    assert {r.user_id for r in repairs} == {users[0].id}
+
+
+def test_user_written_in_an_earlier_batch_is_found_by_phone(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    assert writer.flush(5)
+    writer.submit(repair("leak", phone="0700"))
+    assert writer.flush(5)
+
+    assert rows(db_engine, RepairRequest)[0].user_id == rows(db_engine, User)[0].id
+
+
+def test_duplicate_user_in_one_batch_is_written_once(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    writer.submit_user("Ana", "0700", None)
+    assert writer.flush(5)
+    assert len(rows(db_engine, User)) == 1
+
+
+def test_jobs_arriving_together_share_a_batch(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    for i in range(20):
+        writer.submit(repair(f"issue {i}", phone="0700"))
+    assert writer.flush(5)
+
+    metrics = writer.metrics()
+    assert metrics["written"] == 21
+    assert metrics["batches"] < 21
+    assert metrics["max_batch"] > 1
+    assert metrics["pending"] == 0
+
+
+# -------------------------------------------------------------
+# FAILURES
+# -------------------------------------------------------------
+def test_bad_job_does_not_lose_the_rest_of_its_batch(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    writer.submit(repair("leak", phone="0700"))
+    writer.submit(repair("no such user", phone="0999"))
+    writer.submit(repair("boiler", phone="0700"))
+    assert writer.flush(5)
+
+    assert sorted(r.description for r in rows(db_engine, RepairRequest)) == ["boiler", "leak"]
+    assert writer.failed == 1
+    assert writer.written == 3
+
+
+def test_jobs_of_a_user_whose_insert_failed_fail_too(db_engine, writer):
+    def broken_user(_):
+        raise RuntimeError("constraint violated")
+
+    writer.submit(WriteJob("user", broken_user, user_phone="0700"))
+    writer.submit(repair("leak", phone="0700"))
+    assert writer.flush(5)
+
+    assert rows(db_engine, RepairRequest) == []
+    assert writer.failed == 2
+    assert writer.user_id("0700") is None
+
+
+def test_user_id_is_known_once_written(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    assert writer.flush(5)
+    assert writer.user_id("0700") == rows(db_engine, User)[0].id
+    assert writer.user_id("0999") is None
+    assert writer.user_id(None) is None
+
+
+# -------------------------------------------------------------
+# SHUTDOWN
+# -------------------------------------------------------------
+def test_close_drains_the_queue(db_engine):
+    writer = WriteBehindWriter(db_engine, batch_size=5, flush_interval=1.0)
+    writer.submit_user("Ana", "0700", None)
+    for i in range(12):
+        writer.submit(repair(f"issue {i}", phone="0700"))
+    writer.close()
+
+    assert len(rows(db_engine, RepairRequest)) == 12
+    assert writer.metrics()["closed"]
+
+
+def test_jobs_after_close_are_written_synchronously(db_engine, writer):
+    writer.submit_user("Ana", "0700", None)
+    writer.close()
+
+    writer.submit(repair("late", phone="0700"))
+    assert [r.description for r in rows(db_engine, RepairRequest)] == ["late"]
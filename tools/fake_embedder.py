@@ -0,0 +1,48 @@
+# tools/fake_embedder.py
+#
+# Lightweight stand-in for the SentenceTransformer model, for benchmarks:
+# no torch, no download, microseconds per text.
+#
+#   RAGEngine(model=HashEmbedder(), model_name=HashEmbedder.NAME)
+#
+# Vectors are deterministic hashed bag-of-words (L2-normalized on request),
+# so texts sharing words are similar and retrieval results are stable.
+
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbedder:
+    NAME = "hash-bow-384"
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        v = np.zeros(self.dim, dtype=np.float32)
+        for word in WORD.findall(text.lower()):
+            h = zlib.crc32(word.encode("utf-8"))
+            v[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return v
+
+    def encode(self, texts, batch_size: int = 64, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, **_) -> np.ndarray:
+        single = isinstance(texts, str)
+        items: List[str] = [texts] if single else list(texts)
+
+        out = np.zeros((len(items), self.dim), dtype=np.float32)
+        for i, text in enumerate(items):
+            out[i] = self._vector(text)
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms == 0, 1.0, norms)
+
+        return out[0] if single else out
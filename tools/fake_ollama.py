@@ -0,0 +1,148 @@
+# tools/fake_ollama.py
+#
+# Minimal stand-in for the Ollama HTTP API, for local testing and benchmarks.
+#
+#   python -m tools.fake_ollama --port 11435 --token-delay 0.02
+#   OLLAMA_URL=http://127.0.0.1:11435 uvicorn app.main:app
+#
+# Replies are deterministic: the same prompt always produces the same tokens.
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = [
+    "Please", "check", "the", "boiler", "pressure", "and", "contact", "your",
+    "landlord", "if", "the", "issue", "persists.", "Turn", "off", "the",
+    "water", "supply", "before", "calling", "a", "plumber.",
+]
+
+
+def fake_reply(prompt: str, n_tokens: int = 24) -> list[str]:
+    """
+    Deterministic token list derived from the prompt hash.
+    """
+    seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16)
+    tokens = []
+    for i in range(n_tokens):
+        tokens.append(WORDS[(seed >> (i % 64)) % len(WORDS)] + " ")
+    return tokens
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # overridden per server in make_server()
+    latency = 0.0
+    token_delay = 0.0
+    n_tokens = 24
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        # pooled clients drop idle keep-alive connections on shutdown
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+
+    def _send_json(self, status: int, body: dict):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            return self._send_json(200, {"models": [{"name": "fake"}]})
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            return self._send_json(404, {"error": "not found"})
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompt = payload.get("prompt", "")
+        n_tokens = payload.get("options", {}).get("num_predict", self.n_tokens)
+        tokens = fake_reply(prompt, min(self.n_tokens, n_tokens))
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if not payload.get("stream", True):
+            return self._send_json(200, {
+                "model": payload.get("model"),
+                "response": "".join(tokens),
+                "done": True,
+            })
+
+        # NDJSON stream, chunked transfer encoding
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for tok in tokens:
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            self._write_chunk({"model": payload.get("model"), "response": tok, "done": False})
+
+        self._write_chunk({"model": payload.get("model"), "response": "", "done": True})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, obj: dict):
+        line = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                token_delay: float = 0.0, n_tokens: int = 24) -> ThreadingHTTPServer:
+    handler = type("Handler", (FakeOllamaHandler,), {
+        "latency": latency,
+        "token_delay": token_delay,
+        "n_tokens": n_tokens,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(**kwargs) -> tuple[ThreadingHTTPServer, str]:
+    """
+    Starts a fake server on a free port → (server, base_url).
+    Call server.shutdown() when done.
+    """
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before first token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=24, help="tokens per reply")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.token_delay, args.tokens)
+    print(f"🧪 Fake Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()